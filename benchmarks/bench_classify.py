@@ -0,0 +1,104 @@
+# scaling of router/terminal classification and point generation
+# list membership (old) vs topology.NodeIndex (new) on synthetic slimfly-like systems
+# usage: python benchmarks/bench_classify.py [-n sizes...] [--max_old N]
+import os
+import sys
+import math
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from netvis import topology
+from netvis import layout
+
+
+# terminals first, then routers in groups, every router linked to a few others
+def synthetic_system(num_nodes, terminals_per_router=9, group_size=16, router_degree=8):
+    num_routers = max(group_size, num_nodes // (terminals_per_router + 1))
+    num_routers -= num_routers % group_size
+    num_terminals = num_routers * terminals_per_router
+    routers = list(range(num_terminals, num_terminals + num_routers))
+    terminals = list(range(num_terminals))
+
+    rng = np.random.RandomState(0)
+    term_edges = np.column_stack([np.arange(num_terminals), num_terminals + np.arange(num_terminals) // terminals_per_router])
+    r1 = np.repeat(np.arange(num_routers), router_degree // 2)
+    r2 = rng.randint(0, num_routers, size=r1.size)
+    router_edges = np.column_stack([r1, r2]) + num_terminals
+    edges = np.concatenate([term_edges, router_edges]).tolist()
+    return routers, terminals, edges, group_size
+
+
+# the list membership versions used before NodeIndex
+def old_split_edges(edges, routers, group_size):
+    terminal_edges = []
+    local_edges = []
+    global_edges = []
+    routerid_start = min(routers)
+    for v1, v2 in edges:
+        if v1 in routers and v2 in routers:
+            g1 = (v1 - routerid_start) // group_size
+            g2 = (v2 - routerid_start) // group_size
+            if g1 == g2:
+                local_edges.append((v1, v2))
+            else:
+                global_edges.append((v1, v2))
+        else:
+            terminal_edges.append((v1, v2))
+    return terminal_edges, local_edges, global_edges
+
+
+def old_points(all_coords, routers, terminals):
+    out = {}
+    for nodeid, coords in all_coords.items():
+        z = 8 if nodeid in routers else 2
+        if nodeid in routers:
+            lower = nodeid - min(routers) < (max(routers) + 1 - min(routers)) // 2
+        else:
+            lower = nodeid - min(terminals) < (max(terminals) + 1 - min(terminals)) // 2
+        rad = math.pi / 2 if lower else 3 * math.pi / 2
+        translation = 30 if lower else -30
+        out[nodeid] = (coords[0], coords[1] * math.cos(rad) - z * math.sin(rad) + translation,
+                       coords[1] * math.sin(rad) + z * math.cos(rad))
+    return out
+
+
+def timed(fn, *args):
+    start = time.time()
+    fn(*args)
+    return time.time() - start
+
+
+def new_points(all_coords, nodes):
+    ids, xy = layout.coords_to_arrays(all_coords, 2)
+    return layout.rotate_halves(ids, xy, nodes, 30)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", "--sizes", type=int, nargs="*", default=[1000, 3000, 10000, 30000, 100000],
+                    help="approximate node counts")
+    ap.add_argument("--max_old", type=int, default=10000, help="largest size to run the old list path on")
+    args = ap.parse_args()
+
+    print("%8s %8s %14s %14s %14s %14s" % ("nodes", "edges", "old split s", "new split s", "old points s", "new points s"))
+    for size in args.sizes:
+        routers, terminals, edges, group_size = synthetic_system(size)
+        num_nodes = len(routers) + len(terminals)
+        rng = np.random.RandomState(1)
+        all_coords = dict((i, list(c)) for i, c in enumerate(rng.rand(num_nodes, 2).tolist()))
+
+        start = time.time()
+        nodes = topology.NodeIndex.from_lists(routers, terminals)
+        new_split = time.time() - start
+        new_split += timed(topology.split_edges, edges, nodes, nodes.router_start, group_size)
+        new_pts = timed(new_points, all_coords, nodes)
+
+        old_split = old_pts = float("nan")
+        if num_nodes <= args.max_old:
+            old_split = timed(old_split_edges, edges, routers, group_size)
+            old_pts = timed(old_points, all_coords, routers, terminals)
+
+        print("%8d %8d %14.4f %14.4f %14.4f %14.4f" % (num_nodes, len(edges), old_split, new_split, old_pts, new_pts))
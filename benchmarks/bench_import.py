@@ -0,0 +1,82 @@
+# startup cost of the netvis modules and command line entry points, each timed in a
+# fresh interpreter, plus which of vtk, networkx and h5py an import drags in
+# usage: python benchmarks/bench_import.py [-r repeats]
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+HEAVY = ("vtk", "networkx", "h5py")
+MODULES = ("sampling", "simfile", "vtkarrays", "topology", "layout", "layout_cache", "vtkhdf", "frames",
+           "generators", "links", "lod", "temporal", "delta", "stats", "trace", "pipeline", "codes", "hotspots",
+           "network_vis", "core_vis")
+COMMANDS = (
+    ("network.py --help", [os.path.join(ROOT, "network.py"), "--help"]),
+    ("core-vis.py --help", [os.path.join(ROOT, "core-vis.py"), "--help"]),
+    ("netvis.simfile --help", ["-m", "netvis.simfile", "--help"]),
+    ("netvis.layout_cache --help", ["-m", "netvis.layout_cache", "--help"]),
+    ("netvis.stats --help", ["-m", "netvis.stats", "--help"]),
+    ("netvis.delta --help", ["-m", "netvis.delta", "--help"]),
+    ("netvis.hotspots --help", ["-m", "netvis.hotspots", "--help"]),
+    ("netvis.generators --help", ["-m", "netvis.generators", "--help"]),
+)
+
+
+def run(args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    start = time.time()
+    out = subprocess.check_output([sys.executable] + args, env=env, cwd=ROOT)
+    return time.time() - start, out
+
+
+def best_of(args, repeats):
+    best = None
+    out = None
+    for _ in range(repeats):
+        elapsed, out = run(args)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+# the import is timed inside the child so interpreter startup isn't counted
+def time_import(module, repeats):
+    code = ("import sys, time; t = time.time(); import %s; t = time.time() - t; "
+            "print(repr(t)); print(' '.join(m for m in %r if m in sys.modules))" % (module, HEAVY))
+    best = None
+    loaded = ""
+    for _ in range(repeats):
+        _, out = run(["-c", code])
+        lines = out.decode("utf-8").splitlines()
+        elapsed = float(lines[0])
+        best = elapsed if best is None else min(best, elapsed)
+        loaded = lines[1] if len(lines) > 1 else ""
+    return best, loaded
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-r", "--repeats", type=int, default=5, help="runs per entry, the fastest is reported")
+    args = ap.parse_args()
+
+    interp, _ = best_of(["-c", "pass"], args.repeats)
+    print("interpreter startup %.3f s\n" % interp)
+
+    print("%-28s %10s  %s" % ("import", "seconds", "heavy modules loaded"))
+    for module in ("numpy",) + HEAVY:
+        try:
+            elapsed, loaded = time_import(module, args.repeats)
+        except subprocess.CalledProcessError:
+            print("%-28s %10s" % (module, "missing"))
+            continue
+        print("%-28s %10.3f  %s" % (module, elapsed, loaded))
+    for module in MODULES:
+        elapsed, loaded = time_import("netvis." + module, args.repeats)
+        print("%-28s %10.3f  %s" % ("netvis." + module, elapsed, loaded or "-"))
+
+    print("\n%-28s %10s" % ("command", "seconds"))
+    for name, cmd in COMMANDS:
+        elapsed, _ = best_of(cmd, args.repeats)
+        print("%-28s %10.3f" % (name, elapsed))
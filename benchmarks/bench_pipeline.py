@@ -0,0 +1,322 @@
+# wall time, peak RSS and bytes written of each stage of the network.py pipeline:
+# GEXF read, classification (or generation), layout, polydata / edge insertion,
+# ingest of router and terminal csvs, and frame output.
+# runs the bundled topologies in connection-data/ and synthetic dragonfly,
+# slimfly or fattree systems from netvis.generators scaled to the node counts
+# asked for, with synthetic sampling csvs of the given size. every case runs in
+# its own interpreter so peak memory isn't carried from one case to the next.
+# results are written as json, and two result files can be compared
+# usage: python benchmarks/bench_pipeline.py [-n sizes...] [--network dragonfly] [-s samples] [-o results.json]
+#        python benchmarks/bench_pipeline.py --compare old.json new.json
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import threading
+import multiprocessing
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from netvis import generators
+from netvis import network_vis
+from netvis import trace
+from netvis import vtkarrays
+
+DATA_DIR = os.path.join(ROOT, "connection-data")
+# (case name, network, gexf file, routers per group, groups)
+BUNDLED = (
+    ("sfly3042", "slimfly", "sfly3042.gexf", 13, 26),
+    ("dfly3072", "dragonfly", "dfly3072.gexf", 96, 8),
+    ("ftree", "fattree", "ftree.gexf", 0, 0),
+)
+SAMP_INTERVAL = 100
+
+
+def dir_bytes(path):
+    total = 0
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            total += os.path.getsize(os.path.join(dirpath, name))
+    return total
+
+
+# times one stage and samples the resident set size while it runs.
+# the sampler can miss peaks inside long calls that hold the GIL, so the
+# process high-water mark after the stage is recorded as well
+class Stage(object):
+    def __init__(self, results, case, name, out_dir=None, **info):
+        self.results = results
+        self.record = dict(case, stage=name, **info)
+        self.out_dir = out_dir
+
+    def __enter__(self):
+        self.peak = trace.rss_bytes()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample)
+        self.thread.daemon = True
+        self.thread.start()
+        self.bytes_before = dir_bytes(self.out_dir) if self.out_dir else 0
+        self.start = time.time()
+        return self
+
+    def sample(self):
+        while self.running:
+            self.peak = max(self.peak, trace.rss_bytes())
+            time.sleep(0.005)
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.time() - self.start
+        self.running = False
+        self.thread.join()
+        self.peak = max(self.peak, trace.rss_bytes())
+        self.record["seconds"] = seconds
+        self.record["peak_rss_mb"] = self.peak / 1048576.0
+        self.record["max_rss_mb"] = trace.max_rss_bytes() / 1048576.0
+        self.record["bytes_written"] = (dir_bytes(self.out_dir) - self.bytes_before) if self.out_dir else 0
+        if "rows" in self.record:
+            self.record["rows_per_s"] = self.record["rows"] / max(seconds, 1e-9)
+        if "frames" in self.record:
+            self.record["frames_per_s"] = self.record["frames"] / max(seconds, 1e-9)
+        if self.record["bytes_written"]:
+            self.record["mb_per_s"] = self.record["bytes_written"] / 1048576.0 / max(seconds, 1e-9)
+        self.results.append(self.record)
+        return False
+
+
+# CODES style sampling csv: one row per node and sample, plus the extra first row
+# per node that the reader drops, with end times jittered inside their interval
+def write_sampling_csv(filename, node_type, num_nodes, num_samples, num_vcs=4, seed=0):
+    rng = np.random.RandomState(seed)
+    ids = np.arange(num_nodes)
+    header = node_type + "_id,end_time," + ",".join("vc" + str(i) for i in range(num_vcs))
+    f = open(filename, "w")
+    f.write(header + "\n")
+    rows = 0
+    for step in range(num_samples + 1):
+        block = np.empty((num_nodes, 2 + num_vcs))
+        block[:, 0] = ids
+        block[:, 1] = step * SAMP_INTERVAL + rng.randint(0, SAMP_INTERVAL, size=num_nodes) + 0.5
+        block[:, 2:] = rng.poisson(8, size=(num_nodes, num_vcs))
+        np.savetxt(f, block, fmt=["%d", "%.3f"] + ["%d"] * num_vcs, delimiter=",")
+        rows += num_nodes
+    f.close()
+    return rows
+
+
+def smallest_prime_q(num_nodes):
+    q = 5
+    while True:
+        if generators.is_prime(q) and q % 4 in (1, 3):
+            delta = 1 if q % 4 == 1 else -1
+            if 2 * q * q * (1 + (3 * q - delta) // 4) >= num_nodes:
+                return q
+        q += 1
+
+
+# network.py style args for a synthetic system of about num_nodes nodes
+def synthetic_args(network, num_nodes):
+    args = {"terminals_per_router": None, "links_per_pair": None, "radix": 36, "levels": 3, "num_pods": None}
+    if network == "dragonfly":
+        # groups like dfly3072 (96 routers, 4 terminals each), 4 global ports per router
+        group_size = 96
+        num_groups = max(2, -(-num_nodes // (group_size * 5)))
+        args["links_per_pair"] = max(1, group_size * 4 // (num_groups - 1))
+        return args, group_size, num_groups
+    if network == "slimfly":
+        q = smallest_prime_q(num_nodes)
+        return args, q, 2 * q
+    if network == "fattree":
+        radix = 4
+        while radix ** 3 // 4 < num_nodes:
+            radix += 2
+        args["radix"] = radix
+        return args, 0, 0
+    raise ValueError("unknown network " + network)
+
+
+def run_case(spec, num_samples, workers, io_threads, formats, work_dir):
+    # imported up front so the first stage using them isn't charged for the import
+    import networkx as nx
+    import vtk
+
+    results = []
+    case = {"case": spec["name"], "network": spec["network"], "samples": num_samples}
+    network = spec["network"]
+    out_dir = os.path.join(work_dir, "out")
+    os.makedirs(out_dir)
+
+    if spec.get("graphfile"):
+        with Stage(results, case, "read_gexf"):
+            G = nx.read_gexf(spec["graphfile"])
+        with Stage(results, case, "classify"):
+            num_nodes, nodes, edges = network_vis.read_topology(G, network)
+        del G
+        args = {"radix": 36}
+        group_size, num_groups = spec["group_size"], spec["num_groups"]
+    else:
+        args, group_size, num_groups = synthetic_args(network, spec["nodes"])
+        with Stage(results, case, "generate"):
+            num_nodes, nodes, edges = network_vis.generate_topology(network, num_groups, group_size, args)
+    case["nodes"] = int(num_nodes)
+    case["edges"] = int(len(edges))
+    for record in results:
+        record.update(nodes=case["nodes"], edges=case["edges"])
+
+    with Stage(results, case, "layout"):
+        topo = network_vis.create_layout(network, num_nodes, nodes, edges, num_groups, group_size, int(args["radix"]))
+    with Stage(results, case, "polydata"):
+        polydata = network_vis.graph_polydata(num_nodes, topo["points"], topo["edges"])
+        polydata.GetPointData().AddArray(network_vis.named_array(topo["node_arr"], "NodeType"))
+
+    num_terminals = int(nodes.terminals.size)
+    router_csv = os.path.join(work_dir, "router.csv")
+    term_csv = os.path.join(work_dir, "term.csv")
+    with Stage(results, case, "synth_csv", work_dir) as stage:
+        rows = write_sampling_csv(router_csv, "router", num_nodes - num_terminals, num_samples, seed=1)
+        rows += write_sampling_csv(term_csv, "terminal", num_terminals, num_samples, seed=2)
+        stage.record["rows"] = rows
+
+    with Stage(results, case, "ingest", rows=rows) as stage:
+        sim_data = vtkarrays.sample_matrix(num_nodes, num_samples)
+        network_vis.read_sim_data(router_csv, "router", num_terminals, num_samples, SAMP_INTERVAL, sim_data)
+        network_vis.read_sim_data(term_csv, "terminal", num_terminals, num_samples, SAMP_INTERVAL, sim_data)
+        stage.record["mb_read"] = (os.path.getsize(router_csv) + os.path.getsize(term_csv)) / 1048576.0
+
+    times = np.arange(num_samples) * SAMP_INTERVAL
+    write_args = {"workers": workers, "io_threads": io_threads, "max_frames": 16, "delta": False,
+                  "skip_unchanged": False, "data_mode": "base64", "compressor": "zlib", "compression_level": None}
+    for fmt in formats:
+        fmt_dir = os.path.join(out_dir, fmt)
+        os.makedirs(fmt_dir)
+        write_args["output_format"] = fmt
+        # each format starts from a polydata without the previous format's step arrays
+        poly = network_vis.graph_polydata(num_nodes, topo["points"], topo["edges"])
+        poly.GetPointData().AddArray(network_vis.named_array(topo["node_arr"], "NodeType"))
+        with Stage(results, case, "write_" + fmt, fmt_dir, frames=num_samples):
+            network_vis.write_output(poly, os.path.join(fmt_dir, network), times, [("VC_Occupancy", sim_data)], [],
+                                     {"NodeType": topo["node_arr"]}, {}, write_args)
+    return results
+
+
+def case_specs(sizes, network, bundled):
+    specs = []
+    if bundled:
+        for name, net, gexf, group_size, num_groups in BUNDLED:
+            specs.append({"name": name, "network": net, "graphfile": os.path.join(DATA_DIR, gexf),
+                          "group_size": group_size, "num_groups": num_groups})
+    for size in sizes:
+        specs.append({"name": "%s-%d" % (network, size), "network": network, "nodes": size})
+    return specs
+
+
+def git_commit():
+    try:
+        devnull = open(os.devnull, "w")
+        out = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=devnull)
+        devnull.close()
+        return out.decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": multiprocessing.cpu_count(),
+        "samples": args.samples,
+        "workers": args.workers,
+        "io_threads": args.io_threads,
+        "formats": args.formats,
+    }
+
+
+def print_header():
+    print("%-16s %-12s %8s %9s %10s %10s %12s %s" % ("case", "stage", "nodes", "seconds", "peak MB", "max MB",
+                                                     "written MB", "rate"))
+
+
+def print_results(results):
+    for r in results:
+        rate = ""
+        if "rows_per_s" in r:
+            rate = "%.0f rows/s" % r["rows_per_s"]
+        elif "frames_per_s" in r:
+            rate = "%.1f frames/s, %.1f MB/s" % (r["frames_per_s"], r.get("mb_per_s", 0))
+        print("%-16s %-12s %8d %9.3f %10.1f %10.1f %12.2f %s" % (r["case"], r["stage"], r.get("nodes", 0), r["seconds"],
+                                                                r["peak_rss_mb"], r["max_rss_mb"],
+                                                                r["bytes_written"] / 1048576.0, rate))
+
+
+def compare(old_file, new_file):
+    old = json.load(open(old_file))
+    new = json.load(open(new_file))
+    before = dict(((r["case"], r["stage"]), r) for r in old["results"])
+    print("%s (%s) -> %s (%s)" % (old_file, old["meta"].get("commit"), new_file, new["meta"].get("commit")))
+    print("%-16s %-10s %9s %9s %7s %10s %10s" % ("case", "stage", "old s", "new s", "ratio", "old MB", "new MB"))
+    for r in new["results"]:
+        o = before.get((r["case"], r["stage"]))
+        if o is None:
+            continue
+        print("%-16s %-10s %9.3f %9.3f %6.2fx %10.1f %10.1f" % (r["case"], r["stage"], o["seconds"], r["seconds"],
+                                                               o["seconds"] / max(r["seconds"], 1e-9),
+                                                               o["peak_rss_mb"], r["peak_rss_mb"]))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", "--sizes", type=int, nargs="*", default=[1000, 10000, 100000],
+                    help="approximate node counts of the synthetic systems")
+    ap.add_argument("--network", default="dragonfly", choices=["dragonfly", "slimfly", "fattree"],
+                    help="kind of synthetic system")
+    ap.add_argument("--no_bundled", action="store_true", help="skip the topologies in connection-data/")
+    ap.add_argument("-s", "--samples", type=int, default=10, help="samples in the synthetic csvs, one frame each")
+    ap.add_argument("-w", "--workers", type=int, default=1, help="processes writing vtp files")
+    ap.add_argument("--io_threads", type=int, default=0, help="threads writing the built vtp files to disk")
+    ap.add_argument("-f", "--formats", nargs="*", default=["vtp"], choices=["vtp", "vtkhdf"], help="output formats to time")
+    ap.add_argument("-o", "--out", help="json file to write the results to")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files instead of running")
+    ap.add_argument("--case", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(args.compare[0], args.compare[1])
+        sys.exit(0)
+
+    if args.case:
+        # child process: run one case and hand the records back on stdout
+        work_dir = tempfile.mkdtemp(prefix="netvis-bench-")
+        try:
+            records = run_case(json.loads(args.case), args.samples, args.workers, args.io_threads, args.formats,
+                               work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        sys.stdout.write("\nRESULTS " + json.dumps(records) + "\n")
+        sys.exit(0)
+
+    results = []
+    print_header()
+    for spec in case_specs(args.sizes, args.network, not args.no_bundled):
+        cmd = [sys.executable, os.path.abspath(__file__), "--case", json.dumps(spec), "-s", str(args.samples),
+               "-w", str(args.workers), "--io_threads", str(args.io_threads), "-f"] + args.formats
+        out = subprocess.check_output(cmd).decode("utf-8")
+        records = json.loads(out[out.rindex("\nRESULTS ") + len("\nRESULTS "):])
+        print_results(records)
+        results.extend(records)
+
+    if args.out:
+        f = open(args.out, "w")
+        json.dump({"meta": metadata(args), "results": results}, f, indent=1, sort_keys=True)
+        f.write("\n")
+        f.close()
+        print("wrote " + args.out)
@@ -0,0 +1,79 @@
+# per-frame cost of building the VC_Occupancy array, old InsertValue path vs StepArray
+# usage: python benchmarks/bench_step_arrays.py [-s num_samples] [gexf files...]
+import os
+import sys
+import time
+import argparse
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import vtk
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from netvis import vtkarrays
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "connection-data")
+
+
+def count_gexf_nodes(filename):
+    count = 0
+    for event, elem in ET.iterparse(filename):
+        if elem.tag.endswith("}node") or elem.tag == "node":
+            count += 1
+        elem.clear()
+    return count
+
+
+# the dict based path get_data_step used to take
+def insert_value_step(term_data, router_data, step):
+    step_arr = vtk.vtkIntArray().NewInstance()
+    step_arr.SetName("VC_Occupancy")
+    step_arr.SetNumberOfComponents(1)
+
+    for key, value in term_data.items():
+        step_arr.InsertValue(key, term_data[key][step])
+    for key, value in router_data.items():
+        step_arr.InsertValue(key, router_data[key][step])
+
+    return step_arr
+
+
+def bench_topology(filename, num_samples):
+    num_nodes = count_gexf_nodes(filename)
+    samples = vtkarrays.sample_matrix(num_nodes, num_samples)
+    samples[:] = np.random.randint(0, 200, size=samples.shape)
+
+    # the old path keyed terminals and routers in separate dicts of lists
+    half = num_nodes // 2
+    term_data = dict((i, list(samples[i])) for i in range(half))
+    router_data = dict((i, list(samples[i])) for i in range(half, num_nodes))
+
+    polydata = vtk.vtkPolyData()
+    start = time.time()
+    for i in range(num_samples):
+        polydata.GetPointData().AddArray(insert_value_step(term_data, router_data, i))
+    old = (time.time() - start) / num_samples
+
+    cur_step = vtkarrays.StepArray(samples, "VC_Occupancy")
+    polydata = vtk.vtkPolyData()
+    polydata.GetPointData().AddArray(cur_step.array)
+    start = time.time()
+    for i in range(num_samples):
+        cur_step.get_step(i)
+    new = (time.time() - start) / num_samples
+
+    print("%-16s %7d nodes  insert_value %9.1f us/frame  step_array %7.1f us/frame  (%.0fx)" %
+          (os.path.basename(filename), num_nodes, old * 1e6, new * 1e6, old / max(new, 1e-9)))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-s", "--num_samples", type=int, default=200, help="frames to time per topology")
+    ap.add_argument("graphfiles", nargs="*", help="gexf files (defaults to connection-data/*.gexf)")
+    args = ap.parse_args()
+
+    files = args.graphfiles
+    if not files:
+        files = [os.path.join(DATA_DIR, f) for f in sorted(os.listdir(DATA_DIR)) if f.endswith(".gexf")]
+    for f in files:
+        bench_topology(f, args.num_samples)
@@ -0,0 +1,134 @@
+# write throughput against file size of the vtp data modes, compressors and
+# compression levels (network.py/core-vis.py --data_mode, --compressor and
+# --compression_level) on the bundled topologies, with synthetic VC_Occupancy
+# samples. combinations the installed vtk can't do are skipped
+# usage: python benchmarks/bench_writers.py [-s samples] [--modes ...] [--compressors ...] [--levels ...] [-o results.json]
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from netvis import frames
+from netvis import network_vis
+from netvis import vtkarrays
+
+DATA_DIR = os.path.join(ROOT, "connection-data")
+# (case name, network, gexf file, routers per group, groups)
+BUNDLED = (
+    ("sfly3042", "slimfly", "sfly3042.gexf", 13, 26),
+    ("dfly3072", "dragonfly", "dfly3072.gexf", 96, 8),
+    ("ftree", "fattree", "ftree.gexf", 0, 0),
+)
+
+
+# geometry of a bundled topology, with its NodeType array
+def load_polydata(network, gexf, group_size, num_groups):
+    import networkx as nx
+
+    G = nx.read_gexf(os.path.join(DATA_DIR, gexf))
+    num_nodes, nodes, edges = network_vis.read_topology(G, network)
+    topo = network_vis.create_layout(network, num_nodes, nodes, edges, num_groups, group_size, 36)
+    polydata = network_vis.graph_polydata(num_nodes, topo["points"], topo["edges"])
+    polydata.GetPointData().AddArray(network_vis.named_array(topo["node_arr"], "NodeType"))
+    return polydata, num_nodes
+
+
+# occupancies like a real run's: most nodes idle in a given sample, the busy ones around 8
+def synthetic_samples(num_nodes, num_samples, seed=0):
+    rng = np.random.RandomState(seed)
+    samples = vtkarrays.sample_matrix(num_nodes, num_samples)
+    samples[...] = rng.poisson(8, size=samples.shape) * (rng.rand(*samples.shape) < 0.3)
+    return samples
+
+
+def dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def combinations(modes, compressors, levels):
+    for mode in modes:
+        if mode == "ascii":
+            yield mode, "none", None
+            continue
+        for compressor in compressors:
+            for level in ([None] if compressor == "none" else levels):
+                yield mode, compressor, level
+
+
+def bench_case(name, polydata, samples, combos, work_dir):
+    import vtk
+
+    cur_step = vtkarrays.StepArray(samples, "VC_Occupancy")
+    polydata.GetPointData().AddArray(cur_step.array)
+    num_samples = samples.shape[1]
+    results = []
+    for mode, compressor, level in combos:
+        options = {"data_mode": mode, "compressor": compressor, "level": level}
+        try:
+            frames.configure_writer(vtk.vtkXMLPolyDataWriter(), **options)
+        except ValueError as e:
+            print("%-10s %-7s %-6s %5s  skipped: %s" % (name, mode, compressor, level or "-", e))
+            continue
+        out_dir = os.path.join(work_dir, "%s-%s-%s" % (mode, compressor, level))
+        os.makedirs(out_dir)
+        frames.reset_array_info(polydata)
+        start = time.time()
+        frames.write_frames(polydata, os.path.join(out_dir, "frame"), num_samples, [cur_step], progress=False,
+                            writer_options=options)
+        seconds = time.time() - start
+        num_bytes = dir_bytes(out_dir)
+        shutil.rmtree(out_dir)
+        results.append({"case": name, "data_mode": mode, "compressor": compressor, "level": level,
+                        "frames": num_samples, "seconds": seconds, "bytes": num_bytes,
+                        "frames_per_s": num_samples / max(seconds, 1e-9),
+                        "mb_per_s": num_bytes / 1048576.0 / max(seconds, 1e-9)})
+        print_result(results[-1])
+    return results
+
+
+def print_result(r):
+    print("%-10s %-7s %-6s %5s %9.3f %9.1f %10.2f %9.1f" % (r["case"], r["data_mode"], r["compressor"],
+                                                            r["level"] or "-", r["seconds"], r["frames_per_s"],
+                                                            r["bytes"] / 1048576.0, r["mb_per_s"]))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-s", "--samples", type=int, default=20, help="frames written per combination")
+    ap.add_argument("--modes", nargs="*", default=["base64", "raw"], choices=frames.DATA_MODES, help="data modes to time")
+    ap.add_argument("--compressors", nargs="*", default=list(frames.COMPRESSORS), choices=frames.COMPRESSORS,
+                    help="compressors to time")
+    ap.add_argument("--levels", nargs="*", type=int, default=[1, 5, 9],
+                    help="compression levels to time, vtk's default only when the level can't be set")
+    ap.add_argument("-o", "--out", help="json file to write the results to")
+    args = ap.parse_args()
+
+    import vtk
+    levels = args.levels if hasattr(vtk.vtkXMLPolyDataWriter(), "SetCompressionLevel") else [None]
+    combos = list(combinations(args.modes, args.compressors, levels))
+
+    print("%-10s %-7s %-6s %5s %9s %9s %10s %9s" % ("case", "mode", "codec", "level", "seconds", "frames/s",
+                                                    "MB", "MB/s"))
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="netvis-bench-")
+    try:
+        for name, network, gexf, group_size, num_groups in BUNDLED:
+            polydata, num_nodes = load_polydata(network, gexf, group_size, num_groups)
+            results.extend(bench_case(name, polydata, synthetic_samples(num_nodes, args.samples), combos, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.out:
+        f = open(args.out, "w")
+        json.dump({"vtk": vtk.vtkVersion.GetVTKVersion(), "samples": args.samples, "results": results}, f, indent=1,
+                  sort_keys=True)
+        f.write("\n")
+        f.close()
+        print("wrote " + args.out)
@@ -0,0 +1,4 @@
+# helpers shared by network.py and core-vis.py, whose pipelines are in
+# network_vis.py and core_vis.py.
+# vtk and networkx take seconds to import, so they are imported inside the
+# functions that use them and the conversion, cache and stats commands never load them
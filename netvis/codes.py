@@ -0,0 +1,203 @@
+import re
+
+import numpy as np
+
+# CODES numbers every LP of a simulation in one id space: each LP group of the
+# config lists its LP types and counts, and that list is repeated `repetitions`
+# times, groups one after another. graph files use these global LP ids, while
+# the visualization numbers terminals 0 to num_terminals - 1 and routers after
+# them, both in global id order
+
+# LP layout of the bundled dragonfly graph (dfly3072.gexf) and the CODES dragonfly
+# example configs, used when no config is given
+DRAGONFLY_LPS = (("nw-lp", 8), ("modelnet_dragonfly", 4), ("modelnet_dragonfly_router", 1))
+
+OTHER = 0
+TERMINAL = 1
+ROUTER = 2
+
+
+# modelnet LPs are the network: the *_router ones routers, the rest terminals.
+# anything else (nw-lp, workload or sampling LPs) isn't part of the graph
+def lp_kind(lp_type):
+    if not lp_type.startswith("modelnet_"):
+        return OTHER
+    if lp_type.endswith("_router"):
+        return ROUTER
+    return TERMINAL
+
+
+def tokens(text):
+    text = re.sub(r"#[^\n]*", "", text)
+    return re.findall(r'"[^"]*"|[{}=;]|[^\s{}=;"]+', text)
+
+
+# the LPGROUPS section of a CODES config as [(group name, repetitions, [(lp type, count)])],
+# the LP types in the order the config lists them
+def read_lp_groups(filename):
+    f = open(filename, "r")
+    toks = tokens(f.read())
+    f.close()
+    if "LPGROUPS" not in toks:
+        raise ValueError(filename + " has no LPGROUPS section")
+    i = toks.index("LPGROUPS") + 1
+    if toks[i] != "{":
+        raise ValueError(filename + ": expected { after LPGROUPS")
+    i += 1
+
+    groups = []
+    while toks[i] != "}":
+        name = toks[i]
+        if toks[i + 1] != "{":
+            raise ValueError(filename + ": expected { after LP group " + name)
+        i += 2
+        repetitions = None
+        lp_types = []
+        while toks[i] != "}":
+            key, eq, value = toks[i:i + 3]
+            if eq != "=":
+                raise ValueError(filename + ": expected = after " + key + " in LP group " + name)
+            value = int(value.strip('"'))
+            if key == "repetitions":
+                repetitions = value
+            else:
+                lp_types.append((key, value))
+            i += 3
+            if toks[i] == ";":
+                i += 1
+        if repetitions is None:
+            raise ValueError(filename + ": LP group " + name + " has no repetitions")
+        groups.append((name, repetitions, lp_types))
+        i += 1
+    return groups
+
+
+# converts between global CODES LP ids and relative terminal/router ids, whole
+# arrays at a time. groups are (repetitions, [(lp type, count)]) in config order;
+# repetitions of None on the last group leaves the number of repetitions open,
+# num_terminals then has to be passed to the conversions.
+# ids of other LPs, or outside the layout, map to -1 both ways
+class LPMap(object):
+    def __init__(self, groups):
+        self.groups = [(reps, list(lp_types)) for reps, lp_types in groups]
+        if any(reps is None for reps, _ in self.groups[:-1]):
+            raise ValueError("only the last LP group can leave its repetitions open")
+
+        starts, sizes, reps_list, term_per, rout_per = [], [], [], [], []
+        kinds, ranks, term_pos, rout_pos = [], [], [], []
+        start = 0
+        for reps, lp_types in self.groups:
+            kind = np.concatenate([np.full(count, lp_kind(name), dtype=np.int8) for name, count in lp_types] or
+                                  [np.zeros(0, dtype=np.int8)])
+            rank = np.zeros(kind.size, dtype=np.int64)
+            for k in (TERMINAL, ROUTER):
+                rank[kind == k] = np.arange((kind == k).sum())
+            starts.append(start)
+            sizes.append(kind.size)
+            reps_list.append(-1 if reps is None else reps)
+            term_per.append(int((kind == TERMINAL).sum()))
+            rout_per.append(int((kind == ROUTER).sum()))
+            kinds.append(kind)
+            ranks.append(rank)
+            term_pos.append(np.flatnonzero(kind == TERMINAL))
+            rout_pos.append(np.flatnonzero(kind == ROUTER))
+            if reps is not None:
+                start += reps * kind.size
+
+        self.starts = np.array(starts, dtype=np.int64)
+        self.sizes = np.array(sizes, dtype=np.int64)
+        self.reps = np.array(reps_list, dtype=np.int64)
+        self.term_per = np.array(term_per, dtype=np.int64)
+        self.rout_per = np.array(rout_per, dtype=np.int64)
+        # one rep of every group, back to back, indexed by table_starts[group] + position
+        self.table_starts = np.concatenate([[0], np.cumsum(self.sizes)[:-1]]).astype(np.int64)
+        self.kind_table = np.concatenate(kinds)
+        self.rank_table = np.concatenate(ranks)
+        self.term_table = np.concatenate(term_pos).astype(np.int64)
+        self.rout_table = np.concatenate(rout_pos).astype(np.int64)
+        self.term_table_starts = np.concatenate([[0], np.cumsum(self.term_per)[:-1]]).astype(np.int64)
+        self.rout_table_starts = np.concatenate([[0], np.cumsum(self.rout_per)[:-1]]).astype(np.int64)
+        # relative ids of the first terminal and router of each group, counted within their kind
+        full = np.where(self.reps >= 0, self.reps, 0)
+        self.term_before = np.concatenate([[0], np.cumsum(full * self.term_per)[:-1]]).astype(np.int64)
+        self.rout_before = np.concatenate([[0], np.cumsum(full * self.rout_per)[:-1]]).astype(np.int64)
+
+    @classmethod
+    def from_config(cls, filename):
+        return cls([(reps, lp_types) for _, reps, lp_types in read_lp_groups(filename)])
+
+    # one group of lp_types, e.g. DRAGONFLY_LPS, repeated as often as the graph needs
+    @classmethod
+    def from_lp_types(cls, lp_types, repetitions=None):
+        return cls([(repetitions, lp_types)])
+
+    @property
+    def open_ended(self):
+        return bool(self.reps[-1] < 0)
+
+    @property
+    def num_terminals(self):
+        return None if self.open_ended else int((self.reps * self.term_per).sum())
+
+    @property
+    def num_routers(self):
+        return None if self.open_ended else int((self.reps * self.rout_per).sum())
+
+    def terminal_count(self, num_terminals):
+        if num_terminals is None:
+            num_terminals = self.num_terminals
+        if num_terminals is None:
+            raise ValueError("the LP layout has open repetitions, num_terminals is needed")
+        return num_terminals
+
+    # LP kind (OTHER, TERMINAL or ROUTER) of each global id
+    def kinds(self, global_ids):
+        return self.locate(global_ids)[0]
+
+    # kind, group, repetition and rank within the repetition's LPs of that kind
+    def locate(self, global_ids):
+        ids = np.asarray(global_ids, dtype=np.int64)
+        group = np.maximum(np.searchsorted(self.starts, ids, side="right") - 1, 0)
+        local = ids - self.starts[group]
+        size = np.maximum(self.sizes[group], 1)
+        rep = local // size
+        pos = local % size
+        valid = (ids >= 0) & (self.sizes[group] > 0) & ((self.reps[group] < 0) | (rep < self.reps[group]))
+        idx = np.where(valid, self.table_starts[group] + pos, 0)
+        kind = np.where(valid, self.kind_table[idx] if self.kind_table.size else 0, OTHER).astype(np.int8)
+        rank = np.where(valid, self.rank_table[idx] if self.rank_table.size else 0, 0)
+        return kind, group, rep, rank
+
+    # relative ids: terminals 0 to num_terminals - 1, routers num_terminals and up
+    def to_relative(self, global_ids, num_terminals=None):
+        num_terminals = self.terminal_count(num_terminals)
+        kind, group, rep, rank = self.locate(global_ids)
+        terminal = self.term_before[group] + rep * self.term_per[group] + rank
+        router = num_terminals + self.rout_before[group] + rep * self.rout_per[group] + rank
+        return np.where(kind == TERMINAL, terminal, np.where(kind == ROUTER, router, -1))
+
+    # global LP ids of relative ids, the inverse of to_relative
+    def to_global(self, relative_ids, num_terminals=None):
+        num_terminals = self.terminal_count(num_terminals)
+        ids = np.asarray(relative_ids, dtype=np.int64)
+        is_router = ids >= num_terminals
+        terms = self.from_rank(np.where(is_router, -1, ids), self.term_before, self.term_per, self.term_table,
+                               self.term_table_starts)
+        routs = self.from_rank(np.where(is_router, ids - num_terminals, -1), self.rout_before, self.rout_per,
+                               self.rout_table, self.rout_table_starts)
+        return np.where(is_router, routs, terms)
+
+    # global ids of the n-th LPs of one kind, given that kind's per group counts and positions
+    def from_rank(self, n, before, per, table, table_starts):
+        # groups without LPs of this kind share their start with the next group, side="right"
+        # picks the last group starting at or before n, skipping the empty ones
+        has = np.flatnonzero(per > 0)
+        if has.size == 0:
+            return np.full(n.shape, -1, dtype=np.int64)
+        g = has[np.maximum(np.searchsorted(before[has], n, side="right") - 1, 0)]
+        local = n - before[g]
+        rep = local // per[g]
+        k = local % per[g]
+        valid = (n >= 0) & ((self.reps[g] < 0) | (rep < self.reps[g]))
+        pos = table[np.where(valid, table_starts[g] + k, 0)]
+        return np.where(valid, self.starts[g] + rep * self.sizes[g] + pos, -1)
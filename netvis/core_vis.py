@@ -0,0 +1,213 @@
+import argparse
+import sys
+import numpy as np
+from netvis import sampling
+from netvis import layout
+from netvis import vtkarrays
+from netvis import vtkhdf
+from netvis import simfile
+from netvis import delta
+from netvis import frames
+
+
+def build_parser():
+    ap = argparse.ArgumentParser()
+    #ap.add_argument("-l", "--neuron_config_lua", required=False, help="neuron config file (lua)")
+    #ap.add_argument("-n", "--neuron_config", required=False, help="neuron config file (converted to adjacency list)")
+    ap.add_argument("-f", "--core_data", required=True, help="data for core (probably called mpi-sampling-stats), or the same data converted with python -m netvis.simfile")
+    ap.add_argument("-c", "--num_cores", required=True, help="number of cores on chip to visualize")
+    ap.add_argument("--row_width", required=False, default=64, help="cores per row of the chip grid")
+    ap.add_argument("-w", "--workers", required=False, default=1, help="number of processes writing vtp files")
+    frames.add_writer_args(ap)
+    highlight = ap.add_mutually_exclusive_group()
+    highlight.add_argument("--highlight", required=False, default="2",
+                           help="comma separated ids of the cores to mark with a glyph, written to sphere*.vtp")
+    highlight.add_argument("--top_k", required=False, type=int,
+                           help="mark the k cores with the most sends over the whole run instead of --highlight")
+    ap.add_argument("-o", "--output_format", required=False, default="vtp", choices=["vtp", "vtkhdf", "vtpchunk"],
+                    help="vtp writes one file per sample, vtkhdf writes the geometry once plus every sample's arrays to a single file, "
+                         "vtpchunk writes --chunk_steps samples per vtp file plus a .chunks.json index of them")
+    ap.add_argument("--chunk_steps", required=False, default=64, help="samples per file of vtpchunk output")
+    ap.add_argument("--skip_unchanged", action="store_true",
+                    help="don't write frames equal to the frame before, core.pvd and sphere.pvd map every time to the frame holding it")
+    ap.add_argument("--delta", action="store_true",
+                    help="write only the first frames plus .delta.npz sidecars of the values that change each step, "
+                         "expanded with python -m netvis.delta")
+    return ap
+
+
+####
+# turns out I don't need NeMo config file for core-level vis
+# saving just in case I need this code for NN layered vis
+#def read_config(filename):
+#    cores = 0
+#    neurons_per_core = 0
+#    i = 0
+#
+#    out_file = filename + ".adj"
+#    out = open(out_file, "w")
+#
+#    f = open(filename, "r")
+#    for line in f:
+#        neuron_flag = False
+#        if i == 0:
+#            cores = int(line.split("=")[1].strip())
+#        elif i == 1:
+#            neurons_per_core = int(line.split("=")[1].strip())
+#        elif i == 2:
+#            pass
+#        elif i == 3:
+#            neuron_flag = True
+#            raw_neuron = line.split("{", 1)[1].split("{", 1)[1].strip()
+#            print (raw_neuron)
+#        else:
+#            neuron_flag = True
+#            raw_neuron = line.split("{", 1)[1].strip()
+#        i += 1
+#
+#        if neuron_flag:
+#            tokens = raw_neuron.split(",", 3)
+#            coreid = int(tokens[1].split("=")[1].strip())
+#            localid = int(tokens[2].split("=")[1].strip())
+#            globalid = coreid * neurons_per_core + localid
+#
+#            connections = tokens[3].split("{")[1].split("}")[0].strip().split(",")
+#
+#            out.write(str(globalid) + " ")
+#
+#            out.write("\n")
+#
+#    return cores, neurons_per_core
+
+#if "neuron_config_lua" in args:
+#    read_config(args["neuron_config_lua"])
+
+
+# (num_cores, 3) coordinates of the cores, row_width cores per row, spacing apart.
+# rows go up in y starting one spacing above the x axis
+def create_core_grid(num_cores, row_width=64, spacing=10):
+    ids = np.arange(num_cores)
+    grid = np.zeros((num_cores, 3), dtype=np.float32)
+    grid[:, 0] = spacing * (ids % row_width)
+    grid[:, 1] = spacing * (ids // row_width + 1)
+    return grid
+
+
+# ids of the cores to mark with glyphs: the --top_k busiest over the run (ties go
+# to the lower id), or the --highlight list
+def highlight_cores(samples, args):
+    num_cores = samples.shape[0]
+    if args["top_k"] is not None:
+        totals = samples.sum(axis=1, dtype=np.int64)
+        return np.sort(np.argsort(-totals, kind="mergesort")[:max(0, args["top_k"])])
+    try:
+        cores = np.array([int(c) for c in args["highlight"].split(",") if c.strip()], dtype=np.int64)
+    except ValueError:
+        sys.exit("ERROR: --highlight takes comma separated core ids, got " + args["highlight"])
+    if np.any((cores < 0) | (cores >= num_cores)):
+        sys.exit("ERROR: --highlight core ids have to be between 0 and " + str(num_cores - 1))
+    return cores
+
+
+# (num_cores, num_samples) sample matrix of the NumSends of each core, from an
+# mpi-sampling-stats file or the same data converted with python -m netvis.simfile
+def read_core_samples(filename, num_cores):
+    if simfile.is_simfile(filename):
+        # memory mapped, each step is read when it is written out
+        return simfile.read_mpi_stats(filename, num_cores)
+    samples, _, _ = sampling.read_mpi_array(filename, num_cores)
+    return samples, samples.shape[1]
+
+
+# polydata of vertices at points, without edges
+def points_polydata(points):
+    import vtk
+
+    graph = vtk.vtkMutableUndirectedGraph()
+    graph.SetNumberOfVertices(len(points))
+    graph.SetPoints(layout.points_from_array(points))
+
+    geom = vtk.vtkGraphToPolyData()
+    geom.SetInputData(graph)
+    geom.Update()
+    return geom.GetOutput()
+
+
+# steps of samples to write a frame for. with --delta only the first, the rest go to
+# prefix.delta.npz, with --skip_unchanged the ones that differ from the step before,
+# indexed by prefix.pvd
+def frame_steps(prefix, samples, num_samples, args):
+    times = np.arange(num_samples)
+    if args["delta"]:
+        delta.write_deltas(prefix + ".delta.npz", [("NumSends", samples, "point")], times)
+        return set([0])
+    if args["skip_unchanged"]:
+        changed = delta.changed_steps([samples], num_samples)
+        frames.write_pvd(prefix + ".pvd", times, [prefix + str(i) + ".vtp" for i in delta.frame_of_step(changed)])
+        return set(np.flatnonzero(changed).tolist())
+    return set(range(num_samples))
+
+
+def main(argv=None):
+    args = vars(build_parser().parse_args(argv))
+    if (args["skip_unchanged"] or args["delta"]) and args["output_format"] != "vtp":
+        sys.exit("ERROR: --skip_unchanged and --delta need vtp output")
+    writer_options = None
+    if args["output_format"] != "vtkhdf":
+        try:
+            writer_options = frames.writer_options(args)
+        except ValueError as e:
+            sys.exit("ERROR: " + str(e))
+
+    num_cores = int(args["num_cores"])
+    row_width = int(args["row_width"])
+    core_samples, num_samples = read_core_samples(args["core_data"], num_cores)
+
+    grid = create_core_grid(num_cores, row_width)
+    polydata = points_polydata(grid)
+
+    # all highlighted cores go in one glyph polydata, sitting on their cores
+    from vtk.util import numpy_support
+    cores = highlight_cores(core_samples, args)
+    sphere_poly = points_polydata(grid[cores])
+    core_ids = numpy_support.numpy_to_vtk(cores.astype(np.int32), deep=1)
+    core_ids.SetName("CoreId")
+    sphere_poly.GetPointData().AddArray(core_ids)
+
+    if args["output_format"] == "vtkhdf":
+        times = np.arange(num_samples)
+        writer = vtkhdf.TransientPolyDataWriter("core-vtp/core.vtkhdf", polydata, ["NumSends"])
+        writer.add_steps(times, {"NumSends": core_samples})
+        writer.close()
+
+        sphere_writer = vtkhdf.TransientPolyDataWriter("core-vtp/sphere.vtkhdf", sphere_poly, ["NumSends"],
+                                                     static_arrays={"CoreId": cores.astype(np.int32)})
+        sphere_writer.add_steps(times, {"NumSends": core_samples[cores]})
+        sphere_writer.close()
+    elif args["output_format"] == "vtpchunk":
+        times = np.arange(num_samples)
+        frames.write_chunks(polydata, "core-vtp/core", times, [("NumSends", core_samples)],
+                            chunk_steps=int(args["chunk_steps"]), writer_options=writer_options)
+        frames.write_chunks(sphere_poly, "core-vtp/sphere", times, [("NumSends", core_samples[cores])],
+                            chunk_steps=int(args["chunk_steps"]), writer_options=writer_options)
+    else:
+        # each series has one step array pointed at each step in turn
+        cur_step = vtkarrays.StepArray(core_samples, "NumSends")
+        polydata.GetPointData().AddArray(cur_step.array)
+        steps = sorted(frame_steps("core-vtp/core", core_samples, num_samples, args))
+        frames.write_frames(polydata, "core-vtp/core", num_samples, [cur_step], int(args["workers"]), steps=steps,
+                            writer_options=writer_options)
+
+        # the glyphs gather their cores' values out of the full matrix each step
+        sphere_step = vtkarrays.StepArray(core_samples, "NumSends", rows=cores)
+        sphere_poly.GetPointData().AddArray(sphere_step.array)
+        if args["skip_unchanged"] or args["delta"]:
+            steps = sorted(frame_steps("core-vtp/sphere", core_samples[cores], num_samples, args))
+        else:
+            steps = range(num_samples)
+        frames.write_frames(sphere_poly, "core-vtp/sphere", num_samples, [sphere_step], int(args["workers"]),
+                            steps=steps, writer_options=writer_options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from netvis import frames
+
+# change detection between consecutive steps, and sparse delta sidecars.
+# a sidecar is an npz file holding, for every step array written with it:
+#   <name>.base     the values of step 0, flattened (num_points * num_components)
+#   <name>.shape    shape of one step, (num_points,) or (num_points, num_components)
+#   <name>.offsets  (num_steps + 1) start of each step's changes, step 0 has none
+#   <name>.indices  flat index of every changed value
+#   <name>.values   new value of every changed value
+# plus "names", "kinds" (point or cell data) and "times".
+# expand_vtp or python -m netvis.delta turn one back into vtp frames
+
+# consecutive steps compared at once, bounds the size of the temporary mask
+BLOCK_STEPS = 256
+
+
+# (num_steps, num_points * num_components) view of a sample matrix or channel
+# matrix, a copy only for other layouts
+def step_view(samples):
+    steps = np.moveaxis(samples, 1, 0)
+    return steps.reshape(steps.shape[0], -1)
+
+
+# True for every step that differs from the step before it in any of arrays.
+# step 0 is always True
+def changed_steps(arrays, num_steps, block_steps=BLOCK_STEPS):
+    changed = np.zeros(num_steps, dtype=bool)
+    changed[:1] = True
+    for samples in arrays:
+        steps = step_view(samples)
+        for start in range(1, num_steps, block_steps):
+            end = min(start + block_steps, num_steps)
+            changed[start:end] |= (steps[start:end] != steps[start - 1:end - 1]).any(axis=1)
+    return changed
+
+
+# the step whose frame holds the values of each step, the last changed step
+def frame_of_step(changed):
+    return np.maximum.accumulate(np.where(changed, np.arange(len(changed)), 0))
+
+
+# changed indices and values of steps 1 and up of one array
+def sparse_deltas(samples, block_steps=BLOCK_STEPS):
+    steps = step_view(samples)
+    num_steps = steps.shape[0]
+    index_dtype = np.int32 if steps.shape[1] < np.iinfo(np.int32).max else np.int64
+    counts = np.zeros(num_steps, dtype=np.int64)
+    indices = []
+    values = []
+    for start in range(1, num_steps, block_steps):
+        end = min(start + block_steps, num_steps)
+        block = steps[start:end]
+        mask = block != steps[start - 1:end - 1]
+        step_idx, flat_idx = np.nonzero(mask)
+        counts[start:end] = np.bincount(step_idx, minlength=end - start)
+        indices.append(flat_idx.astype(index_dtype))
+        values.append(block[mask])
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    if not indices:
+        return offsets, np.zeros(0, dtype=index_dtype), np.zeros(0, dtype=samples.dtype)
+    return offsets, np.concatenate(indices), np.concatenate(values)
+
+
+# arrays is a list of (name, samples, kind) with kind "point" or "cell"
+def write_deltas(filename, arrays, times):
+    # unicode so the names read back the same under python 2 and 3
+    out = {"names": np.array([name for name, _, _ in arrays]).astype("U"),
+           "kinds": np.array([kind for _, _, kind in arrays]).astype("U"),
+           "times": np.asarray(times, dtype=np.float64)}
+    for name, samples, kind in arrays:
+        offsets, indices, values = sparse_deltas(samples)
+        out[name + ".base"] = step_view(samples)[0]
+        out[name + ".shape"] = np.array((samples.shape[0],) + samples.shape[2:], dtype=np.int64)
+        out[name + ".offsets"] = offsets
+        out[name + ".indices"] = indices
+        out[name + ".values"] = values
+    f = open(filename, "wb")
+    np.savez_compressed(f, **out)
+    f.close()
+
+
+class DeltaFile(object):
+    def __init__(self, filename):
+        self.data = np.load(filename)
+        self.names = [str(name) for name in self.data["names"]]
+        self.kinds = dict(zip(self.names, [str(kind) for kind in self.data["kinds"]]))
+        self.times = self.data["times"]
+
+    @property
+    def num_steps(self):
+        return len(self.times)
+
+    # yields the full values of every step of an array, in order.
+    # the same buffer is updated in place and handed back every time
+    def iter_steps(self, name):
+        shape = tuple(self.data[name + ".shape"])
+        offsets = self.data[name + ".offsets"]
+        indices = self.data[name + ".indices"]
+        values = self.data[name + ".values"]
+        cur = self.data[name + ".base"].copy()
+        for step in range(self.num_steps):
+            start, end = offsets[step], offsets[step + 1]
+            cur[indices[start:end]] = values[start:end]
+            yield cur.reshape(shape)
+
+
+# write filename_out + str(i) + ".vtp" for every step of a sidecar, using the
+# geometry and arrays of base_vtp (normally the step 0 frame written with the sidecar).
+# writer_options are frames.configure_writer arguments
+def expand_vtp(sidecar, base_vtp, filename_out, writer_options=None):
+    import vtk
+    from vtk.util import numpy_support
+
+    deltas = DeltaFile(sidecar)
+    reader = vtk.vtkXMLPolyDataReader()
+    reader.SetFileName(base_vtp)
+    reader.Update()
+    polydata = reader.GetOutput()
+
+    targets = []
+    for name in deltas.names:
+        data = polydata.GetCellData() if deltas.kinds[name] == "cell" else polydata.GetPointData()
+        array = data.GetArray(name)
+        if array is None:
+            raise ValueError(base_vtp + " has no " + name + " array")
+        targets.append((array, numpy_support.vtk_to_numpy(array), deltas.iter_steps(name)))
+
+    writer = vtk.vtkXMLPolyDataWriter()
+    if writer_options is not None:
+        frames.configure_writer(writer, **writer_options)
+    for step in range(deltas.num_steps):
+        for array, view, steps in targets:
+            view[...] = next(steps).reshape(view.shape)
+            array.Modified()
+        writer.SetFileName(filename_out + str(step) + ".vtp")
+        writer.SetInputData(polydata)
+        writer.Write()
+    return deltas.num_steps
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="expand a delta sidecar written with --delta into full vtp frames")
+    ap.add_argument("sidecar", help="the .delta.npz file")
+    ap.add_argument("base_vtp", help="frame the sidecar was written with (step 0)")
+    ap.add_argument("out", help="prefix of the frames to write, the step number and .vtp are appended")
+    frames.add_writer_args(ap)
+    args = vars(ap.parse_args(argv))
+    try:
+        writer_options = frames.writer_options(args)
+    except ValueError as e:
+        sys.exit("ERROR: " + str(e))
+    out_dir = os.path.dirname(args["out"])
+    if out_dir and not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    num_steps = expand_vtp(args["sidecar"], args["base_vtp"], args["out"], writer_options)
+    print("wrote " + str(num_steps) + " frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+import os
+import sys
+import json
+import time
+import multiprocessing
+
+import numpy as np
+
+from netvis import pipeline
+from netvis import sampling
+from netvis import trace
+
+# state shared with forked workers, set right before the pool starts so the
+# polydata and sample matrix are inherited instead of pickled
+_frame_state = {}
+
+
+def fork_context():
+    if hasattr(multiprocessing, "get_context"):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return None
+        return multiprocessing.get_context("fork")
+    if sys.platform.startswith("win"):
+        return None
+    return multiprocessing
+
+
+# how the arrays are stored in the vtp files: appended after the xml as base64
+# (vtk's default) or raw bytes, base64 inside each DataArray, or ascii text
+DATA_MODES = ("base64", "raw", "inline", "ascii")
+# compressors of the binary modes, lzma and the level need vtk 9
+COMPRESSORS = ("none", "zlib", "lz4", "lzma")
+
+
+def add_writer_args(ap):
+    ap.add_argument("--data_mode", required=False, default="base64", choices=DATA_MODES,
+                    help="how vtp files store their arrays: appended base64, appended raw binary (smallest, fastest), "
+                         "base64 inside each array, or ascii")
+    ap.add_argument("--compressor", required=False, default="zlib", choices=COMPRESSORS,
+                    help="compressor of the vtp arrays in the binary data modes, lz4 is fastest, lzma smallest")
+    ap.add_argument("--compression_level", required=False,
+                    help="1 (fastest) to 9 (smallest), vtk's default when not given")
+
+
+# writer settings from the add_writer_args options. raises ValueError for ones
+# this vtk can't do, so they're caught before any frame is written
+def writer_options(args):
+    level = args["compression_level"]
+    options = {"data_mode": args["data_mode"], "compressor": args["compressor"],
+               "level": None if level is None else int(level)}
+    import vtk
+    configure_writer(vtk.vtkXMLPolyDataWriter(), **options)
+    return options
+
+
+def configure_writer(writer, data_mode="base64", compressor="zlib", level=None):
+    if data_mode == "ascii":
+        writer.SetDataModeToAscii()
+    elif data_mode == "inline":
+        writer.SetDataModeToBinary()
+    else:
+        writer.SetDataModeToAppended()
+        writer.SetEncodeAppendedData(data_mode != "raw")
+    setter = "SetCompressorTypeTo" + {"none": "None", "zlib": "ZLib", "lz4": "LZ4", "lzma": "LZMA"}[compressor]
+    if not hasattr(writer, setter):
+        raise ValueError("this vtk (" + writer.GetClassName() + ") has no " + compressor + " compressor")
+    getattr(writer, setter)()
+    if level is not None:
+        if not hasattr(writer, "SetCompressionLevel"):
+            raise ValueError("this vtk can't set the compression level")
+        if not 1 <= level <= 9:
+            raise ValueError("the compression level has to be between 1 and 9")
+        writer.SetCompressionLevel(level)
+
+
+# split [first, num_steps) into contiguous ranges, a few per worker so progress stays smooth
+def step_ranges(first, num_steps, num_workers, ranges_per_worker=4):
+    chunk = max(1, -(-(num_steps - first) // (num_workers * ranges_per_worker)))
+    return [(start, min(start + chunk, num_steps)) for start in range(first, num_steps, chunk)]
+
+
+# bounds are positions in _frame_state["steps"].
+# with io_threads each frame is built in memory and written to disk by io, a
+# pipeline.FileWriter, while the next frame is built. ranges run by forked
+# workers make their own
+def write_step_range(bounds, io=None):
+    import vtk
+
+    start, end = bounds
+    polydata = _frame_state["polydata"]
+    ready = _frame_state["ready"]
+    own_io = io is None and _frame_state["io_threads"] > 0
+    if own_io:
+        io = pipeline.FileWriter(_frame_state["io_threads"], _frame_state["max_frames"])
+    writer = vtk.vtkXMLPolyDataWriter()
+    if _frame_state["writer_options"] is not None:
+        configure_writer(writer, **_frame_state["writer_options"])
+    if io is not None:
+        writer.WriteToOutputStringOn()
+    try:
+        for i in _frame_state["steps"][start:end]:
+            if ready is not None:
+                ready(i)
+            for step_arr in _frame_state["step_arrays"]:
+                step_arr.get_step(i)
+            filename = _frame_state["filename_out"] + str(i) + ".vtp"
+            writer.SetInputData(polydata)
+            if io is None:
+                writer.SetFileName(filename)
+                writer.Write()
+            else:
+                writer.Write()
+                io.put(filename, writer.GetOutputString())
+    finally:
+        if own_io:
+            io.close()
+    return end - start
+
+
+# forget the ranges vtk caches in the information of the arrays on a write, which
+# every frame after the first includes. the next write then matches a first write
+def reset_array_info(polydata):
+    arrays = [polydata.GetPoints().GetData()] if polydata.GetPoints() is not None else []
+    for data in (polydata.GetPointData(), polydata.GetCellData()):
+        arrays += [data.GetAbstractArray(i) for i in range(data.GetNumberOfArrays())]
+    for arr in arrays:
+        if arr.HasInformation():
+            arr.GetInformation().Clear()
+
+
+def print_progress(done, total, start_time):
+    elapsed = max(time.time() - start_time, 1e-9)
+    sys.stdout.write("\rwrote %d/%d frames (%.1f frames/s)" % (done, total, done / elapsed))
+    if done == total:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+# write filename_out + str(i) + ".vtp" for every step i, or only for the steps
+# listed in steps.
+# step_arrays are vtkarrays.StepArray objects already attached to polydata.
+# with more than one worker the step ranges are written by forked processes,
+# each with its own writer, and progress is reported in step order.
+# io_threads threads write the finished frames to disk, with at most max_frames
+# of them waiting in memory. ready(i), if given, blocks until step i's data is
+# there, for frames written while the samples are still being read.
+# writer_options are configure_writer arguments, vtk's defaults when None
+def write_frames(polydata, filename_out, num_steps, step_arrays=(), num_workers=1, progress=True, steps=None,
+                 io_threads=0, max_frames=16, ready=None, writer_options=None):
+    if steps is None:
+        steps = range(num_steps)
+    _frame_state["polydata"] = polydata
+    _frame_state["filename_out"] = filename_out
+    _frame_state["step_arrays"] = list(step_arrays)
+    _frame_state["steps"] = [int(i) for i in steps]
+    _frame_state["io_threads"] = io_threads
+    _frame_state["max_frames"] = max_frames
+    _frame_state["ready"] = ready
+    _frame_state["writer_options"] = writer_options
+    num_steps = len(_frame_state["steps"])
+    if ready is not None and num_workers > 1:
+        raise ValueError("frames can't wait for their data with more than one worker process")
+
+    ctx = fork_context()
+    if num_workers > 1 and ctx is None:
+        print("WARNING: fork is not available, writing frames with one process")
+        num_workers = 1
+
+    start_time = time.time()
+    done = 0
+    try:
+        if num_workers <= 1:
+            io = None
+            if io_threads > 0:
+                io = pipeline.FileWriter(io_threads, max_frames)
+            # frames waiting for data report progress one at a time
+            ranges_per_worker = max(1, num_steps) if ready is not None else 4
+            try:
+                for bounds in step_ranges(0, num_steps, 1, ranges_per_worker):
+                    count = write_step_range(bounds, io)
+                    done += count
+                    trace.add("frames", count)
+                    if progress:
+                        print_progress(done, num_steps, start_time)
+            finally:
+                if io is not None:
+                    io.close()
+        else:
+            # the first write caches array ranges in the polydata's vtkInformation,
+            # which later frames then include. write it before forking so every
+            # worker starts from the same state as the serial path
+            done += write_step_range((0, min(1, num_steps)))
+            trace.add("frames", done)
+            pool = ctx.Pool(num_workers)
+            try:
+                for count in pool.imap(write_step_range, step_ranges(done, num_steps, num_workers)):
+                    done += count
+                    trace.add("frames", count)
+                    if progress:
+                        print_progress(done, num_steps, start_time)
+                pool.close()
+            except:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+    finally:
+        _frame_state.clear()
+
+
+# ParaView collection listing files[i] at times[i]. file names are made relative
+# to the collection, so several times can share one file
+def write_pvd(filename, times, files):
+    pvd_dir = os.path.dirname(filename)
+    f = open(filename, "w")
+    f.write('<?xml version="1.0"?>\n')
+    f.write('<VTKFile type="Collection" version="0.1">\n')
+    f.write('  <Collection>\n')
+    for t, name in zip(times, files):
+        f.write('    <DataSet timestep="%s" part="0" file="%s"/>\n' % (repr(float(t)), os.path.relpath(name, pvd_dir or ".")))
+    f.write('  </Collection>\n')
+    f.write('</VTKFile>\n')
+    f.close()
+
+
+# vtk copy of one step of a sample matrix or channel matrix
+def step_vtk_array(samples, step, name, component_names=None):
+    from vtk.util import numpy_support
+
+    arr = numpy_support.numpy_to_vtk(np.ascontiguousarray(samples[:, step]), deep=1)
+    arr.SetName(name)
+    for i, component in enumerate(component_names or []):
+        arr.SetComponentName(i, component)
+    return arr
+
+
+# name of the array holding step of array name in a chunk file
+def chunk_array_name(name, step):
+    return name + "_" + str(step)
+
+
+# chunked output: chunk_steps consecutive steps per vtp file instead of one file
+# per step. each chunk file (filename_out + "_chunk" + str(c) + ".vtp") holds the
+# geometry and static arrays of polydata once, plus every step's point_steps and
+# cell_steps arrays named chunk_array_name(name, step) and the chunk's steps and
+# times as Steps and Times field data. filename_out + ".chunks.json" indexes
+# them, read it with ChunkIndex.
+# point_steps and cell_steps are (name, samples) lists like the step arrays of
+# write_frames. in the raw appended data mode a reader only seeks to the arrays
+# it asks for, so a chunk costs one file open per step read
+def write_chunks(polydata, filename_out, times, point_steps, cell_steps=(), chunk_steps=64, component_names=None,
+                 progress=True, writer_options=None):
+    import vtk
+
+    num_steps = len(times)
+    chunk_steps = max(1, chunk_steps)
+    writer = vtk.vtkXMLPolyDataWriter()
+    if writer_options is not None:
+        configure_writer(writer, **writer_options)
+
+    files = []
+    start_time = time.time()
+    for first in range(0, num_steps, chunk_steps):
+        steps = range(first, min(first + chunk_steps, num_steps))
+        # a shallow copy shares the geometry and static arrays but gets its own array lists
+        chunk = vtk.vtkPolyData()
+        chunk.ShallowCopy(polydata)
+        for data, step_data in ((chunk.GetPointData(), point_steps), (chunk.GetCellData(), cell_steps)):
+            for name, samples in step_data:
+                names = component_names if samples.ndim == 3 else None
+                for i in steps:
+                    data.AddArray(step_vtk_array(samples, i, chunk_array_name(name, i), names))
+        field = chunk.GetFieldData()
+        field.AddArray(step_vtk_array(np.array(steps, dtype=np.int64)[:, np.newaxis], 0, "Steps"))
+        field.AddArray(step_vtk_array(np.asarray(times, dtype=np.float64)[first:steps[-1] + 1, np.newaxis], 0, "Times"))
+
+        filename = filename_out + "_chunk" + str(len(files)) + ".vtp"
+        writer.SetFileName(filename)
+        writer.SetInputData(chunk)
+        writer.Write()
+        files.append(filename)
+        trace.add("frames", len(steps))
+        if progress:
+            print_progress(steps[-1] + 1, num_steps, start_time)
+
+    index_dir = os.path.dirname(filename_out)
+    index = {
+        "chunk_steps": chunk_steps,
+        "times": [float(t) for t in times],
+        "point_arrays": [name for name, _ in point_steps],
+        "cell_arrays": [name for name, _ in cell_steps],
+        "files": [os.path.relpath(name, index_dir or ".") for name in files],
+    }
+    f = open(filename_out + ".chunks.json", "w")
+    json.dump(index, f, indent=1, sort_keys=True)
+    f.write("\n")
+    f.close()
+    return files
+
+
+# random access to the steps of a write_chunks index
+class ChunkIndex(object):
+    def __init__(self, filename):
+        f = open(filename, "r")
+        self.index = json.load(f)
+        f.close()
+        self.dir = os.path.dirname(filename)
+        self.chunk_steps = self.index["chunk_steps"]
+        self.times = self.index["times"]
+
+    @property
+    def num_steps(self):
+        return len(self.times)
+
+    # the chunk file holding step
+    def chunk_file(self, step):
+        if not 0 <= step < self.num_steps:
+            raise IndexError("step " + str(step) + " is not between 0 and " + str(self.num_steps - 1))
+        return os.path.join(self.dir, self.index["files"][step // self.chunk_steps])
+
+    # polydata of one step: the geometry and static arrays plus that step's arrays
+    # under their plain names. the other steps' arrays of the chunk aren't read
+    def read_step(self, step):
+        import vtk
+
+        reader = vtk.vtkXMLPolyDataReader()
+        reader.SetFileName(self.chunk_file(step))
+        reader.UpdateInformation()
+        first = step - step % self.chunk_steps
+        chunk = range(first, min(first + self.chunk_steps, self.num_steps))
+        for names, count, get_name, set_status in (
+                (self.index["point_arrays"], reader.GetNumberOfPointArrays(), reader.GetPointArrayName,
+                 reader.SetPointArrayStatus),
+                (self.index["cell_arrays"], reader.GetNumberOfCellArrays(), reader.GetCellArrayName,
+                 reader.SetCellArrayStatus)):
+            step_names = set(chunk_array_name(name, i) for name in names for i in chunk)
+            wanted = set(chunk_array_name(name, step) for name in names)
+            for i in range(count):
+                name = get_name(i)
+                set_status(name, int(name not in step_names or name in wanted))
+        reader.Update()
+
+        polydata = reader.GetOutput()
+        for names, data in ((self.index["point_arrays"], polydata.GetPointData()),
+                            (self.index["cell_arrays"], polydata.GetCellData())):
+            for name in names:
+                data.GetAbstractArray(chunk_array_name(name, step)).SetName(name)
+        return polydata
+
+
+# write frames from a sampling.SampleStream as its samples complete, polling the
+# sampling files every poll_interval seconds. step_array is a StepArray over
+# stream.ring attached to polydata. if no new rows show up for idle_timeout
+# seconds the simulation is assumed to be done and the remaining samples are written
+def follow_frames(stream, polydata, filename_out, step_array, poll_interval=1.0, idle_timeout=600.0, progress=True,
+                  writer_options=None):
+    import vtk
+
+    writer = vtk.vtkXMLPolyDataWriter()
+    if writer_options is not None:
+        configure_writer(writer, **writer_options)
+    start_time = time.time()
+    last_rows = time.time()
+    try:
+        while not stream.done():
+            if stream.update() > 0:
+                last_rows = time.time()
+            flush = time.time() - last_rows > idle_timeout
+            for step in stream.complete_steps(flush):
+                # the ring is replaced when the stream grows its window
+                step_array.samples = stream.ring
+                step_array.get_step(step % stream.window)
+                writer.SetFileName(filename_out + str(step) + ".vtp")
+                writer.SetInputData(polydata)
+                writer.Write()
+                trace.add("frames", 1)
+                if progress:
+                    print_progress(step + 1, stream.num_samples, start_time)
+            if not stream.done():
+                time.sleep(poll_interval)
+    finally:
+        stream.close()
+    if stream.dropped:
+        print("WARNING: " + str(stream.dropped) + " rows arrived after their sample was written and were skipped")
+    for follower in stream.followers:
+        sampling.warn_outside(follower.filename, stream.outside.get(follower.filename, 0), follower.num_nodes)
@@ -0,0 +1,286 @@
+# analytical dragonfly, slimfly and fat-tree generators.
+# each returns (node_type, indptr, indices): the topology.NodeIndex node types and
+# a symmetric CSR adjacency, with ids in the same convention the GEXF path uses
+# after conversion (terminals first, then routers / switches by group or level)
+import os
+import sys
+import time
+import argparse
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from netvis import topology
+from netvis import codes
+
+
+def csr_from_edges(num_nodes, edges):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+    return indptr, cols[order]
+
+
+# every undirected edge once, as (low id, high id) rows
+def edges_from_csr(indptr, indices):
+    rows = np.repeat(np.arange(indptr.size - 1, dtype=np.int64), np.diff(indptr))
+    keep = rows < indices
+    return np.column_stack([rows[keep], indices[keep]])
+
+
+def node_types(num_terminals, num_routers):
+    node_type = np.empty(num_terminals + num_routers, dtype=np.int8)
+    node_type[:num_terminals] = topology.TERMINAL
+    node_type[num_terminals:] = topology.ROUTER
+    return node_type
+
+
+def all_to_all(members):
+    # members is (num_sets, set_size); returns every pair within each set
+    i, j = np.triu_indices(members.shape[1], k=1)
+    return np.column_stack([members[:, i].ravel(), members[:, j].ravel()])
+
+
+# dragonfly with routers in each group on a grid of num_cols columns, all-to-all
+# within each row and each column, and links_per_pair global links between every
+# pair of groups. group g's global channels c = 0, 1, ... are spread over its
+# routers (router c % routers_per_group) and handed out to the other groups in
+# blocks of links_per_pair, in group order. this is the layout of dfly3072.gexf
+# (96 routers per group, 16 columns, 24 links per pair)
+def dragonfly(routers_per_group, num_groups, terminals_per_router, num_cols=16, links_per_pair=None):
+    a = routers_per_group
+    if a % num_cols != 0:
+        raise ValueError("routers_per_group should be a multiple of num_cols")
+    if links_per_pair is None:
+        links_per_pair = max(1, a // 4)
+    num_routers = a * num_groups
+    num_terminals = num_routers * terminals_per_router
+
+    terms = np.arange(num_terminals, dtype=np.int64)
+    term_edges = np.column_stack([terms, num_terminals + terms // terminals_per_router])
+
+    grid = (num_terminals + np.arange(num_routers, dtype=np.int64)).reshape(num_groups, a // num_cols, num_cols)
+    row_edges = all_to_all(grid.reshape(-1, num_cols))
+    col_edges = all_to_all(grid.transpose(0, 2, 1).reshape(-1, a // num_cols))
+
+    # channel c of group g goes to the k-th other group, k = c // links_per_pair
+    g, c = np.meshgrid(np.arange(num_groups), np.arange((num_groups - 1) * links_per_pair), indexing="ij")
+    g = g.ravel()
+    c = c.ravel()
+    k = c // links_per_pair
+    offset = c % links_per_pair
+    dest = k + (k >= g)
+    dest_k = g - (g > dest)
+    src_router = num_terminals + g * a + c % a
+    dest_router = num_terminals + dest * a + (dest_k * links_per_pair + offset) % a
+    keep = g < dest
+    global_edges = np.column_stack([src_router[keep], dest_router[keep]])
+
+    edges = np.concatenate([term_edges, row_edges, col_edges, global_edges])
+    node_type = node_types(num_terminals, num_routers)
+    indptr, indices = csr_from_edges(node_type.size, edges)
+    return node_type, indptr, indices
+
+
+def is_prime(n):
+    return n > 1 and all(n % d for d in range(2, int(n ** 0.5) + 1))
+
+
+def primitive_element(q):
+    for xi in range(2, q):
+        if len(set(pow(xi, e, q) for e in range(1, q))) == q - 1:
+            return xi
+    return 1
+
+
+# MMS slimfly for prime q = 4w + delta, delta in {-1, 1}.
+# routers (s, x, y) have id num_terminals + s*q*q + x*q + y, so each (s, x) is a
+# group of q routers, and terminal t attaches to router t // terminals_per_router
+def slimfly(q, terminals_per_router=None):
+    if not is_prime(q) or q % 4 not in (1, 3):
+        raise ValueError("slimfly generator needs a prime q = 4w +- 1")
+    delta = 1 if q % 4 == 1 else -1
+    w = (q - delta) // 4
+    xi = primitive_element(q)
+    if delta == 1:
+        x_exp = list(range(0, q - 2, 2))
+        xp_exp = list(range(1, q - 1, 2))
+    else:
+        x_exp = list(range(0, 2 * w - 1, 2)) + list(range(2 * w - 1, 4 * w - 2, 2))
+        xp_exp = list(range(1, 2 * w, 2)) + list(range(2 * w, 4 * w - 1, 2))
+    X = np.array(sorted(set(pow(xi, e, q) for e in x_exp)), dtype=np.int64)
+    Xp = np.array(sorted(set(pow(xi, e, q) for e in xp_exp)), dtype=np.int64)
+
+    if terminals_per_router is None:
+        terminals_per_router = (3 * q - delta) // 4
+    num_routers = 2 * q * q
+    num_terminals = num_routers * terminals_per_router
+    base = num_terminals
+
+    terms = np.arange(num_terminals, dtype=np.int64)
+    term_edges = np.column_stack([terms, base + terms // terminals_per_router])
+
+    # local links: y - y' in X within (0, x), c - c' in X' within (1, m)
+    x, y, d = np.meshgrid(np.arange(q), np.arange(q), X, indexing="ij")
+    local0 = np.column_stack([(x * q + y).ravel(), (x * q + (y + d) % q).ravel()])
+    m, c, d = np.meshgrid(np.arange(q), np.arange(q), Xp, indexing="ij")
+    local1 = q * q + np.column_stack([(m * q + c).ravel(), (m * q + (c + d) % q).ravel()])
+    local = np.concatenate([local0, local1])
+    local = local[local[:, 0] < local[:, 1]]
+
+    # (0, x, y) - (1, m, c) iff y = m*x + c
+    x, y, m = np.meshgrid(np.arange(q), np.arange(q), np.arange(q), indexing="ij")
+    c = (y - m * x) % q
+    cross = np.column_stack([(x * q + y).ravel(), (q * q + m * q + c).ravel()])
+
+    edges = np.concatenate([term_edges, base + local, base + cross])
+    node_type = node_types(num_terminals, num_routers)
+    indptr, indices = csr_from_edges(node_type.size, edges)
+    return node_type, indptr, indices
+
+
+# fat-tree with radix port switches, radix/2 terminals per L1 switch.
+# levels=2 is a leaf/spine tree. levels=3 builds num_pods pods of radix/2 L1 and
+# radix/2 L2 switches (full bipartite inside a pod); every L3 switch spends
+# radix // num_pods ports on each pod, and L2 switch i of a pod links to the
+# radix/2 L3 switches of block i // (radix // num_pods).
+# ids are terminals, then L1, L2 and L3 switches, as fattree_layout expects.
+# ftree.gexf is radix 36, 3 levels, 10 pods
+def fattree(radix, levels=3, num_pods=None):
+    half = radix // 2
+    if levels == 2:
+        num_l1 = radix
+        num_terminals = num_l1 * half
+        l1 = num_terminals + np.arange(num_l1, dtype=np.int64)
+        l2 = num_terminals + num_l1 + np.arange(half, dtype=np.int64)
+        terms = np.arange(num_terminals, dtype=np.int64)
+        term_edges = np.column_stack([terms, num_terminals + terms // half])
+        up = np.column_stack([np.repeat(l1, half), np.tile(l2, num_l1)])
+        edges = np.concatenate([term_edges, up])
+        node_type = node_types(num_terminals, num_l1 + half)
+    elif levels == 3:
+        if num_pods is None:
+            num_pods = radix
+        ports_per_pod = radix // num_pods
+        if ports_per_pod < 1:
+            raise ValueError("num_pods can't be larger than the radix")
+        num_l1 = num_pods * half
+        num_l3 = half * half // ports_per_pod
+        num_terminals = num_l1 * half
+        l1_start = num_terminals
+        l2_start = l1_start + num_l1
+        l3_start = l2_start + num_l1
+
+        terms = np.arange(num_terminals, dtype=np.int64)
+        term_edges = np.column_stack([terms, l1_start + terms // half])
+
+        # every L1 switch of a pod links to every L2 switch of the same pod
+        pod, i, j = np.meshgrid(np.arange(num_pods), np.arange(half), np.arange(half), indexing="ij")
+        pod_edges = np.column_stack([(l1_start + pod * half + i).ravel(), (l2_start + pod * half + j).ravel()])
+
+        pod, i, u = np.meshgrid(np.arange(num_pods), np.arange(half), np.arange(half), indexing="ij")
+        core = (i // ports_per_pod) * half + u
+        core_edges = np.column_stack([(l2_start + pod * half + i).ravel(), (l3_start + core).ravel()])
+        core_edges = core_edges[core_edges[:, 1] < l3_start + num_l3]
+
+        edges = np.concatenate([term_edges, pod_edges, core_edges])
+        node_type = node_types(num_terminals, 2 * num_l1 + num_l3)
+    else:
+        raise ValueError("fattree generator supports 2 or 3 levels")
+
+    indptr, indices = csr_from_edges(node_type.size, edges)
+    return node_type, indptr, indices
+
+
+# node types and edges straight from a GEXF file, without networkx.
+# with lp_map, a codes.LPMap, the CODES LP ids are converted to relative ids
+def read_gexf_arrays(filename, lp_map=None):
+    ids = []
+    types = []
+    edges = []
+    cur_id = None
+    for event, elem in ET.iterparse(filename, events=("start", "end")):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if event == "start" and tag == "node":
+            cur_id = int(elem.get("id"))
+            ids.append(cur_id)
+            types.append(topology.UNKNOWN)
+        elif event == "start" and tag == "color" and cur_id is not None:
+            if elem.get("r") == "255":
+                types[-1] = topology.TERMINAL
+            elif elem.get("g") == "255":
+                types[-1] = topology.ROUTER
+        elif event == "end" and tag == "node":
+            cur_id = None
+            elem.clear()
+        elif event == "end" and tag == "edge":
+            edges.append((int(elem.get("source")), int(elem.get("target"))))
+            elem.clear()
+
+    ids = np.array(ids, dtype=np.int64)
+    types = np.array(types, dtype=np.int8)
+    edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+    if lp_map is not None:
+        num_terminals = int((types == topology.TERMINAL).sum())
+        ids = lp_map.to_relative(ids, num_terminals)
+        edges = lp_map.to_relative(edges, num_terminals)
+    node_type = np.zeros(ids.max() + 1, dtype=np.int8)
+    node_type[ids] = types
+    return node_type, edges
+
+
+def edge_set(edges):
+    edges = np.sort(np.asarray(edges, dtype=np.int64), axis=1)
+    return np.unique(edges, axis=0)
+
+
+# compare generated edges to a bundled file. the fat-tree file has no node colors,
+# so only its edges are compared
+def validate(name, filename, generated, lp_map=None, check_types=True):
+    node_type, indptr, indices = generated
+    file_types, file_edges = read_gexf_arrays(filename, lp_map)
+    gen = edge_set(edges_from_csr(indptr, indices))
+    ref = edge_set(file_edges)
+
+    same_edges = gen.shape == ref.shape and np.array_equal(gen, ref)
+    same_types = not check_types or np.array_equal(node_type, file_types)
+    if same_edges and same_types:
+        print("%-9s OK   %d nodes, %d edges match %s" % (name, node_type.size, len(gen), os.path.basename(filename)))
+    else:
+        gen_rows = set(map(tuple, gen.tolist()))
+        ref_rows = set(map(tuple, ref.tolist()))
+        print("%-9s FAIL %d edges only generated, %d only in %s, node types %s" %
+              (name, len(gen_rows - ref_rows), len(ref_rows - gen_rows), os.path.basename(filename),
+               "match" if same_types else "differ"))
+    return same_edges and same_types
+
+
+def validate_bundled(data_dir):
+    ok = True
+    checks = [
+        ("dragonfly", "dfly3072.gexf", lambda: dragonfly(96, 8, 4), codes.LPMap.from_lp_types(codes.DRAGONFLY_LPS), True),
+        ("slimfly", "sfly3042.gexf", lambda: slimfly(13, 9), None, True),
+        ("fattree", "ftree.gexf", lambda: fattree(36, 3, num_pods=10), None, False),
+    ]
+    for name, filename, gen, lp_map, check_types in checks:
+        start = time.time()
+        generated = gen()
+        elapsed = time.time() - start
+        ok &= validate(name, os.path.join(data_dir, filename), generated, lp_map, check_types)
+        print("          generated in %.3f s" % elapsed)
+    return ok
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="check the topology generators against the bundled GEXF files")
+    ap.add_argument("-d", "--data_dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "connection-data"),
+                    help="directory with dfly3072.gexf, sfly3042.gexf and ftree.gexf")
+    args = vars(ap.parse_args(argv))
+    sys.exit(0 if validate_bundled(args["data_dir"]) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import sys
+
+import numpy as np
+
+from netvis import topology
+
+# hotspot index: statistics of a run's sample matrix computed once after ingest,
+# so the busiest nodes and steps can be looked up without the raw files or any
+# frames. an index is an npz file holding
+#   times            time of every step
+#   node_type        topology.TERMINAL or ROUTER of every node
+#   group            router group of every node (terminals take their router's), -1 if unknown
+#   node_max, node_mean, node_peak_step, node_total
+#                    per node statistics over the whole run
+#   block_steps      steps summed into each column of block_totals and block_max
+#   block_totals, block_max
+#                    (num_nodes, num_blocks) per node sums and maxima over blocks of
+#                    steps, time range queries are answered from these
+#   <kind>.step_max, <kind>.step_total
+#                    largest value and sum of the terminals (kind terminal) or
+#                    routers (kind router) at every step
+#   step_top_ids, step_top_values
+#                    (num_steps, k) the k largest nodes of every step, largest first
+# query it with python -m netvis.hotspots
+
+KINDS = {"terminal": topology.TERMINAL, "router": topology.ROUTER}
+
+# steps handled at once by step_top_k, bounds the size of its temporaries
+BLOCK_STEPS = 256
+
+
+# max, mean, step of the max and total of every node of a (num_nodes, num_samples) matrix
+def node_stats(samples):
+    total = samples.sum(axis=1, dtype=np.int64)
+    return {
+        "node_max": samples.max(axis=1) if samples.shape[1] else np.zeros(samples.shape[0], dtype=samples.dtype),
+        "node_mean": total / float(max(1, samples.shape[1])),
+        "node_peak_step": samples.argmax(axis=1) if samples.shape[1] else np.zeros(samples.shape[0], dtype=np.int64),
+        "node_total": total,
+    }
+
+
+# (num_samples, k) ids and values of the k largest nodes of every step, largest first
+def step_top_k(samples, k, block_steps=BLOCK_STEPS):
+    num_nodes, num_samples = samples.shape
+    k = min(k, num_nodes)
+    ids = np.zeros((num_samples, k), dtype=np.int64)
+    values = np.zeros((num_samples, k), dtype=samples.dtype)
+    if k <= 0:
+        return ids, values
+    for start in range(0, num_samples, block_steps):
+        block = samples[:, start:start + block_steps]
+        top = np.argpartition(block, num_nodes - k, axis=0)[num_nodes - k:]
+        top_values = np.take_along_axis(block, top, axis=0)
+        order = np.argsort(top_values, axis=0, kind="mergesort")[::-1]
+        ids[start:start + block.shape[1]] = np.take_along_axis(top, order, axis=0).T
+        values[start:start + block.shape[1]] = np.take_along_axis(top_values, order, axis=0).T
+    return ids, values
+
+
+# per node sums and maxima over blocks of block_steps steps, the last block may be shorter
+def block_reduce(samples, block_steps):
+    starts = np.arange(0, samples.shape[1], block_steps)
+    if not starts.size:
+        empty = np.zeros((samples.shape[0], 0), dtype=np.int64)
+        return empty, empty.astype(samples.dtype)
+    return (np.add.reduceat(samples, starts, axis=1, dtype=np.int64),
+            np.maximum.reduceat(samples, starts, axis=1))
+
+
+# the index of a (num_nodes, num_samples) sample matrix, see the top of the file
+def build_index(samples, times, node_type, groups=None, k=10, block_steps=16):
+    block_steps = max(1, block_steps)
+    node_type = np.asarray(node_type, dtype=np.int8)
+    index = node_stats(samples)
+    index["times"] = np.asarray(times, dtype=np.float64)
+    index["node_type"] = node_type
+    if groups is None:
+        groups = np.full(len(node_type), -1, dtype=np.int64)
+    index["group"] = np.asarray(groups, dtype=np.int64)
+    index["block_steps"] = np.array(block_steps, dtype=np.int64)
+    index["block_totals"], index["block_max"] = block_reduce(samples, block_steps)
+    for name, kind in KINDS.items():
+        rows = samples[node_type == kind]
+        index[name + ".step_max"] = rows.max(axis=0) if len(rows) else np.zeros(samples.shape[1], dtype=samples.dtype)
+        index[name + ".step_total"] = rows.sum(axis=0, dtype=np.int64)
+    index["step_top_ids"], index["step_top_values"] = step_top_k(samples, k)
+    return index
+
+
+def write_index(filename, index):
+    f = open(filename, "wb")
+    np.savez(f, **index)
+    f.close()
+
+
+# point arrays of the per node statistics, to attach to the geometry
+def point_arrays(index):
+    return {
+        "PeakOccupancy": index["node_max"],
+        "MeanOccupancy": index["node_mean"].astype(np.float32),
+        "PeakStep": index["node_peak_step"].astype(np.int32),
+        "TotalOccupancy": index["node_total"],
+    }
+
+
+class HotspotIndex(object):
+    def __init__(self, filename):
+        data = np.load(filename)
+        # every array is small, read them all up front instead of on each access
+        self.data = dict((name, data[name]) for name in data.files)
+        data.close()
+        self.times = self.data["times"]
+        self.block_steps = int(self.data["block_steps"])
+
+    @property
+    def num_steps(self):
+        return len(self.times)
+
+    # ids of the nodes of kind ("terminal", "router" or None for all) in group (None for all)
+    def nodes(self, kind=None, group=None):
+        mask = np.ones(len(self.data["node_type"]), dtype=bool)
+        if kind is not None:
+            mask &= self.data["node_type"] == KINDS[kind]
+        if group is not None:
+            mask &= self.data["group"] == group
+        return np.flatnonzero(mask)
+
+    # steps with t0 <= time < t1, either end None for open
+    def step_range(self, t0=None, t1=None):
+        start = 0 if t0 is None else int(np.searchsorted(self.times, t0, side="left"))
+        end = self.num_steps if t1 is None else int(np.searchsorted(self.times, t1, side="left"))
+        return start, max(start, end)
+
+    # blocks covering steps start to end, and the steps they cover
+    def block_range(self, start, end):
+        first = start // self.block_steps
+        last = -(-end // self.block_steps)
+        return first, last, first * self.block_steps, min(last * self.block_steps, self.num_steps)
+
+    # the k nodes with the largest total (or, with by="max", largest value) over
+    # steps start to end, as (ids, values, start, end). start and end widen to
+    # whole blocks of block_steps, the returned ones are the steps covered
+    def top_nodes(self, k, nodes, start=0, end=None, by="total"):
+        if end is None:
+            end = self.num_steps
+        if start == 0 and end == self.num_steps:
+            values = self.data["node_total" if by == "total" else "node_max"][nodes]
+        else:
+            first, last, start, end = self.block_range(start, end)
+            if by == "total":
+                values = self.data["block_totals"][nodes, first:last].sum(axis=1)
+            else:
+                values = self.data["block_max"][nodes, first:last].max(axis=1, initial=0)
+        k = min(k, len(nodes))
+        order = np.argsort(-values.astype(np.float64), kind="mergesort")[:k]
+        return nodes[order], values[order], start, end
+
+    # steps from start to end whose largest value (by="max") or sum (by="total")
+    # over the nodes of kind exceeds threshold, with those values
+    def steps_above(self, threshold, kind=None, start=0, end=None, by="max"):
+        names = [kind] if kind is not None else list(KINDS)
+        per_kind = [self.data[name + ".step_" + by][start:end] for name in names]
+        values = np.maximum.reduce(per_kind) if by == "max" else np.add.reduce(per_kind)
+        steps = np.flatnonzero(values > threshold)
+        return steps + start, values[steps]
+
+    # ids and values of the busiest nodes of one step
+    def step_top(self, step):
+        return self.data["step_top_ids"][step], self.data["step_top_values"][step]
+
+
+# "steps <start> to <end - 1> (time <t> to <t>)" for printing
+def step_span(times, start, end):
+    if start >= end:
+        return "no steps"
+    return "steps %d to %d (time %g to %g)" % (start, end - 1, times[start], times[end - 1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="query a hotspot index written with network.py --hotspots")
+    ap.add_argument("index", help="the hotspot index (.npz)")
+    ap.add_argument("-k", "--top", required=False, type=int, default=10, help="how many nodes to list")
+    ap.add_argument("--kind", required=False, choices=sorted(KINDS), help="only look at terminals or routers")
+    ap.add_argument("-g", "--group", required=False, type=int, help="only look at the nodes of this router group")
+    ap.add_argument("--t0", required=False, type=float, help="start of the time range (inclusive); the top nodes are "
+                    "ranked over whole blocks of the index, the steps actually covered are printed")
+    ap.add_argument("--t1", required=False, type=float, help="end of the time range (exclusive)")
+    ap.add_argument("--by", required=False, choices=["total", "max"],
+                    help="rank nodes and test steps by their sum or by their largest value "
+                         "(default total for nodes, max for --above)")
+    ap.add_argument("--above", required=False, type=float,
+                    help="list the steps whose value (see --by) over --kind exceeds this instead of the top nodes")
+    ap.add_argument("--step", required=False, type=int, help="list the busiest nodes of this step instead")
+    args = vars(ap.parse_args(argv))
+
+    index = HotspotIndex(args["index"])
+    times = index.times
+    start, end = index.step_range(args["t0"], args["t1"])
+
+    if args["step"] is not None:
+        if not 0 <= args["step"] < index.num_steps:
+            sys.exit("ERROR: --step has to be between 0 and " + str(index.num_steps - 1))
+        ids, values = index.step_top(args["step"])
+        print("busiest nodes of step %d (time %g):" % (args["step"], times[args["step"]]))
+        for i, v in zip(ids[:args["top"]], values[:args["top"]]):
+            print("  %d  %d" % (i, v))
+    elif args["above"] is not None:
+        args["by"] = args["by"] or "max"
+        steps, values = index.steps_above(args["above"], args["kind"], start, end, args["by"])
+        print("%d steps with %s %s above %g" % (len(steps), args["kind"] or "node", args["by"], args["above"]))
+        for s, v in zip(steps, values):
+            print("  step %d (time %g)  %d" % (s, times[s], v))
+    else:
+        args["by"] = args["by"] or "total"
+        nodes = index.nodes(args["kind"], args["group"])
+        ids, values, covered_start, covered_end = index.top_nodes(args["top"], nodes, start, end, args["by"])
+        print("top %d of %d %ss by %s, %s:" % (len(ids), len(nodes), args["kind"] or "node", args["by"],
+                                               step_span(times, covered_start, covered_end)))
+        if (covered_start, covered_end) != (start, end):
+            # the index only has sums and maxima over whole blocks
+            print("  (widened from the requested %s to whole blocks of %d steps)" %
+                  (step_span(times, start, end), index.block_steps))
+        for i, v in zip(ids, values):
+            print("  %d  group %d  %g" % (i, index.data["group"][i], v))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import math
+
+import numpy as np
+
+# z offsets applied before the halves of a sfly/dfly system are rotated apart
+TERMINAL_Z = 2
+ROUTER_Z = 8
+
+
+# turn a {nodeid: coords} layout dict into an id array and an (N, dim) coordinate array
+def coords_to_arrays(all_coords, dim):
+    ids = np.fromiter(all_coords.keys(), dtype=np.int64, count=len(all_coords))
+    coords = np.array([list(all_coords[i])[:dim] for i in ids.tolist()], dtype=np.float64).reshape(-1, dim)
+    return ids, coords
+
+
+# offsets of n points evenly spaced on a circle of radius scale, computed the same
+# way as nx.circular_layout (float32 angles, then centered and rescaled), so adding
+# a center gives the coordinates nx.circular_layout(..., center=center) would
+def circle_offsets(n, scale):
+    if n <= 1:
+        return np.zeros((n, 2))
+    theta = (np.linspace(0, 1, n + 1)[:-1] * 2 * np.pi).astype(np.float32)
+    pos = np.column_stack([np.cos(theta), np.sin(theta)]).astype(np.float64)
+    lim = 0
+    for i in range(2):
+        pos[:, i] -= pos[:, i].mean()
+        lim = max(abs(pos[:, i]).max(), lim)
+    if lim > 0:
+        pos *= scale / lim
+    return pos
+
+
+# position of each of keys in the order a dict filled with keys one at a time
+# iterates in. a networkx graph keeps its nodes in such a dict, so this is the
+# spot nx.circular_layout gave each node of a graph built by adding keys in turn:
+# the insertion order on python 3, the hash order on python 2
+def dict_order(keys):
+    keys = list(keys)
+    slots = dict((key, i) for i, key in enumerate(dict.fromkeys(keys)))
+    return np.array([slots[key] for key in keys], dtype=np.int64)
+
+
+def circle(n, scale, center):
+    return circle_offsets(n, scale) + np.asarray(center, dtype=np.float64)
+
+
+# centers of the groups of a sfly/dfly system, the first half on a circle and the
+# second half the same circle mirrored in y
+def group_centers(num_groups, scale, center):
+    half = circle(num_groups // 2, scale, center)
+    mirrored = half.copy()
+    mirrored[:, 1] = -mirrored[:, 1]
+    return np.concatenate([half, mirrored])
+
+
+# (num_groups * group_size, 2) router coordinates, each group's routers on a circle
+# around its center. with first_id, the id of the first router, each router takes
+# the spot nx.circular_layout gave it on a graph of its group
+def circle_groups(centers, group_size, scale, first_id=None):
+    ring = circle_offsets(group_size, scale)
+    if first_id is None:
+        return (ring[np.newaxis] + centers[:, np.newaxis]).reshape(-1, 2)
+    starts = first_id + group_size * np.arange(len(centers))
+    slots = np.array([dict_order(range(start, start + group_size)) for start in starts.tolist()], dtype=np.int64)
+    return (ring[slots.reshape(len(centers), group_size)] + centers[:, np.newaxis]).reshape(-1, 2)
+
+
+# (num_groups * group_size, 2) router coordinates, each group's routers on a grid of
+# num_cols columns around its center. odd groups run the columns along x and even
+# groups along y
+def grid_groups(centers, group_size, cell_width, num_cols=16):
+    num_rows = -(-group_size // num_cols)
+    local = np.arange(group_size)
+    rows = (local // num_cols - num_rows // 2) * cell_width
+    cols = (local % num_cols - num_cols // 2) * cell_width
+    odd = (np.arange(len(centers)) % 2 == 1)[:, np.newaxis]
+    x = centers[:, 0:1] + np.where(odd, cols, rows)
+    y = centers[:, 1:2] + np.where(odd, rows, cols)
+    return np.stack([x, y], axis=-1).reshape(-1, 2)
+
+
+# terminals on a circle of radius scale around the router they are attached to,
+# same as one nx.circular_layout call per router on a graph of the router and,
+# in the order their edges appear, its terminals, with the router removed again.
+# term_ids and router_ids are pairs from topology.terminal_router_pairs and node_xy
+# is indexed by node id. returns the terminal ids and their coordinates
+def terminal_rings(term_ids, router_ids, node_xy, scale):
+    if not len(term_ids):
+        return term_ids, np.zeros((0, 2))
+
+    # a repeated edge doesn't add the terminal again
+    _, first = np.unique(router_ids * (int(term_ids.max()) + 1) + term_ids, return_index=True)
+    first.sort()
+    order = first[np.argsort(router_ids[first], kind="mergesort")]
+    term_ids = term_ids[order]
+    router_ids = router_ids[order]
+
+    # position of each terminal in its router's ring and the size of that ring
+    starts = np.flatnonzero(np.r_[True, router_ids[1:] != router_ids[:-1]])
+    counts = np.diff(np.r_[starts, len(router_ids)])
+    rank = np.empty(len(router_ids), dtype=np.int64)
+    for start, count in zip(starts.tolist(), counts.tolist()):
+        slots = dict_order([int(router_ids[start])] + term_ids[start:start + count].tolist())
+        rank[start:start + count] = slots[1:] - (slots[1:] > slots[0])
+    size = np.repeat(counts, counts)
+
+    xy = np.empty((len(term_ids), 2))
+    for n in np.unique(size).tolist():
+        sel = size == n
+        xy[sel] = circle_offsets(n, scale)[rank[sel]] + node_xy[router_ids[sel]]
+    return term_ids, xy
+
+
+# place the routers from routerid_start on at router_xy and their terminals on
+# rings around them. returns the ids of the placed nodes, (num_nodes, 2) coordinates
+# indexed by node id and the NodeType values (1 terminal, 2 router)
+def routers_and_terminals(num_nodes, routerid_start, router_xy, term_ids, router_ids, terminal_scale):
+    xy = np.zeros((num_nodes, 2))
+    node_arr = np.zeros(num_nodes, dtype=np.int32)
+    placed = np.zeros(num_nodes, dtype=bool)
+    routers = slice(routerid_start, routerid_start + len(router_xy))
+    xy[routers] = router_xy
+    node_arr[routers] = 2
+    placed[routers] = True
+
+    term_ids, term_xy = terminal_rings(term_ids, router_ids, xy, terminal_scale)
+    xy[term_ids] = term_xy
+    node_arr[term_ids] = 1
+    placed[term_ids] = True
+
+    ids = np.flatnonzero(placed)
+    return ids, xy, node_arr[:int(ids.max()) + 1 if len(ids) else 0]
+
+
+# lift 2d coordinates to 3d with a per node type z, then rotate the lower half of
+# each node type's id range by pi/2 and the upper half by 3pi/2 about the x axis,
+# translating the halves apart in y
+def rotate_halves(ids, xy, nodes, translation):
+    is_terminal = nodes.terminal_mask(ids)
+    is_router = nodes.router_mask(ids)
+    z = np.zeros(len(ids))
+    z[is_terminal] = TERMINAL_Z
+    z[is_router] = ROUTER_Z
+    unknown = ~(is_terminal | is_router)
+    if unknown.any():
+        print("NO VALUE SAVED for " + str(int(unknown.sum())) + " nodes\n")
+
+    lower = nodes.lower_half(ids)
+    rad = np.where(lower, math.pi / 2, 3 * math.pi / 2)
+    trans = np.where(lower, translation, -translation)
+
+    x = xy[:, 0]
+    y = xy[:, 1]
+    out = np.empty((len(ids), 3))
+    out[:, 0] = x
+    out[:, 1] = (y * np.cos(rad) - z * np.sin(rad)) + trans
+    out[:, 2] = y * np.sin(rad) + z * np.cos(rad)
+    return out
+
+
+# vtkPoints with point id i at coords[ids == i], same as calling InsertPoint per node
+def vtk_points(ids, coords):
+    num_points = int(ids.max()) + 1 if len(ids) else 0
+    arr = np.zeros((num_points, 3), dtype=np.float32)
+    arr[ids] = coords
+    return points_from_array(arr)
+
+
+def points_from_array(arr):
+    import vtk
+    from vtk.util import numpy_support
+
+    points = vtk.vtkPoints()
+    points.SetData(numpy_support.numpy_to_vtk(np.ascontiguousarray(arr, dtype=np.float32), deep=1))
+    return points
+
+
+def points_to_array(points):
+    from vtk.util import numpy_support
+
+    return numpy_support.vtk_to_numpy(points.GetData()).copy()
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+import zipfile
+
+import numpy as np
+
+# bump when the layout code or the stored arrays change, so old entries stop matching
+CACHE_VERSION = 4
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def file_hash(filename, block_size=1 << 20):
+    h = hashlib.sha1()
+    with open(filename, "rb") as f:
+        block = f.read(block_size)
+        while block:
+            h.update(block)
+            block = f.read(block_size)
+    return h.hexdigest()
+
+
+# key on where the topology came from (the graph file's hash, or the generator
+# arguments) plus the topology args that feed the layout
+def cache_key(source, network, group_size, num_groups):
+    h = hashlib.sha1()
+    h.update(source.encode("ascii"))
+    h.update(repr((CACHE_VERSION, network, int(group_size), int(num_groups))).encode("ascii"))
+    return h.hexdigest()
+
+
+def entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key + ".npz")
+
+
+# returns the dict of arrays saved by store, or None on a miss.
+# unreadable entries are removed and treated as a miss
+def load(cache_dir, key):
+    path = entry_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as f:
+            topo = dict((k, f[k]) for k in f.files)
+    except (IOError, OSError, ValueError, KeyError, zipfile.BadZipfile):
+        remove(path)
+        return None
+    if int(topo.pop("cache_version", -1)) != CACHE_VERSION:
+        remove(path)
+        return None
+
+    # mtime doubles as the last use time for eviction
+    os.utime(path, None)
+    return topo
+
+
+# write an entry atomically, then trim the cache back under max_bytes
+def store(cache_dir, key, topo, max_bytes=DEFAULT_MAX_BYTES):
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    path = entry_path(cache_dir, key)
+    tmp = path + "." + str(os.getpid()) + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, cache_version=CACHE_VERSION, **topo)
+    os.rename(tmp, path)
+    evict(cache_dir, max_bytes, keep=key)
+
+
+# least recently used entries go first; the entry named by keep is never removed
+def evict(cache_dir, max_bytes, keep=None):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".npz"):
+            continue
+        path = os.path.join(cache_dir, name)
+        st = os.stat(path)
+        entries.append((st.st_mtime, st.st_size, path))
+
+    entries.sort(reverse=True)
+    total = 0
+    keep_path = entry_path(cache_dir, keep) if keep is not None else None
+    for mtime, size, path in entries:
+        total += size
+        if total > max_bytes and path != keep_path:
+            remove(path)
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# (key, size, last use, number of nodes, number of edges) of every entry, most
+# recently used first. node and edge counts are -1 for unreadable entries
+def entries(cache_dir):
+    out = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".npz"):
+            continue
+        path = os.path.join(cache_dir, name)
+        st = os.stat(path)
+        num_nodes = num_edges = -1
+        try:
+            with np.load(path) as f:
+                num_nodes = int(f["num_nodes"])
+                num_edges = len(f["edges"])
+        except (IOError, OSError, ValueError, KeyError, zipfile.BadZipfile):
+            pass
+        out.append((name[:-len(".npz")], st.st_size, st.st_mtime, num_nodes, num_edges))
+    out.sort(key=lambda e: e[2], reverse=True)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="list, trim or clear a layout cache made with network.py --cache_dir")
+    ap.add_argument("cache_dir", help="the --cache_dir of network.py")
+    ap.add_argument("--max_mb", required=False, help="remove least recently used entries until the cache fits")
+    ap.add_argument("--clear", action="store_true", help="remove every entry")
+    args = vars(ap.parse_args(argv))
+
+    cache_dir = args["cache_dir"]
+    if not os.path.isdir(cache_dir):
+        sys.exit("ERROR: " + cache_dir + " is not a directory")
+    if args["clear"]:
+        for key, _, _, _, _ in entries(cache_dir):
+            remove(entry_path(cache_dir, key))
+    elif args["max_mb"] is not None:
+        evict(cache_dir, int(float(args["max_mb"]) * 1024 * 1024))
+
+    total = 0
+    for key, size, mtime, num_nodes, num_edges in entries(cache_dir):
+        total += size
+        print("%s %9.1f MB  used %s  %8d nodes %8d edges" % (key, size / 1048576.0,
+                                                             time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime)),
+                                                             num_nodes, num_edges))
+    print("%.1f MB in %s" % (total / 1048576.0, cache_dir))
+
+
+if __name__ == "__main__":
+    main()
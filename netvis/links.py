@@ -0,0 +1,76 @@
+import numpy as np
+
+from netvis import sampling
+
+# link sampling files are csv with one row per router port and sample:
+#   router_id,port,end_time,<value columns>
+# router_id is relative to the first router, like the router sampling file, and
+# the value columns of a row are summed, like the VC columns
+
+
+# (router, port) -> edge index lookup.
+# a router's ports are numbered in the order its edges appear in edges, which is
+# the order links are added to the vtkGraph (terminal, local, then global links
+# for slimfly and dragonfly) and so also the order of the cells of the
+# vtkGraphToPolyData output
+class PortTable(object):
+    def __init__(self, edges, nodes):
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        self.num_edges = len(edges)
+        self.router_start = nodes.router_start
+        num_routers = nodes.router_end - nodes.router_start
+
+        ends = edges.ravel()
+        edge_ids = np.repeat(np.arange(self.num_edges), 2)
+        is_router = nodes.router_mask(ends)
+        routers = ends[is_router] - self.router_start
+        order = np.argsort(routers, kind="mergesort")
+
+        self.num_ports = np.bincount(routers, minlength=num_routers)
+        self.port_offsets = np.concatenate([[0], np.cumsum(self.num_ports)])
+        self.port_edges = edge_ids[is_router][order]
+
+    # edge index of each (router, port) pair, -1 for ports that don't exist.
+    # router_ids are node ids
+    def edge_index(self, router_ids, ports):
+        routers = np.asarray(router_ids, dtype=np.int64) - self.router_start
+        ports = np.asarray(ports, dtype=np.int64)
+        valid = (routers >= 0) & (routers < len(self.num_ports))
+        valid[valid] &= (ports[valid] >= 0) & (ports[valid] < self.num_ports[routers[valid]])
+        edges = np.full(len(routers), -1, dtype=np.int64)
+        edges[valid] = self.port_edges[self.port_offsets[routers[valid]] + ports[valid]]
+        return edges
+
+
+def read_link_header(line):
+    cols = [c.strip() for c in line.strip().split(",")]
+    time_col = cols.index("end_time")
+    return cols, cols.index("router_id"), cols.index("port"), time_col, time_col + 1
+
+
+# fill out[edge, sample] of a (num_edges, num_samples) sample matrix from a link
+# sampling file. offset is added to router_id to get node ids (num_terminals).
+# both directions of a router to router link land on the same edge and are added.
+# returns the number of rows whose (router, port) has no edge
+def read_link_array(filename, table, num_samples, samp_interval, offset, out):
+    f = open(filename, "r")
+    cols, id_col, port_col, time_col, value_start = read_link_header(f.readline())
+    flat = out.reshape(-1, order="F")
+    if not np.may_share_memory(flat, out):
+        f.close()
+        raise ValueError("read_link_array needs a fortran ordered sample matrix")
+
+    unmapped = 0
+    for rows in sampling.iter_row_blocks(f, len(cols)):
+        router_ids, idx = sampling.row_index(rows, id_col, time_col, offset, samp_interval)
+        edges = table.edge_index(router_ids, rows[:, port_col].astype(np.int64))
+        unmapped += int((edges < 0).sum())
+        keep = (edges >= 0) & (idx >= 0) & (idx < num_samples)
+
+        # sum rows hitting the same (edge, sample), then scatter once
+        keys, inverse = np.unique(edges[keep] + idx[keep] * out.shape[0], return_inverse=True)
+        sums = np.bincount(inverse, weights=rows[keep, value_start:].sum(axis=1))
+        flat[keys] += sums.astype(out.dtype)
+    f.close()
+
+    return unmapped
@@ -0,0 +1,80 @@
+import numpy as np
+
+from netvis import topology
+from netvis import vtkarrays
+
+# coarser levels of detail of a system: every node is assigned a segment (its
+# router, or its router's group) and the sample matrices are reduced per segment.
+# nodes with segment -1 are left out
+REDUCTIONS = ("sum", "max", "mean")
+
+
+# segment of every node at the router level: routers are numbered in id order
+# and each terminal joins the first router it is linked to
+def router_segments(nodes, edges):
+    segments = np.full(nodes.num_nodes, -1, dtype=np.int64)
+    segments[nodes.routers] = np.arange(nodes.routers.size)
+    term_ids, router_ids = topology.terminal_router_pairs(edges, nodes)
+    # reversed so the first link of a terminal is the one that sticks
+    segments[term_ids[::-1]] = segments[router_ids[::-1]]
+    return segments
+
+
+# segment of every node at the group level, from its router level segment
+def group_segments(router_segs, group_size):
+    return np.where(router_segs >= 0, router_segs // group_size, -1)
+
+
+# node ids sorted by segment plus where each segment starts, for reduceat
+def segment_order(segments, num_segments):
+    order = np.argsort(segments, kind="mergesort")
+    order = order[segments[order] >= 0]
+    counts = np.bincount(segments[order], minlength=num_segments)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return order, starts, counts
+
+
+# reduce the rows of a (num_nodes, num_samples[, num_channels]) sample array per
+# segment with sum, max or mean. the result keeps the step layout of the input,
+# fortran ordered sample matrix or vtkarrays.channel_matrix
+def segment_reduce(samples, segments, num_segments, how="sum"):
+    if how not in REDUCTIONS:
+        raise ValueError("reduction should be one of " + ", ".join(REDUCTIONS) + ", not " + str(how))
+    order, starts, counts = segment_order(segments, num_segments)
+    rows = samples[order]
+
+    # sums are added up wide and narrowed again afterwards
+    dtype = {"sum": np.int64, "max": samples.dtype, "mean": np.float32}[how]
+    if samples.ndim == 3:
+        out = vtkarrays.channel_matrix(num_segments, samples.shape[1], samples.shape[2], dtype)
+    else:
+        out = vtkarrays.sample_matrix(num_segments, samples.shape[1], dtype)
+    # segments without any node would be given the row at their start by reduceat
+    filled = counts > 0
+    if not filled.any():
+        pass
+    elif how == "max":
+        out[filled] = np.maximum.reduceat(rows, starts[filled], axis=0)
+    else:
+        sums = np.add.reduceat(rows, starts[filled], axis=0, dtype=np.int64 if how == "sum" else np.float64)
+        if how == "mean":
+            sums /= counts[filled].reshape((-1,) + (1,) * (samples.ndim - 1))
+        out[filled] = sums
+    if how == "sum":
+        out = vtkarrays.compact(out)
+    return out
+
+
+# (M, 2) edges between different segments, each pair once with the smaller segment
+# first, plus the index of the folded edge each original edge became (-1 for edges
+# inside a segment), which can be used as segments for per edge samples
+def segment_edges(edges, segments):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    pairs = np.sort(segments[edges], axis=1)
+    valid = (pairs[:, 0] >= 0) & (pairs[:, 0] != pairs[:, 1])
+    width = int(pairs.max()) + 1 if len(pairs) else 1
+    keys, inverse = np.unique(pairs[valid, 0] * width + pairs[valid, 1], return_inverse=True)
+
+    edge_segments = np.full(len(edges), -1, dtype=np.int64)
+    edge_segments[valid] = inverse
+    return np.column_stack([keys // width, keys % width]), edge_segments
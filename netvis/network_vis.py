@@ -0,0 +1,993 @@
+import numpy as np
+import os
+import math
+import argparse
+import sys
+from netvis import sampling
+from netvis import simfile
+from netvis import vtkarrays
+from netvis import topology
+from netvis import layout
+from netvis import layout_cache
+from netvis import vtkhdf
+from netvis import frames
+from netvis import generators
+from netvis import links
+from netvis import lod
+from netvis import temporal
+from netvis import delta
+from netvis import trace
+from netvis import pipeline
+from netvis import codes
+from netvis import hotspots
+
+# stages recorded by --trace, see netvis/trace.py
+STAGES = ("cache_load", "read_gexf", "classify", "generate", "layout", "points", "edges", "ingest", "ingest_links",
+          "ingest_router", "ingest_terminal", "hotspots", "retime", "write_vtp", "write_vtkhdf", "write_chunks", "lod_router",
+          "lod_group", "follow")
+
+
+def build_parser():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", "--network", required=False, help="network to visualize")
+    ap.add_argument("-g", "--graphfile", required=False, help="graph ML file")
+    ap.add_argument("-r", "--routerfile", required=False, help="router data file (csv, or converted with python -m netvis.simfile)")
+    ap.add_argument("-t", "--termfile", required=False, help="terminal data file (csv, or converted with python -m netvis.simfile)")
+    ap.add_argument("-l", "--linkfile", required=False,
+                    help="link data file (router_id,port,end_time,values), written as LinkTraffic cell data on the links")
+    ap.add_argument("-i", "--samp_interval", required=False, help="interval for sampling data")
+    ap.add_argument("-e", "--samp_end_time", required=False, help="simulation end time of sampling data")
+    ap.add_argument("-o", "--out_path", required=False, help="path in vtp-files to use")
+    ap.add_argument("--codes_config", required=False,
+                    help="CODES config whose LPGROUPS give the LP ids of a dragonfly graph file "
+                         "(default 8 nw-lps, 4 terminals and 1 router per repetition)")
+    ap.add_argument("-s", "--routers_per_group", required=False, help="num routers per group (sfly/dfly only)")
+    ap.add_argument("-p", "--num_groups", required=False, help="number of groups (sfly/dfly only)")
+    ap.add_argument("--generate", action="store_true",
+                    help="build the topology from parameters instead of a graph file: -s/-p/--terminals_per_router for "
+                         "dragonfly, -s (q) for slimfly, --radix/--levels/--num_pods for fattree")
+    ap.add_argument("--terminals_per_router", required=False, help="terminals per router for --generate (dfly default 4, sfly default (3q-delta)/4)")
+    ap.add_argument("--links_per_pair", required=False, help="global links between each pair of groups for --generate dragonfly")
+    ap.add_argument("--radix", required=False, default=36, help="fattree switch radix")
+    ap.add_argument("--levels", required=False, default=3, help="fattree levels for --generate")
+    ap.add_argument("--num_pods", required=False, help="fattree pods for --generate (defaults to the radix)")
+    ap.add_argument("-f", "--output_format", required=False, default="vtp", choices=["vtp", "vtkhdf", "vtpchunk"],
+                    help="vtp writes one file per sample, vtkhdf writes the geometry once plus every sample's arrays to a single file, "
+                         "vtpchunk writes --chunk_steps samples per vtp file plus a .chunks.json index of them")
+    ap.add_argument("--chunk_steps", required=False, default=64,
+                    help="samples per file of vtpchunk output, fewer files against larger ones to seek in")
+    ap.add_argument("-w", "--workers", required=False, default=1, help="number of processes writing vtp files")
+    frames.add_writer_args(ap)
+    ap.add_argument("--io_threads", required=False, default=0,
+                    help="threads writing vtp files to disk while the next frames are built (0 writes them in place)")
+    ap.add_argument("--max_frames", required=False, default=16,
+                    help="with --io_threads, most frames held in memory waiting to be written")
+    ap.add_argument("--pipeline", action="store_true",
+                    help="read the router and terminal files at the same time in background threads and, for vtp "
+                         "output with one worker and no --per_vc, --rebin, --stride, --skip_unchanged or --delta, "
+                         "write frames as their samples complete")
+    ap.add_argument("--per_vc", action="store_true",
+                    help="write VC_Occupancy with one component per VC column instead of the sum of the VCs")
+    ap.add_argument("--vc_sum", action="store_true", help="with --per_vc, also write the sum of the VCs as VC_Occupancy_Sum")
+    ap.add_argument("--lod", required=False, choices=["router", "group", "all"],
+                    help="also write coarser series: terminals folded into their router (router), routers folded "
+                         "into their group (group, sfly/dfly only) or both (all)")
+    ap.add_argument("--lod_reduce", required=False, default="sum", choices=lod.REDUCTIONS,
+                    help="how the values of the nodes folded together are combined")
+    ap.add_argument("--rebin", required=False, default=1,
+                    help="combine this many consecutive samples into one frame, with --rebin_reduce")
+    ap.add_argument("--rebin_reduce", required=False, default="sum", choices=lod.REDUCTIONS,
+                    help="how the samples combined by --rebin are reduced")
+    ap.add_argument("--stride", required=False, default=1, help="only write every n-th (rebinned) sample")
+    ap.add_argument("--skip_unchanged", action="store_true",
+                    help="don't write frames equal to the frame before, a .pvd maps every time to the frame holding it")
+    ap.add_argument("--delta", action="store_true",
+                    help="write only the first frame plus a .delta.npz sidecar of the values that change each step, "
+                         "expanded with python -m netvis.delta")
+    ap.add_argument("--follow", action="store_true",
+                    help="tail the router and terminal files of a running simulation and write each frame once its sample is complete")
+    ap.add_argument("--follow_window", required=False, default=64, help="samples kept in memory while following, grown when the files drift further apart")
+    ap.add_argument("--poll_interval", required=False, default=1.0, help="seconds between checks for new rows while following")
+    ap.add_argument("--idle_timeout", required=False, default=600, help="seconds without new rows before following stops")
+    ap.add_argument("--hotspots", required=False,
+                    help="write per node and per step statistics of the samples to this index file (query it with "
+                         "python -m netvis.hotspots) and add them to the frames as static point arrays")
+    ap.add_argument("--hotspot_k", required=False, default=10, help="busiest nodes of every step kept in the hotspot index")
+    ap.add_argument("--hotspot_block", required=False, default=16,
+                    help="steps per block of the hotspot index, time range queries are answered in whole blocks")
+    ap.add_argument("--cache_dir", required=False, help="directory to cache parsed graphs and layouts in")
+    ap.add_argument("--cache_max_mb", required=False, default=512, help="size limit of the layout cache, least recently used entries are removed first")
+    ap.add_argument("--trace", required=False,
+                    help="write the time, counts, throughput and peak memory of every stage to this json file")
+    ap.add_argument("--progress", action="store_true", help="show the running stage, its counts and memory on stderr")
+    ap.add_argument("--profile", required=False, choices=STAGES, help="run this stage under cProfile, every time it runs in the main thread; worker processes "
+                         "and io threads are not profiled")
+    ap.add_argument("--profile_out", required=False, help="where --profile writes its stats once the run ends (default <stage>.prof)")
+    return ap
+
+
+# get routers and terminal lists from graph
+def sfly_split_routers_terminals(G):
+    terminals = []
+    routers = []
+    for nodeid in G.nodes:
+        if G.nodes[nodeid]['viz']['color']['r'] == 255:
+            # terminal
+            terminals.append(int(nodeid))
+        elif G.nodes[nodeid]['viz']['color']['g'] == 255:
+            # router
+            routers.append(int(nodeid))
+    return routers, terminals
+
+
+# get routers and terminal lists from graph, as relative ids of the
+# codes.LPMap lp_map. nodes that aren't terminal or router LPs are dropped
+def dfly_split_routers_terminals(G, lp_map):
+    terminals = []
+    routers = []
+    for nodeid in G.nodes:
+        if G.nodes[nodeid]['viz']['color']['r'] == 255:
+            # terminal
+            terminals.append(int(nodeid))
+        elif G.nodes[nodeid]['viz']['color']['g'] == 255:
+            # router
+            routers.append(int(nodeid))
+
+    num_terminals = len(terminals)
+    if lp_map.num_terminals is not None and lp_map.num_terminals != num_terminals:
+        print("WARNING: the graph has " + str(num_terminals) + " terminals, the CODES config " +
+              str(lp_map.num_terminals))
+    routers = lp_map.to_relative(routers, num_terminals)
+    terminals = lp_map.to_relative(terminals, num_terminals)
+    unmapped = int((routers < 0).sum() + (terminals < 0).sum())
+    if unmapped:
+        print("WARNING: " + str(unmapped) + " graph nodes aren't terminal or router LPs, skipped")
+
+    return routers[routers >= 0], terminals[terminals >= 0]
+
+
+def split_routers_terminals_id(G, num_terminals):
+    terminals = []
+    routers = []
+    for nodeid in range(G.number_of_nodes()):
+        if nodeid < num_terminals:
+            # terminal
+            terminals.append(nodeid)
+        else:
+            # router
+            routers.append(nodeid)
+    return routers, terminals
+
+
+# split up edges into different lists
+# edges is an (E, 2) array and nodes the topology.NodeIndex of the graph
+def sfly_split_edges(edges, nodes, group_size):
+    terminal_edges, local_edges, global_edges = topology.split_edges(edges, nodes, nodes.router_start, group_size)
+
+    return topology.as_tuples(terminal_edges), topology.as_tuples(local_edges), topology.as_tuples(global_edges)
+
+
+# edges from a networkx graph as an (E, 2) array, in graph order
+def graph_edges(G):
+    return np.array([(int(v1), int(v2)) for v1, v2 in G.edges], dtype=np.int64).reshape(-1, 2)
+
+
+# dragonfly graph edges with ids converted to relative ids by lp_map
+def dfly_graph_edges(G, num_terminals, lp_map):
+    return lp_map.to_relative(graph_edges(G), num_terminals)
+
+
+# split up edges into different lists
+# edges is an (E, 2) array using converted ids, nodes the topology.NodeIndex of the graph
+def dfly_split_edges(edges, nodes, num_terminals, group_size):
+    terminal_edges, local_edges, global_edges = topology.split_edges(edges, nodes, num_terminals, group_size)
+
+    return topology.as_tuples(terminal_edges), topology.as_tuples(local_edges), topology.as_tuples(global_edges)
+
+
+# create my own slimfly graph layout
+# returns the placed node ids, their coordinates indexed by node id, NodeType values
+# and the group centers
+def slimfly_layout(total_vertices, nodes, edges, num_groups, group_size):
+    terminal_edges, local_edges, global_edges = topology.split_edges(edges, nodes, nodes.router_start, group_size)
+
+    if nodes.routers.size != num_groups * group_size:
+        sys.exit("ERROR: num_groups * group_size != num routers for slimfly layout")
+
+    # group centers on one circle, the second half of the groups mirrored in y
+    centers = layout.group_centers(num_groups, 120, [50, 100])
+    # each group's routers on a circle around its center
+    router_xy = layout.circle_groups(centers, group_size, 20, nodes.router_start)
+
+    # each router's terminals on a circle around the router
+    term_ids, router_ids = topology.terminal_router_pairs(terminal_edges, nodes)
+    ids, xy, node_arr = layout.routers_and_terminals(total_vertices, nodes.router_start, router_xy, term_ids, router_ids, 3)
+    return ids, xy, node_arr, centers
+
+
+# dragonfly ids based on CODES global LP ids
+# i.e., will need to skip over the ids for nw-lps
+def dragonfly_layout(total_vertices, nodes, edges, num_groups, group_size):
+    num_terminals = nodes.terminals.size
+    terminal_edges, local_edges, global_edges = topology.split_edges(edges, nodes, num_terminals, group_size)
+
+    if nodes.routers.size != num_groups * group_size:
+        sys.exit("ERROR: num_groups * group_size != num routers for dragonfly layout")
+
+    # group centers on one circle, the second half of the groups mirrored in y
+    centers = layout.group_centers(num_groups, 150, [0, 0])
+    # each group's routers on a grid of 16 columns around its center
+    router_xy = layout.grid_groups(centers, group_size, 12, num_cols=16)
+
+    # each router's terminals on a circle around the router
+    term_ids, router_ids = topology.terminal_router_pairs(terminal_edges, nodes)
+    ids, xy, node_arr = layout.routers_and_terminals(total_vertices, num_terminals, router_xy, term_ids, router_ids, 3)
+    return ids, xy, node_arr, centers
+
+
+# returns (total_vertices, 3) coordinates and NodeType values
+def fattree_layout(total_vertices, num_terminals, radix=36):
+    cn_per_router = radix // 2  # also same as router_per_pod
+    l1_start = num_terminals
+    l2_start = l1_start + num_terminals // cn_per_router
+    l3_start = l2_start + num_terminals // cn_per_router
+
+    coords = np.zeros((total_vertices, 3))
+    node_arr = np.zeros(total_vertices, dtype=np.int32)
+
+    # each level is on a circle, in the spots networkx's node order gave them
+    # start with L3
+    l3_ids = range(l3_start, total_vertices)
+    coords[l3_start:, :2] = layout.circle(len(l3_ids), 70, [0, 0])[layout.dict_order(l3_ids)]
+    coords[l3_start:, 2] = 75
+    node_arr[l3_start:] = 4
+
+    # set up L2
+    l2_ids = range(l2_start, l3_start)
+    l2_xy = layout.circle(len(l2_ids), 120, [0, 0])[layout.dict_order(l2_ids)]
+    coords[l2_start:l3_start, :2] = l2_xy
+    coords[l2_start:l3_start, 2] = 50
+    node_arr[l2_start:l3_start] = 3
+
+    # use L2 coordinates to set up corresponding L1 coordinates
+    # makes sure pods are lined up
+    even = (np.arange(l2_start, l3_start) % 2 == 0)[:, np.newaxis]
+    l1_xy = np.where(even, l2_xy * .9, l2_xy) * 1.75
+    coords[l1_start:l2_start, :2] = l1_xy
+    coords[l1_start:l2_start, 2] = np.where(even[:, 0], 30, 20)
+    node_arr[l1_start:l2_start] = 2
+
+    # terminals on a circle around their L1 router, which takes one of the spots on
+    # the circle. the ring of every router holds the router and cn_per_router terminals
+    ring = layout.circle_offsets(cn_per_router + 1, 5)
+    slots = np.array([layout.dict_order([l1_start + i] + list(range(i * cn_per_router, (i + 1) * cn_per_router)))[1:]
+                      for i in range(len(l1_xy))], dtype=np.int64).reshape(len(l1_xy), cn_per_router)
+    term_xy = (ring[slots] + l1_xy[:, np.newaxis]).reshape(-1, 2)[:num_terminals]
+    coords[:len(term_xy), :2] = term_xy
+    coords[:len(term_xy), 2] = 1
+    node_arr[:len(term_xy)] = 1
+
+    return coords, node_arr
+
+
+# filename is either the csv written by CODES or the same data converted with
+# python -m netvis.simfile, which is memory mapped instead of parsed.
+# watermark is a sampling.Watermark following the rows as they go into out
+def read_sim_data(filename, node_type, num_terminals, num_samples, samp_interval, out, watermark=None):
+    offset = 0
+    if node_type == "router":
+        offset = num_terminals
+    if simfile.is_simfile(filename):
+        out = simfile.read_sim_array(filename, node_type, num_samples, samp_interval, offset, out)
+    else:
+        out = sampling.read_sim_array(filename, node_type, num_samples, samp_interval, offset=offset, out=out,
+                                      watermark=watermark)
+    if watermark is not None:
+        watermark.finish(offset, out.shape[0] - num_terminals if node_type == "router" else num_terminals)
+    return out
+
+
+# same as read_sim_data, keeping each VC column in a vtkarrays.channel_matrix
+def read_vc_data(filename, node_type, num_terminals, num_samples, samp_interval, out, watermark=None):
+    offset = 0
+    if node_type == "router":
+        offset = num_terminals
+    if simfile.is_simfile(filename):
+        out = simfile.read_vc_array(filename, node_type, num_samples, samp_interval, offset, out)
+    else:
+        out = sampling.read_vc_array(filename, node_type, num_samples, samp_interval, offset, out, watermark)
+    if watermark is not None:
+        watermark.finish(offset, out.shape[0] - num_terminals if node_type == "router" else num_terminals)
+    return out
+
+
+# the router and terminal files read into out by two background threads, for
+# --pipeline. frames can be written as samples complete, see sampling.Watermark
+class BackgroundIngest(object):
+    def __init__(self, args, num_terminals, num_samples, out, read=read_sim_data):
+        self.watermark = sampling.Watermark(out.shape[0], num_samples)
+        self.readers = pipeline.Background([self.reader(read, args, "router", args["routerfile"], num_terminals,
+                                                        num_samples, out),
+                                            self.reader(read, args, "terminal", args["termfile"], num_terminals,
+                                                        num_samples, out)])
+
+    def reader(self, read, args, node_type, filename, num_terminals, num_samples, out):
+        def read_file():
+            try:
+                with trace.stage("ingest_" + node_type, bytes_read=file_bytes(filename)):
+                    read(filename, node_type, num_terminals, num_samples, int(args["samp_interval"]), out,
+                         self.watermark)
+            except BaseException:
+                # frames waiting for these samples give up instead of waiting forever
+                self.watermark.finish(0, 0, failed=True)
+                raise
+        return read_file
+
+    def wait(self, step):
+        self.watermark.wait(step)
+
+    # waits for the readers, returns the steps that got rows after their frame was written
+    def join(self):
+        self.readers.join()
+        return sorted(self.watermark.late)
+
+
+def read_channel_names(filename, node_type):
+    if simfile.is_simfile(filename):
+        return simfile.SimFile(filename).column_names
+    return sampling.read_channel_names(filename, node_type)
+
+
+# ids and xy are the placed nodes and coordinates from slimfly_layout
+def sfly_set_vtk_points_array(ids, xy, nodes):
+    return layout.vtk_points(ids, layout.rotate_halves(ids, xy[ids], nodes, 30))
+
+
+# ids and xy are the placed nodes and coordinates from dragonfly_layout
+def dfly_set_vtk_points_array(ids, xy, nodes):
+    return layout.vtk_points(ids, layout.rotate_halves(ids, xy[ids], nodes, 50))
+
+
+# group centers moved the same way as the group's routers
+def group_points_array(centers, nodes, routerid_start, group_size, translation):
+    first_routers = routerid_start + np.arange(len(centers)) * group_size
+    return layout.rotate_halves(first_routers, centers, nodes, translation).astype(np.float32)
+
+
+def ft_set_vtk_points_array(coords):
+    return layout.points_from_array(coords)
+
+
+def data_check(data, entities_start, entities_end, num_samples):
+    for i in range(entities_start, entities_end):
+        if i not in data:
+            data[i] = [0 for _ in range(num_samples)]
+    return data
+
+
+# node count, topology.NodeIndex and (E, 2) edge array of a GEXF graph,
+# with dragonfly CODES ids converted to relative ids by the codes.LPMap lp_map
+# (the LP layout of the bundled dragonfly by default)
+def read_topology(G, network, lp_map=None):
+    if network == "slimfly":
+        routers, terminals = sfly_split_routers_terminals(G)
+        edges = graph_edges(G)
+    elif network == "fattree":
+        #G = nx.convert_node_labels_to_integers(G)
+        routers, terminals = split_routers_terminals_id(G, 3240)
+        edges = graph_edges(G)
+    elif network == "dragonfly":
+        if lp_map is None:
+            lp_map = codes.LPMap.from_lp_types(codes.DRAGONFLY_LPS)
+        routers, terminals = dfly_split_routers_terminals(G, lp_map)
+        edges = dfly_graph_edges(G, len(terminals), lp_map)
+    else:
+        sys.exit("ERROR: --network type should be one of the following: slimfly, fattree, dragonfly")
+
+    return G.number_of_nodes(), topology.NodeIndex.from_lists(routers, terminals), edges
+
+
+# same as read_topology, but built by the generators in netvis/generators.py
+def generate_topology(network, num_groups, group_size, args):
+    if network == "dragonfly":
+        terminals_per_router = 4
+        if args["terminals_per_router"] is not None:
+            terminals_per_router = int(args["terminals_per_router"])
+        links_per_pair = None
+        if args["links_per_pair"] is not None:
+            links_per_pair = int(args["links_per_pair"])
+        node_type, indptr, indices = generators.dragonfly(group_size, num_groups, terminals_per_router,
+                                                          links_per_pair=links_per_pair)
+    elif network == "slimfly":
+        terminals_per_router = None
+        if args["terminals_per_router"] is not None:
+            terminals_per_router = int(args["terminals_per_router"])
+        node_type, indptr, indices = generators.slimfly(group_size, terminals_per_router)
+    elif network == "fattree":
+        if int(args["levels"]) != 3:
+            sys.exit("ERROR: fattree layout needs a 3 level fattree")
+        num_pods = None
+        if args["num_pods"] is not None:
+            num_pods = int(args["num_pods"])
+        node_type, indptr, indices = generators.fattree(int(args["radix"]), 3, num_pods)
+    else:
+        sys.exit("ERROR: --network type should be one of the following: slimfly, fattree, dragonfly")
+
+    return node_type.size, topology.NodeIndex(node_type), generators.edges_from_csr(indptr, indices)
+
+
+# run the layout for the given network and collect everything the output needs
+# as arrays, so it can be stored in the layout cache:
+# node_type (topology.NodeIndex types), node_arr (NodeType values), points,
+# edges in the order they are added to the vtkGraph and group_points, the
+# centers of the sfly/dfly groups
+def create_layout(network, num_nodes, nodes, edges, num_groups, group_size, radix=36):
+    with trace.stage("layout", nodes=num_nodes, edges=len(edges)):
+        if network == "slimfly":
+            ids, xy, node_arr, centers = slimfly_layout(num_nodes, nodes, edges, num_groups, group_size)
+            term_edges, local_edges, global_edges = sfly_split_edges(edges, nodes, group_size)
+            edges = term_edges + local_edges + global_edges
+        elif network == "fattree":
+            coords, node_arr = fattree_layout(num_nodes, nodes.terminals.size, radix)
+        elif network == "dragonfly":
+            ids, xy, node_arr, centers = dragonfly_layout(num_nodes, nodes, edges, num_groups, group_size)
+            term_edges, local_edges, global_edges = dfly_split_edges(edges, nodes, nodes.terminals.size, group_size)
+            edges = term_edges + local_edges + global_edges
+        else:
+            sys.exit("ERROR: --network type should be one of the following: slimfly, fattree, dragonfly")
+
+    with trace.stage("points", nodes=num_nodes):
+        if network == "slimfly":
+            points = sfly_set_vtk_points_array(ids, xy, nodes)
+            group_points = group_points_array(centers, nodes, nodes.router_start, group_size, 30)
+        elif network == "fattree":
+            points = ft_set_vtk_points_array(coords)
+            group_points = np.zeros((0, 3), dtype=np.float32)
+        else:
+            points = dfly_set_vtk_points_array(ids, xy, nodes)
+            group_points = group_points_array(centers, nodes, nodes.terminals.size, group_size, 50)
+        points = layout.points_to_array(points)
+
+    return {
+        "num_nodes": np.array(num_nodes),
+        "node_type": nodes.node_type,
+        "node_arr": node_arr,
+        "points": points,
+        "edges": np.array(edges, dtype=np.int32).reshape(-1, 2),
+        "group_points": group_points,
+    }
+
+
+# total size of filenames, for the throughput of the stages reading them
+def file_bytes(*filenames):
+    return sum(os.path.getsize(name) for name in filenames)
+
+
+# polydata of a vtkGraph with the given points and (E, 2) edges, one line cell per edge
+def graph_polydata(num_vertices, points, edges):
+    import vtk
+
+    graph = vtk.vtkMutableUndirectedGraph()
+    graph.SetNumberOfVertices(num_vertices)
+    graph.SetPoints(layout.points_from_array(points))
+    for v1, v2 in edges.tolist():
+        graph.LazyAddEdge(v1, v2)
+
+    edge_geom = vtk.vtkGraphToPolyData()
+    edge_geom.SetInputData(graph)
+    edge_geom.Update()
+    return edge_geom.GetOutput()
+
+
+# vtk copy of values, named name
+def named_array(values, name):
+    from vtk.util import numpy_support
+
+    arr = numpy_support.numpy_to_vtk(values, deep=1)
+    arr.SetName(name)
+    return arr
+
+
+# write polydata once per sample, as vtp files, chunks of samples or a single vtkhdf file.
+# point_steps and cell_steps are (name, samples) lists of the arrays that change
+# every sample, static_arrays the values of the point arrays already on polydata
+# and static_cell_arrays those of its cell arrays
+# ingest, when given, is a BackgroundIngest still filling point_steps: frames are
+# written as their samples complete
+def write_output(polydata, filename_out, times, point_steps, cell_steps, static_arrays, static_cell_arrays,
+                 args, component_names=None, ingest=None):
+    if args["output_format"] == "vtkhdf":
+        # geometry and static arrays go in once, each sample only adds its step arrays
+        print("creating VTKHDF file")
+        with trace.stage("write_vtkhdf", frames_total=len(times)) as st:
+            hdf = vtkhdf.TransientPolyDataWriter(filename_out + ".vtkhdf", polydata, [name for name, _ in point_steps],
+                                                 static_arrays, cell_step_names=[name for name, _ in cell_steps],
+                                                 static_cell_arrays=static_cell_arrays)
+            if not point_steps and not cell_steps:
+                hdf.add_step(0, {})
+            else:
+                hdf.add_steps(times, dict(point_steps + cell_steps))
+            hdf.close()
+            st.record["frames"] = len(times)
+            st.record["bytes_written"] = os.path.getsize(filename_out + ".vtkhdf")
+    elif args["output_format"] == "vtpchunk":
+        print("creating VTP chunk files")
+        with trace.stage("write_chunks", frames_total=len(times)) as st:
+            files = frames.write_chunks(polydata, filename_out, times, point_steps, cell_steps, int(args["chunk_steps"]),
+                                        component_names, progress=not trace.progress_enabled(),
+                                        writer_options=frames.writer_options(args))
+            st.record["bytes_written"] = sum(os.path.getsize(name) for name in files)
+    else:
+        # each step array is a view into its samples and gets pointed at each step in turn
+        step_arrays = []
+        for name, samples in point_steps:
+            cur_step = vtkarrays.StepArray(samples, name, component_names if samples.ndim == 3 else None)
+            polydata.GetPointData().AddArray(cur_step.array)
+            step_arrays.append(cur_step)
+        for name, samples in cell_steps:
+            cur_step = vtkarrays.StepArray(samples, name, component_names if samples.ndim == 3 else None)
+            polydata.GetCellData().AddArray(cur_step.array)
+            step_arrays.append(cur_step)
+
+        steps = None
+        if args["delta"]:
+            kinds = ["point"] * len(point_steps) + ["cell"] * len(cell_steps)
+            delta.write_deltas(filename_out + ".delta.npz",
+                               [(name, samples, kind) for (name, samples), kind in zip(point_steps + cell_steps, kinds)],
+                               times)
+            steps = [0]
+        elif args["skip_unchanged"]:
+            # steps equal to the one before are served by the earlier frame
+            changed = delta.changed_steps([samples for _, samples in point_steps + cell_steps], len(times))
+            frame_files = [filename_out + str(i) + ".vtp" for i in delta.frame_of_step(changed)]
+            frames.write_pvd(filename_out + ".pvd", times, frame_files)
+            steps = np.flatnonzero(changed)
+            print("skipping " + str(len(times) - len(steps)) + " unchanged frames")
+
+        if steps is None:
+            steps = range(len(times))
+        print("creating VTP files")
+        with trace.stage("write_vtp", frames_total=len(steps)) as st:
+            late = []
+            try:
+                frames.write_frames(polydata, filename_out, len(times), step_arrays, int(args["workers"]),
+                                    progress=not trace.progress_enabled(), steps=steps,
+                                    io_threads=int(args["io_threads"]), max_frames=int(args["max_frames"]),
+                                    ready=ingest.wait if ingest is not None else None,
+                                    writer_options=frames.writer_options(args))
+            finally:
+                if ingest is not None:
+                    late = ingest.join()
+            if late:
+                print("rewriting " + str(len(late)) + " frames that got rows after they were written")
+                if late[0] == steps[0]:
+                    frames.reset_array_info(polydata)
+                frames.write_frames(polydata, filename_out, len(times), step_arrays, progress=False, steps=late,
+                                    io_threads=int(args["io_threads"]), max_frames=int(args["max_frames"]),
+                                    writer_options=frames.writer_options(args))
+            st.record["bytes_written"] = sum(os.path.getsize(filename_out + str(i) + ".vtp") for i in steps)
+
+
+# hotspot index of samples, with the router group of every node when the groups are known
+def build_hotspots(args, topo, samples, router_group_size):
+    groups = None
+    if router_group_size > 0 and args["network"] != "fattree":
+        nodes = topology.NodeIndex(topo["node_type"])
+        groups = lod.group_segments(lod.router_segments(nodes, topo["edges"]), router_group_size)
+    times = np.arange(samples.shape[1]) * int(args["samp_interval"])
+    return hotspots.build_index(samples, times, topo["node_type"], groups, int(args["hotspot_k"]),
+                                int(args["hotspot_block"]))
+
+
+# apply --rebin and --stride to a sample array
+def retime(samples, args):
+    if int(args["rebin"]) > 1:
+        samples = temporal.rebin(samples, int(args["rebin"]), args["rebin_reduce"])
+    if int(args["stride"]) > 1:
+        samples = temporal.stride(samples, int(args["stride"]))
+    return samples
+
+
+# the layout dict of create_layout, from the layout cache when --cache_dir has it
+def load_layout(args, num_router_groups, router_group_size):
+    # warm runs load the layout from the cache and skip the GEXF and layout work entirely
+    topo = None
+    cache_key = None
+    if args["cache_dir"] is not None:
+        if args["generate"]:
+            source = "generated " + repr(sorted((k, args[k]) for k in ("terminals_per_router", "links_per_pair", "radix", "levels", "num_pods")))
+        else:
+            source = layout_cache.file_hash(args["graphfile"])
+            if args["codes_config"] is not None:
+                source += " " + layout_cache.file_hash(args["codes_config"])
+            if args["network"] == "fattree":
+                # the fattree layout sizes its levels from the radix
+                source += " " + repr(sorted((k, args[k]) for k in ("radix", "levels")))
+        cache_key = layout_cache.cache_key(source, args["network"], router_group_size, num_router_groups)
+        with trace.stage("cache_load"):
+            topo = layout_cache.load(args["cache_dir"], cache_key)
+        if topo is not None:
+            print("using cached layout " + cache_key)
+
+    if topo is None:
+        if args["generate"]:
+            print("generating topology...")
+            with trace.stage("generate") as st:
+                num_nodes, nodes, edges = generate_topology(args["network"], num_router_groups, router_group_size, args)
+                st.record.update(nodes=num_nodes, edges=len(edges))
+        else:
+            # read in network connections from Graph XML format
+            print("reading graph file...")
+            import networkx as nx
+            with trace.stage("read_gexf", bytes_read=os.path.getsize(args["graphfile"])):
+                G = nx.read_gexf(args["graphfile"])
+            with trace.stage("classify") as st:
+                lp_map = None
+                if args["codes_config"] is not None:
+                    lp_map = codes.LPMap.from_config(args["codes_config"])
+                num_nodes, nodes, edges = read_topology(G, args["network"], lp_map)
+                st.record.update(nodes=num_nodes, edges=len(edges))
+        print("done")
+
+        print("creating layout for visualization...")
+        topo = create_layout(args["network"], num_nodes, nodes, edges, num_router_groups, router_group_size,
+                             int(args["radix"]))
+        print("done")
+
+        if cache_key is not None:
+            layout_cache.store(args["cache_dir"], cache_key, topo, int(args["cache_max_mb"]) * 1024 * 1024)
+
+    return topo
+
+
+# write the --lod levels of topo, step_data and link_data, each as its own series
+def write_levels(args, topo, step_data, link_data, times, filename_out, router_group_size, channel_names):
+    nodes = topology.NodeIndex(topo["node_type"])
+    router_segs = lod.router_segments(nodes, topo["edges"])
+    levels = []
+    if args["lod"] in ("router", "all"):
+        levels.append(("router", router_segs, topo["points"][nodes.routers]))
+    if args["lod"] in ("group", "all"):
+        levels.append(("group", lod.group_segments(router_segs, router_group_size), topo["group_points"]))
+
+    for level, segments, points in levels:
+        print("creating " + level + " level")
+        with trace.stage("lod_" + level):
+            write_level(args, topo, step_data, link_data, times, filename_out + "_" + level, segments, points,
+                        channel_names)
+
+
+# one level of write_levels, segments maps every node to one of the points
+def write_level(args, topo, step_data, link_data, times, filename_out, segments, points, channel_names):
+    num_segments = len(points)
+    level_edges, edge_segments = lod.segment_edges(topo["edges"], segments)
+    level_poly = graph_polydata(num_segments, points, level_edges)
+
+    # how many nodes and links were folded into each point and line
+    node_count = np.bincount(segments[segments >= 0], minlength=num_segments).astype(np.int32)
+    link_count = np.bincount(edge_segments[edge_segments >= 0], minlength=len(level_edges)).astype(np.int32)
+    level_poly.GetPointData().AddArray(named_array(node_count, "NodeCount"))
+    level_poly.GetCellData().AddArray(named_array(link_count, "NumLinks"))
+
+    how = args["lod_reduce"]
+    point_steps = [(name, lod.segment_reduce(samples, segments, num_segments, how)) for name, samples in step_data]
+    cell_steps = []
+    if link_data is not None:
+        cell_steps.append(("LinkTraffic", lod.segment_reduce(link_data, edge_segments, len(level_edges), how)))
+    write_output(level_poly, filename_out, times, point_steps, cell_steps,
+                 {"NodeCount": node_count}, {"NumLinks": link_count}, args, channel_names)
+
+
+def main(argv=None):
+    args = vars(build_parser().parse_args(argv))
+    if args["trace"] is not None or args["progress"] or args["profile"] is not None:
+        trace.start(args["trace"], args["progress"], args["profile"], args["profile_out"])
+    try:
+        run(args)
+    finally:
+        trace.stop()
+
+
+def run(args):
+    # set these to figure out router groups
+    # TODO change to program input args
+    router_group_size = 0
+    num_router_groups = 0
+    if args["routers_per_group"] is not None:
+        router_group_size = int(args["routers_per_group"])
+    if args["num_groups"] is not None:
+        num_router_groups = int(args["num_groups"])
+    elif args["generate"] and args["network"] == "slimfly":
+        num_router_groups = 2 * router_group_size
+
+    if args["graphfile"] is None and not args["generate"]:
+        sys.exit("ERROR: either --graphfile or --generate is needed")
+
+    num_samples = 1
+    flythrough_flag = False
+    if args["routerfile"] is None or args["termfile"] is None:
+        flythrough_flag = True
+    if args["follow"] and (flythrough_flag or args["output_format"] != "vtp"):
+        sys.exit("ERROR: --follow needs --routerfile, --termfile and vtp output")
+    if args["per_vc"] and args["follow"]:
+        sys.exit("ERROR: --per_vc can't be used with --follow")
+    if args["linkfile"] is not None and (flythrough_flag or args["follow"]):
+        sys.exit("ERROR: --linkfile needs --routerfile and --termfile and can't be used with --follow")
+    if args["lod"] is not None and args["follow"]:
+        sys.exit("ERROR: --lod can't be used with --follow")
+    if (int(args["rebin"]) > 1 or int(args["stride"]) > 1) and (flythrough_flag or args["follow"]):
+        sys.exit("ERROR: --rebin and --stride need --routerfile and --termfile and can't be used with --follow")
+    if (args["skip_unchanged"] or args["delta"]) and (args["output_format"] != "vtp" or args["follow"]):
+        sys.exit("ERROR: --skip_unchanged and --delta need vtp output and can't be used with --follow")
+    if args["pipeline"] and (flythrough_flag or args["follow"]):
+        sys.exit("ERROR: --pipeline needs --routerfile and --termfile and can't be used with --follow")
+    if args["hotspots"] is not None and (flythrough_flag or args["follow"]):
+        sys.exit("ERROR: --hotspots needs --routerfile and --termfile and can't be used with --follow")
+    if args["lod"] in ("group", "all") and (args["network"] == "fattree" or router_group_size == 0):
+        sys.exit("ERROR: the group level needs a slimfly or dragonfly and --routers_per_group")
+    if args["output_format"] != "vtkhdf":
+        try:
+            frames.writer_options(args)
+        except ValueError as e:
+            sys.exit("ERROR: " + str(e))
+
+    filename_out = "vtp-files/"
+    if args["out_path"] is not None:
+        filename_out += args["out_path"] + "/"
+
+    if flythrough_flag:
+        filename_out += "flythrough/" + args["network"]
+    else:
+        filename_out += args["network"] + "/" + args["network"]
+
+    topo = load_layout(args, num_router_groups, router_group_size)
+
+    num_nodes = int(topo["num_nodes"])
+    num_terminals = int((topo["node_type"] == topology.TERMINAL).sum())
+
+    sim_data = None
+    vc_data = None
+    channel_names = None
+    stream = None
+    ingest = None
+    if args["follow"]:
+        num_samples = int(args["samp_end_time"]) // int(args["samp_interval"])
+        followers = [sampling.FileFollower(args["routerfile"], "router", num_terminals, num_nodes - num_terminals),
+                     sampling.FileFollower(args["termfile"], "terminal", 0, num_terminals)]
+        stream = sampling.SampleStream(followers, num_nodes, num_samples, int(args["samp_interval"]), int(args["follow_window"]))
+    elif args["per_vc"]:
+        num_samples = int(args["samp_end_time"]) // int(args["samp_interval"])
+        channel_names = max(read_channel_names(args["routerfile"], "router"),
+                            read_channel_names(args["termfile"], "terminal"), key=len)
+        # (nodes, samples, channels), with each sample's (nodes, channels) block contiguous
+        vc_data = vtkarrays.channel_matrix(num_nodes, num_samples, len(channel_names))
+        with trace.stage("ingest", nodes=num_nodes, bytes_read=file_bytes(args["routerfile"], args["termfile"])):
+            if args["pipeline"]:
+                print("reading router and terminal data...")
+                BackgroundIngest(args, num_terminals, num_samples, vc_data, read_vc_data).join()
+            else:
+                print("reading router data...")
+                read_vc_data(args["routerfile"], "router", num_terminals, num_samples, int(args["samp_interval"]), vc_data)
+                print("done\nreading terminal data...")
+                read_vc_data(args["termfile"], "terminal", num_terminals, num_samples, int(args["samp_interval"]), vc_data)
+            print("done\n")
+            vc_data = vtkarrays.compact(vc_data)
+        if args["vc_sum"]:
+            sim_data = vtkarrays.sample_matrix(num_nodes, num_samples)
+            sim_data[...] = vc_data.sum(axis=2)
+    elif not flythrough_flag:
+        num_samples = int(args["samp_end_time"]) // int(args["samp_interval"])
+        # one row per terminal then router, one column per sample
+        sim_data = vtkarrays.sample_matrix(num_nodes, num_samples)
+        if args["pipeline"]:
+            # read while the geometry and links are set up, and possibly while frames are written
+            print("reading router and terminal data in the background")
+            ingest = BackgroundIngest(args, num_terminals, num_samples, sim_data)
+        else:
+            with trace.stage("ingest", nodes=num_nodes, bytes_read=file_bytes(args["routerfile"], args["termfile"])):
+                print("reading router data...")
+                read_sim_data(args["routerfile"], "router", num_terminals, num_samples, int(args["samp_interval"]), sim_data)
+                print("done\nreading terminal data...")
+                read_sim_data(args["termfile"], "terminal", num_terminals, num_samples, int(args["samp_interval"]), sim_data)
+                print("done\n")
+    else:
+        flythrough_flag = True
+
+    # using the vtkGraph approach
+    with trace.stage("edges", nodes=num_nodes, edges=len(topo["edges"])):
+        polydata = graph_polydata(num_nodes, topo["points"], topo["edges"])
+        polydata.GetPointData().AddArray(named_array(topo["node_arr"], "NodeType"))
+
+    # one LinkTraffic value per edge, i.e. per cell of the polydata
+    link_data = None
+    if args["linkfile"] is not None:
+        print("reading link data...")
+        with trace.stage("ingest_links", edges=len(topo["edges"]), bytes_read=file_bytes(args["linkfile"])):
+            ports = links.PortTable(topo["edges"], topology.NodeIndex(topo["node_type"]))
+            link_data = vtkarrays.sample_matrix(len(topo["edges"]), num_samples)
+            unmapped = links.read_link_array(args["linkfile"], ports, num_samples, int(args["samp_interval"]),
+                                             num_terminals, link_data)
+        if unmapped:
+            print("WARNING: " + str(unmapped) + " link rows have a router port with no link, skipped")
+        print("done\n")
+
+    # frames are only written while the samples are read when each frame is a plain column of them
+    if ingest is not None and (args["output_format"] != "vtp" or int(args["workers"]) > 1 or int(args["rebin"]) > 1 or
+                               int(args["stride"]) > 1 or args["skip_unchanged"] or args["delta"] or
+                               args["hotspots"] is not None):
+        with trace.stage("ingest", nodes=num_nodes):
+            ingest.join()
+        ingest = None
+
+    # per node statistics, from the samples at full resolution
+    static_arrays = {"NodeType": topo["node_arr"]}
+    if args["hotspots"] is not None:
+        print("writing hotspot index " + args["hotspots"])
+        with trace.stage("hotspots", nodes=num_nodes):
+            samples = sim_data if sim_data is not None else vc_data.sum(axis=2, dtype=np.int64)
+            index = build_hotspots(args, topo, samples, router_group_size)
+            hotspots.write_index(args["hotspots"], index)
+        for name, values in sorted(hotspots.point_arrays(index).items()):
+            polydata.GetPointData().AddArray(named_array(values, name))
+            static_arrays[name] = values
+
+    # arrays written for every sample
+    step_data = []
+    if vc_data is not None:
+        step_data.append(("VC_Occupancy", vc_data))
+        if sim_data is not None:
+            step_data.append(("VC_Occupancy_Sum", sim_data))
+    elif sim_data is not None:
+        step_data.append(("VC_Occupancy", sim_data))
+
+    # frame times, with the samples re-binned and strided down to the resolution asked for
+    times = np.zeros(1)
+    if not flythrough_flag:
+        with trace.stage("retime"):
+            step_data = [(name, retime(samples, args)) for name, samples in step_data]
+            if link_data is not None:
+                link_data = retime(link_data, args)
+        step_interval = int(args["samp_interval"]) * int(args["rebin"]) * int(args["stride"])
+        num_samples = temporal.num_steps(num_samples, int(args["rebin"]), int(args["stride"]))
+        times = np.arange(num_samples) * step_interval
+
+    if args["follow"]:
+        # frames are written as the simulation produces them, from a ring of recent samples
+        cur_step = vtkarrays.StepArray(stream.ring, "VC_Occupancy")
+        polydata.GetPointData().AddArray(cur_step.array)
+        print("following " + args["routerfile"] + " and " + args["termfile"])
+        with trace.stage("follow"):
+            frames.follow_frames(stream, polydata, filename_out, cur_step, float(args["poll_interval"]),
+                                 float(args["idle_timeout"]), progress=not trace.progress_enabled(),
+                                 writer_options=frames.writer_options(args))
+    else:
+        cell_steps = []
+        if link_data is not None:
+            cell_steps.append(("LinkTraffic", link_data))
+        write_output(polydata, filename_out, times, step_data, cell_steps, static_arrays, {},
+                     args, channel_names, ingest)
+
+    # coarser levels of detail from the same data, each written as its own series
+    if args["lod"] is not None:
+        write_levels(args, topo, step_data, link_data, times, filename_out, router_group_size, channel_names)
+
+
+if __name__ == "__main__":
+    main()
+
+
+###############################
+### old way of doing things
+# instead of one large graphs of all terminals and routers
+# turn into a hierarchy of graphs
+# first separate nodes in G into routers and terminals
+#routers, terminals = split_routers_terminals(G)
+#
+## create a new graph for each router and its terminals
+#router_graphs = {x: nx.Graph() for x in routers}
+#
+#for router, rgraph in router_graphs.iteritems():
+#    rgraph.name = int(router)
+#    rgraph.add_node(router)
+#
+#intra_edges = []
+#inter_edges = []
+#term_edges = []
+#routerid_start = min(routers)
+#num_groups = len(routers) / router_group_size
+#for v1, v2 in G.edges:
+#    v1 = int(v1)
+#    v2 = int(v2)
+#    t = -1
+#    r = -1
+#    if v1 in terminals:
+#        t = v1
+#        r = v2
+#    elif v2 in terminals:
+#        t = v2
+#        r = v1
+#
+#    if v1 not in terminals and v2 not in terminals:
+#        # determine whether intra- or inter- link
+#        g1 = (v1 - routerid_start) / router_group_size
+#        g2 = (v2 - routerid_start) / router_group_size
+#        if g1 == g2:
+#            intra_edges.append((v1, v2))
+#        else:
+#            inter_edges.append((v1, v2))
+#
+#    if t > 0:
+#        router_graphs[r].add_edge(r, t)
+#        term_edges.append((t, r))
+#
+#print("length of term_edges: " + str(len(term_edges)))
+#print("length of intra_edges: " + str(len(intra_edges)))
+#print("length of inter_edges: " + str(len(inter_edges)))
+#
+## create new graph for each router group
+##group_graphs = {x: nx.Graph() for x in range(num_groups)}
+#
+##grp_id = -1
+##for i in range(routerid_start, num_net_nodes):
+##    if i % router_group_size == 0:
+##        grp_id += 1
+##    group_graphs[grp_id].add_node(router_graphs[i])
+#
+##for v1, v2 in intra_edges:
+##    grp = (v1 - routerid_start) / router_group_size
+##    grp2 = (v1 - routerid_start) / router_group_size
+##    group_graphs[grp].add_edge(router_graphs[v1], router_graphs[v2])
+#
+#
+## how to do connections between different groups?
+#
+## create the two bipartite subgraphs
+##subgraphs = {x: nx.Graph() for x in range(2)}
+##for i in range(num_groups):
+##    sg_id = -1
+##    if i < num_groups/2:
+##        sg_id = 0
+##    else:
+##        sg_id = 1
+##    subgraphs[sg_id].add_node(group_graphs[i])
+#
+#
+## now create one graph of all router subgraphs
+#full_graph = nx.Graph()
+##for key, ggraph in group_graphs.iteritems():
+#for key, ggraph in router_graphs.iteritems():
+#    ggraph.name = int(key)
+#    full_graph.add_node(ggraph)
+#
+#for v1, v2 in intra_edges:
+#    full_graph.add_edge(router_graphs[v1], router_graphs[v2])
+#
+#for v1, v2 in inter_edges:
+#    full_graph.add_edge(router_graphs[v1], router_graphs[v2])
+#
+## add in edges for routers
+##for v1, v2 in G.edges:
+##    if v1 not in terminals and v2 not in terminals:
+##        # need to use specific router graph to add edges between subgraphs, not their names
+##        full_graph.add_edge(router_graphs[int(v1)], router_graphs[int(v2)])
+#
+## first set the coordinates of the each group
+##group_coords = nx.circular_layout(full_graph, dim=2, scale=4)
+#router_coords = nx.circular_layout(full_graph, dim=2, scale=4)
+#
+## use group_coords to determine coords of each router in each group
+##router_coords = {}
+#terminal_coords = {}
+#for ggraph, coords in router_coords.iteritems():
+#    key = ggraph.name
+#    fixed_pos = list(coords)
+#    terminal_coords[key] = nx.circular_layout(ggraph, center=fixed_pos, dim=2, scale=2)
+#
+## use router_coords to determine where to place the teriminals
+##for groupid, gmap in router_coords.iteritems():
+##    for rgraph, coords in gmap.iteritems():
+##        key = rgraph.name
+##        fixed_pos = {key: coords}
+##        terminal_coords[key] = nx.spring_layout(rgraph, fixed=[key], pos=fixed_pos, dim=2)
+#
+
@@ -0,0 +1,79 @@
+import sys
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+# threads for overlapping the stages of a run: reading the router and terminal
+# files at the same time, and writing finished frames to disk while the next
+# ones are built.
+# vtk's writers and numpy's text parsing hold the GIL, file reads and writes
+# don't, so what overlaps is mostly waiting on the disk
+
+
+# runs each of funcs in its own thread right away. join() waits for all of them
+# and raises the first exception any of them hit
+class Background(object):
+    def __init__(self, funcs):
+        self.errors = []
+        self.threads = [threading.Thread(target=self.run, args=(func,)) for func in funcs]
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def run(self, func):
+        try:
+            func()
+        except BaseException:
+            self.errors.append(sys.exc_info())
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0][1]
+
+
+# writes (filename, text) pairs from a bounded queue with num_threads threads.
+# put() blocks while max_pending files are waiting, which caps how many built
+# frames are held in memory. errors are raised by close()
+class FileWriter(object):
+    def __init__(self, num_threads, max_pending):
+        self.queue = queue.Queue(max(1, max_pending))
+        self.errors = []
+        self.threads = [threading.Thread(target=self.run) for _ in range(max(1, num_threads))]
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def put(self, filename, text):
+        self.queue.put((filename, text))
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            # after an error the queue is still drained, so put() never blocks for good
+            if self.errors:
+                continue
+            filename, text = item
+            # vtk hands back str for text and base64 output, bytes for raw appended data
+            if not isinstance(text, bytes):
+                text = text.encode("utf-8")
+            try:
+                f = open(filename, "wb")
+                f.write(text)
+                f.close()
+            except Exception:
+                self.errors.append(sys.exc_info())
+
+    def close(self):
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0][1]
@@ -0,0 +1,402 @@
+import re
+import threading
+
+import numpy as np
+
+from netvis import trace
+from netvis import vtkarrays
+
+# size of each text block handed to numpy at once
+# keeps peak memory bounded by the output array rather than the input file
+BLOCK_SIZE = 1 << 24
+
+
+# parse the header line of a CODES router/terminal sampling file
+# returns the column names plus the positions of the id, end_time and first VC column
+def read_header(line, node_type):
+    cols = [c.strip() for c in line.strip().split(",")]
+    if node_type == "router":
+        id_col = cols.index("router_id")
+    elif node_type == "terminal":
+        id_col = cols.index("terminal_id")
+    else:
+        raise ValueError("node_type should be router or terminal, not " + str(node_type))
+    time_col = cols.index("end_time")
+    return cols, id_col, time_col, time_col + 1
+
+
+# yield large blocks of text that each end on a line boundary
+def iter_text_blocks(f, block_size=None):
+    if block_size is None:
+        block_size = BLOCK_SIZE
+    leftover = ""
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        block = leftover + block
+        cut = block.rfind("\n")
+        if cut < 0:
+            leftover = block
+            continue
+        leftover = block[cut + 1:]
+        yield block[:cut]
+    if leftover:
+        yield leftover
+
+
+# yield 2d float arrays of whole rows, parsing a large block of text at a time
+def iter_row_blocks(f, num_cols, block_size=None):
+    for text in iter_text_blocks(f, block_size):
+        rows = parse_rows(text, num_cols)
+        if rows is not None:
+            trace.add("rows", len(rows))
+            yield rows
+
+
+def parse_rows(text, num_cols):
+    text = text.replace("\r", "").strip()
+    if not text:
+        return None
+    vals = np.fromstring(text.replace("\n", ","), dtype=np.float64, sep=",")
+    if vals.size % num_cols != 0:
+        raise ValueError("sampling file has rows with a column count different from its header")
+    return vals.reshape(-1, num_cols)
+
+
+# node ids and sample indices of a block of parsed rows
+def row_index(rows, id_col, time_col, offset, samp_interval):
+    node_ids = rows[:, id_col].astype(np.int64) + offset
+    idx = (rows[:, time_col] / samp_interval).astype(np.int64)
+    return node_ids, idx
+
+
+# node ids, sample indices and summed VC values of a block of parsed rows
+def row_values(rows, id_col, time_col, vc_start, offset, samp_interval):
+    node_ids, idx = row_index(rows, id_col, time_col, offset, samp_interval)
+    vals = rows[:, vc_start:].sum(axis=1)
+    return node_ids, idx, vals
+
+
+# mask that drops the first row of every node not in seen yet, then marks them seen
+def first_row_mask(node_ids, seen):
+    uniq, first = np.unique(node_ids, return_index=True)
+    new = ~seen[uniq]
+    keep = np.ones(len(node_ids), dtype=bool)
+    keep[first[new]] = False
+    seen[uniq] = True
+    return keep
+
+
+# the number of rows whose node id is outside offset to end, then node_ids and
+# every other per row array with those rows left out
+def rows_inside(offset, end, node_ids, *arrays):
+    inside = (node_ids >= offset) & (node_ids < end)
+    if inside.all():
+        return (0, node_ids) + arrays
+    return (int(len(inside) - inside.sum()), node_ids[inside]) + tuple(a[inside] for a in arrays)
+
+
+# what is "rows" for csv files and "nodes" for converted ones, which only keep
+# one matrix row per node
+def warn_outside(filename, outside, num_nodes, what="rows"):
+    if outside:
+        print("WARNING: " + str(outside) + " " + what + " of " + filename + " have node ids outside 0 to " +
+              str(num_nodes - 1) + ", skipped")
+
+
+# column-oriented replacement for read_sim_data
+# fills out[offset + id, sample] with the summed VC occupancy of each row, where
+# offset is num_terminals for routers and 0 for terminals, same as read_sim_data.
+# like read_sim_data, the first row seen for a node only registers the node and
+# its value is left at 0. rows whose node id doesn't fit in out are skipped with a warning.
+# out is allocated as (num_nodes, num_samples) if not given.
+# watermark is a Watermark told about every block of rows once it is in out
+def read_sim_array(filename, node_type, num_samples, samp_interval, offset=0,
+                   out=None, num_nodes=None, dtype=np.int64, watermark=None):
+    if out is None:
+        if num_nodes is None:
+            raise ValueError("read_sim_array needs either out or num_nodes")
+        out = np.zeros((num_nodes, num_samples), dtype=dtype)
+    seen = np.zeros(out.shape[0], dtype=bool)
+    outside = 0
+
+    f = open(filename, "r")
+    cols, id_col, time_col, vc_start = read_header(f.readline(), node_type)
+    for rows in iter_row_blocks(f, len(cols)):
+        node_ids, idx, vals = row_values(rows, id_col, time_col, vc_start, offset, samp_interval)
+        skipped, node_ids, idx, vals = rows_inside(offset, out.shape[0], node_ids, idx, vals)
+        outside += skipped
+        keep = first_row_mask(node_ids, seen)
+        keep &= (idx >= 0) & (idx < num_samples)
+        out[node_ids[keep], idx[keep]] = vals[keep]
+        if watermark is not None:
+            watermark.update(node_ids, idx, keep)
+    f.close()
+    warn_outside(filename, outside, out.shape[0] - offset)
+
+    return out
+
+
+# first token of every line, the label column of mpi-sampling-stats rows
+MPI_LABEL = re.compile(r"(?m)^[ \t]*\S+[ \t]+")
+
+
+# samples per core of an mpi-sampling-stats file, from its second header line
+# ("interval <samp_interval> end <end_time>")
+def read_mpi_header(f):
+    f.readline()
+    tokens = f.readline().split()
+    samp_interval = float(tokens[1])
+    end_time = float(tokens[3])
+    return samp_interval, end_time, int(end_time / samp_interval)
+
+
+# (num_cores, num_samples) sample matrix of an mpi-sampling-stats file, whose rows
+# are "<label> <core id> <sample> <value>", parsed a block at a time like the
+# router and terminal files. rows of cores at or past num_cores and samples past
+# the end time are dropped. without num_cores the matrix grows to the largest core id.
+# returns the matrix, samp_interval and end_time
+def read_mpi_array(filename, num_cores=None, dtype=np.int32):
+    f = open(filename, "r")
+    samp_interval, end_time, num_samples = read_mpi_header(f)
+    out = vtkarrays.sample_matrix(num_cores or 0, num_samples, dtype)
+    used = 0
+    for text in iter_text_blocks(f):
+        vals = np.fromstring(MPI_LABEL.sub("", text.replace("\r", "")), dtype=np.int64, sep=" ")
+        if vals.size % 3 != 0:
+            f.close()
+            raise ValueError(filename + " has rows without a core id, sample and value")
+        rows = vals.reshape(-1, 3)
+        trace.add("rows", len(rows))
+        keep = (rows[:, 0] >= 0) & (rows[:, 1] >= 0) & (rows[:, 1] < num_samples)
+        if num_cores is not None:
+            keep &= rows[:, 0] < num_cores
+        rows = rows[keep]
+        if not len(rows):
+            continue
+        if num_cores is None:
+            used = max(used, int(rows[:, 0].max()) + 1)
+            if used > out.shape[0]:
+                # doubling keeps the copies to a constant factor of the final size
+                grown = vtkarrays.sample_matrix(max(used, 2 * out.shape[0]), num_samples, dtype)
+                grown[:out.shape[0]] = out
+                out = grown
+        out[rows[:, 0], rows[:, 1]] = rows[:, 2]
+    f.close()
+
+    if num_cores is None and used < out.shape[0]:
+        out = np.asfortranarray(out[:used])
+    return out, samp_interval, end_time
+
+
+# names of the VC columns of a sampling file
+def read_channel_names(filename, node_type):
+    f = open(filename, "r")
+    cols, id_col, time_col, vc_start = read_header(f.readline(), node_type)
+    f.close()
+    return cols[vc_start:]
+
+
+# like read_sim_array, but keeps every VC column: fills out[offset + id, sample, vc]
+# of a (num_nodes, num_samples, num_channels) array such as vtkarrays.channel_matrix.
+# files with fewer VC columns than out leave the remaining channels at 0
+def read_vc_array(filename, node_type, num_samples, samp_interval, offset, out, watermark=None):
+    seen = np.zeros(out.shape[0], dtype=bool)
+    outside = 0
+
+    f = open(filename, "r")
+    cols, id_col, time_col, vc_start = read_header(f.readline(), node_type)
+    num_vcs = len(cols) - vc_start
+    if num_vcs > out.shape[2]:
+        f.close()
+        raise ValueError(filename + " has " + str(num_vcs) + " VC columns, more than the " +
+                         str(out.shape[2]) + " channels of the output")
+    for rows in iter_row_blocks(f, len(cols)):
+        node_ids, idx = row_index(rows, id_col, time_col, offset, samp_interval)
+        skipped, node_ids, idx, rows = rows_inside(offset, out.shape[0], node_ids, idx, rows)
+        outside += skipped
+        keep = first_row_mask(node_ids, seen)
+        keep &= (idx >= 0) & (idx < num_samples)
+        out[node_ids[keep], idx[keep], :num_vcs] = rows[keep, vc_start:]
+        if watermark is not None:
+            watermark.update(node_ids, idx, keep)
+    f.close()
+    warn_outside(filename, outside, out.shape[0] - offset)
+
+    return out
+
+
+# which samples of a sample matrix are complete while files are still being read
+# into it, so frames can be written before the reading is done.
+# like SampleStream, sample k of a node is taken to be complete once the node has
+# a row for a later sample, and a reader calls finish() for its nodes at the end.
+# rows for a sample that was already handed out by wait() are collected in late,
+# those frames have to be written again once everything is read
+class Watermark(object):
+    def __init__(self, num_nodes, num_samples):
+        self.num_samples = num_samples
+        self.latest = np.full(num_nodes, -1, dtype=np.int64)
+        self.mark = 0
+        self.handed_out = 0
+        self.late = set()
+        self.failed = False
+        self.cond = threading.Condition()
+
+    # node_ids and idx of a block of rows, keep the rows that went into the matrix
+    def update(self, node_ids, idx, keep):
+        with self.cond:
+            np.maximum.at(self.latest, node_ids, idx)
+            late = idx[keep] < self.handed_out
+            if late.any():
+                self.late.update(int(i) for i in idx[keep][late])
+            self.advance()
+
+    # every sample of nodes [start, start + count) is in, or reading them failed
+    def finish(self, start, count, failed=False):
+        with self.cond:
+            self.latest[start:start + count] = self.num_samples
+            self.failed = self.failed or failed
+            self.advance()
+
+    def advance(self):
+        mark = min(int(self.latest.min()) if self.latest.size else self.num_samples, self.num_samples)
+        if mark > self.mark or self.failed:
+            self.mark = max(mark, self.mark)
+            self.cond.notify_all()
+
+    # blocks until sample step is complete
+    def wait(self, step):
+        with self.cond:
+            while self.mark <= step and not self.failed:
+                self.cond.wait(1.0)
+            if self.failed:
+                raise RuntimeError("reading the sampling files failed")
+            self.handed_out = max(self.handed_out, step + 1)
+
+
+# reads the rows a running simulation has appended to a sampling file since the
+# last poll. only complete lines are parsed and the file position is kept, so
+# earlier bytes are never read again
+class FileFollower(object):
+    def __init__(self, filename, node_type, offset, num_nodes):
+        self.filename = filename
+        self.node_type = node_type
+        self.offset = offset
+        self.num_nodes = num_nodes
+        self.f = None
+        self.cols = None
+        self.leftover = ""
+
+    def poll(self):
+        if self.f is None:
+            try:
+                self.f = open(self.filename, "r")
+            except IOError:
+                return None
+        block = self.leftover + self.f.read(BLOCK_SIZE)
+        cut = block.rfind("\n")
+        if cut < 0:
+            self.leftover = block
+            return None
+        self.leftover = block[cut + 1:]
+        text = block[:cut]
+        if self.cols is None:
+            header, _, text = text.partition("\n")
+            self.cols, self.id_col, self.time_col, self.vc_start = read_header(header, self.node_type)
+        return parse_rows(text, len(self.cols))
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+
+# follows the router and terminal files of a running simulation.
+# only a ring of window samples is kept in memory; sample k lives in column
+# k % window of ring, which is fortran ordered like vtkarrays.sample_matrix.
+# the window grows when one file runs more than window samples ahead of another.
+# a sample is complete once every node of every file has reported a later sample,
+# and is handed out in order by complete_steps
+class SampleStream(object):
+    def __init__(self, followers, num_nodes, num_samples, samp_interval, window=64, dtype=np.int32):
+        self.followers = followers
+        self.num_samples = num_samples
+        self.samp_interval = samp_interval
+        self.window = window
+        self.ring = np.zeros((num_nodes, window), dtype=dtype, order="F")
+        self.seen = np.zeros(num_nodes, dtype=bool)
+        self.latest = np.full(num_nodes, -1, dtype=np.int64)
+        self.next_step = 0
+        self.dropped = 0
+        # rows skipped for a node id outside their file's nodes, by file name
+        self.outside = {}
+
+    # read whatever the followers have, returns the number of new rows
+    def update(self):
+        new_rows = 0
+        for follower in self.followers:
+            rows = follower.poll()
+            while rows is not None:
+                new_rows += len(rows)
+                self.add_rows(follower, rows)
+                rows = follower.poll()
+        return new_rows
+
+    def add_rows(self, follower, rows):
+        node_ids, idx, vals = row_values(rows, follower.id_col, follower.time_col, follower.vc_start,
+                                         follower.offset, self.samp_interval)
+        skipped, node_ids, idx, vals = rows_inside(follower.offset, follower.offset + follower.num_nodes,
+                                                   node_ids, idx, vals)
+        if skipped:
+            self.outside[follower.filename] = self.outside.get(follower.filename, 0) + skipped
+        np.maximum.at(self.latest, node_ids, idx)
+        keep = first_row_mask(node_ids, self.seen)
+
+        # rows for samples already written out can't be used any more
+        late = idx < self.next_step
+        self.dropped += int((keep & late).sum())
+        keep &= ~late & (idx < self.num_samples)
+        if keep.any():
+            self.grow(int(idx[keep].max()) - self.next_step + 1)
+        self.ring[node_ids[keep], idx[keep] % self.window] = vals[keep]
+
+    # make room for samples next_step to next_step + needed - 1 when the files have
+    # drifted further apart than the window, doubling it so the copies stay rare.
+    # ring is a new array afterwards
+    def grow(self, needed):
+        if needed <= self.window:
+            return
+        window = self.window
+        while window < needed:
+            window *= 2
+        ring = np.zeros((self.ring.shape[0], window), dtype=self.ring.dtype, order="F")
+        steps = np.arange(self.next_step, self.next_step + self.window)
+        ring[:, steps % window] = self.ring[:, steps % self.window]
+        self.ring = ring
+        self.window = window
+
+    # first sample not yet covered by every node of every file
+    def watermark(self):
+        mark = self.num_samples
+        for follower in self.followers:
+            latest = self.latest[follower.offset:follower.offset + follower.num_nodes]
+            mark = min(mark, int(latest.min()) if latest.size else mark)
+        return mark
+
+    # steps that can be written now, in order. with flush every remaining step is
+    # handed out, for when the simulation has stopped writing
+    def complete_steps(self, flush=False):
+        end = self.num_samples if flush else self.watermark()
+        while self.next_step < min(end, self.num_samples):
+            yield self.next_step
+            # the column is reused for sample next_step + window
+            self.ring[:, self.next_step % self.window] = 0
+            self.next_step += 1
+
+    def done(self):
+        return self.next_step >= self.num_samples
+
+    def close(self):
+        for follower in self.followers:
+            follower.close()
@@ -0,0 +1,228 @@
+import argparse
+import json
+import struct
+import sys
+
+import numpy as np
+
+from netvis import sampling
+from netvis import vtkarrays
+
+# converted sampling data: MAGIC, the header length as a little endian uint64, a
+# json header and then one (num_nodes, num_samples) fortran ordered matrix per
+# column, each starting on an ALIGN byte boundary so it can be memory mapped.
+# every step of a column is one contiguous run of bytes, so only the steps that
+# are used get read from disk
+MAGIC = b"NVSIMDAT"
+VERSION = 1
+ALIGN = 64
+
+
+def is_simfile(filename):
+    f = open(filename, "rb")
+    magic = f.read(len(MAGIC))
+    f.close()
+    return magic == MAGIC
+
+
+# header holds kind, samp_interval, end_time, num_samples and num_nodes,
+# columns is a list of (name, matrix)
+def write(filename, header, columns):
+    header = dict(header)
+    header["version"] = VERSION
+    header["columns"] = []
+
+    # offsets depend on the header length, which depends on the offsets
+    # so size the header with placeholders first
+    for name, matrix in columns:
+        header["columns"].append({"name": name, "dtype": matrix.dtype.str,
+                                  "shape": list(matrix.shape), "offset": 0})
+    data_start = 0
+    while True:
+        start = _align(len(MAGIC) + 8 + len(json.dumps(header, sort_keys=True).encode("utf-8")))
+        if start == data_start:
+            break
+        data_start = start
+        offset = data_start
+        for col, (name, matrix) in zip(header["columns"], columns):
+            col["offset"] = offset
+            offset = _align(offset + matrix.nbytes)
+
+    text = json.dumps(header, sort_keys=True).encode("utf-8")
+    f = open(filename, "wb")
+    f.write(MAGIC)
+    f.write(struct.pack("<Q", len(text)))
+    f.write(text)
+    for col, (name, matrix) in zip(header["columns"], columns):
+        f.write(b"\0" * (col["offset"] - f.tell()))
+        np.asarray(matrix, dtype=col["dtype"]).ravel(order="F").tofile(f)
+    f.close()
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+# memory mapped view of a converted file
+class SimFile(object):
+    def __init__(self, filename):
+        self.filename = filename
+        f = open(filename, "rb")
+        if f.read(len(MAGIC)) != MAGIC:
+            f.close()
+            raise ValueError(filename + " is not a converted sampling file")
+        size = struct.unpack("<Q", f.read(8))[0]
+        self.header = json.loads(f.read(size).decode("utf-8"))
+        f.close()
+        if self.header["version"] != VERSION:
+            raise ValueError(filename + " was converted by a different version, convert it again")
+        self.kind = self.header["kind"]
+        self.samp_interval = self.header["samp_interval"]
+        self.num_samples = self.header["num_samples"]
+        self.num_nodes = self.header["num_nodes"]
+        self.column_names = [col["name"] for col in self.header["columns"]]
+
+    # (num_nodes, num_samples) fortran ordered memmap of a column. copy on write
+    # so vtk can wrap it, nothing is written back to the file
+    def column(self, name):
+        for col in self.header["columns"]:
+            if col["name"] == name:
+                return np.memmap(self.filename, dtype=np.dtype(col["dtype"]), mode="c",
+                                 offset=col["offset"], shape=tuple(col["shape"]), order="F")
+        raise KeyError(name)
+
+
+# header and (name, matrix) VC columns of a CODES router or terminal sampling csv.
+# values are stored the way read_sim_array stores their sum, including
+# dropping the first row of every node
+def read_sampling_columns(filename, node_type, samp_interval, end_time, dtype=np.int32):
+    num_samples = int(end_time) // int(samp_interval)
+    f = open(filename, "r")
+    cols, id_col, time_col, vc_start = sampling.read_header(f.readline(), node_type)
+    # the node count is only known at the end, the matrices grow as ids show up
+    seen = np.zeros(0, dtype=bool)
+    matrices = [vtkarrays.sample_matrix(0, num_samples, dtype) for _ in cols[vc_start:]]
+    num_nodes = 0
+    for rows in sampling.iter_row_blocks(f, len(cols)):
+        node_ids, idx, _ = sampling.row_values(rows, id_col, time_col, vc_start, 0, samp_interval)
+        valid = node_ids >= 0
+        rows, node_ids, idx = rows[valid], node_ids[valid], idx[valid]
+        if not len(rows):
+            continue
+        num_nodes = max(num_nodes, int(node_ids.max()) + 1)
+        if num_nodes > len(seen):
+            # doubling keeps the copies to a constant factor of the final size
+            size = max(num_nodes, 2 * len(seen))
+            seen = np.concatenate([seen, np.zeros(size - len(seen), dtype=bool)])
+            for i, matrix in enumerate(matrices):
+                grown = vtkarrays.sample_matrix(size, num_samples, dtype)
+                grown[:matrix.shape[0]] = matrix
+                matrices[i] = grown
+        keep = sampling.first_row_mask(node_ids, seen)
+        keep &= (idx >= 0) & (idx < num_samples)
+        for i, matrix in enumerate(matrices):
+            matrix[node_ids[keep], idx[keep]] = rows[keep, vc_start + i]
+    f.close()
+
+    if num_nodes < len(seen):
+        matrices = [np.asfortranarray(matrix[:num_nodes]) for matrix in matrices]
+    header = {"kind": node_type, "samp_interval": int(samp_interval), "end_time": float(end_time),
+              "num_samples": num_samples, "num_nodes": num_nodes}
+    return header, list(zip(cols[vc_start:], matrices))
+
+
+# convert a CODES router or terminal sampling csv, keeping each VC column
+def convert_sampling(filename, node_type, samp_interval, end_time, out_filename, dtype=np.int32):
+    header, columns = read_sampling_columns(filename, node_type, samp_interval, end_time, dtype)
+    write(out_filename, header, columns)
+
+
+# header and NumSends column of an mpi-sampling-stats file as read by core-vis.py
+def read_mpi_columns(filename, dtype=np.int32):
+    matrix, samp_interval, end_time = sampling.read_mpi_array(filename, dtype=dtype)
+    header = {"kind": "mpi", "samp_interval": samp_interval, "end_time": end_time,
+              "num_samples": matrix.shape[1], "num_nodes": matrix.shape[0]}
+    return header, [("NumSends", matrix)]
+
+
+# convert an mpi-sampling-stats file as read by core-vis.py
+def convert_mpi_stats(filename, out_filename, dtype=np.int32):
+    header, columns = read_mpi_columns(filename, dtype)
+    write(out_filename, header, columns)
+
+
+# same as sampling.read_sim_array, from a converted file: adds every VC column of
+# the first num_samples steps into out[offset:offset + num_nodes]
+def read_sim_array(filename, node_type, num_samples, samp_interval, offset, out):
+    sim = SimFile(filename)
+    if sim.kind != node_type:
+        raise ValueError(filename + " holds " + sim.kind + " data, not " + node_type)
+    if sim.samp_interval != int(samp_interval):
+        raise ValueError(filename + " was converted with a sampling interval of " + str(sim.samp_interval))
+
+    num_nodes = max(0, min(sim.num_nodes, out.shape[0] - offset))
+    sampling.warn_outside(filename, sim.num_nodes - num_nodes, out.shape[0] - offset, "nodes")
+    steps = min(num_samples, sim.num_samples)
+    view = out[offset:offset + num_nodes, :steps]
+    view[...] = 0
+    for name in sim.column_names:
+        view += sim.column(name)[:num_nodes, :steps]
+    return out
+
+
+# same as sampling.read_vc_array, from a converted file
+def read_vc_array(filename, node_type, num_samples, samp_interval, offset, out):
+    sim = SimFile(filename)
+    if sim.kind != node_type:
+        raise ValueError(filename + " holds " + sim.kind + " data, not " + node_type)
+    if sim.samp_interval != int(samp_interval):
+        raise ValueError(filename + " was converted with a sampling interval of " + str(sim.samp_interval))
+    if len(sim.column_names) > out.shape[2]:
+        raise ValueError(filename + " has " + str(len(sim.column_names)) + " VC columns, more than the " +
+                         str(out.shape[2]) + " channels of the output")
+
+    num_nodes = max(0, min(sim.num_nodes, out.shape[0] - offset))
+    sampling.warn_outside(filename, sim.num_nodes - num_nodes, out.shape[0] - offset, "nodes")
+    steps = min(num_samples, sim.num_samples)
+    for i, name in enumerate(sim.column_names):
+        out[offset:offset + num_nodes, :steps, i] = sim.column(name)[:num_nodes, :steps]
+    return out
+
+
+# (num_cores, num_samples) NumSends matrix of a converted mpi stats file.
+# when the core count matches the file this is the memmap itself, so only the
+# steps that get written are read
+def read_mpi_stats(filename, num_cores):
+    sim = SimFile(filename)
+    if sim.kind != "mpi":
+        raise ValueError(filename + " holds " + sim.kind + " data, not mpi stats")
+    samples = sim.column("NumSends")
+    if sim.num_nodes != num_cores:
+        matrix = vtkarrays.sample_matrix(num_cores, sim.num_samples, samples.dtype)
+        n = min(num_cores, sim.num_nodes)
+        matrix[:n] = samples[:n]
+        samples = matrix
+    return samples, sim.num_samples
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="convert sampling data to the memory mapped format read by "
+                                             "network.py (-r/-t) and core-vis.py (-f)")
+    ap.add_argument("infile", help="router/terminal csv or mpi-sampling-stats file")
+    ap.add_argument("outfile", help="converted file to write")
+    ap.add_argument("--type", required=True, choices=["router", "terminal", "mpi"], help="kind of data in infile")
+    ap.add_argument("-i", "--samp_interval", required=False, help="interval for sampling data (router/terminal)")
+    ap.add_argument("-e", "--samp_end_time", required=False, help="simulation end time of sampling data (router/terminal)")
+    args = vars(ap.parse_args(argv))
+
+    if args["type"] == "mpi":
+        convert_mpi_stats(args["infile"], args["outfile"])
+    else:
+        if args["samp_interval"] is None or args["samp_end_time"] is None:
+            sys.exit("ERROR: -i and -e are needed to convert router/terminal data")
+        convert_sampling(args["infile"], args["type"], int(args["samp_interval"]), float(args["samp_end_time"]),
+                         args["outfile"])
+
+
+if __name__ == "__main__":
+    main()
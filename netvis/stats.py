@@ -0,0 +1,87 @@
+import argparse
+import sys
+
+import numpy as np
+
+from netvis import simfile
+
+# quick summaries of sampling data without building any geometry: totals, the
+# busiest nodes and the busiest steps of every column of a converted file, a
+# router/terminal csv or an mpi-sampling-stats file
+
+
+# header and (name, matrix) columns of filename. converted files are memory
+# mapped, csv files need kind ("router" or "terminal"), samp_interval and end_time
+def load_columns(filename, kind=None, samp_interval=None, end_time=None):
+    if simfile.is_simfile(filename):
+        sim = simfile.SimFile(filename)
+        return sim.header, [(name, sim.column(name)) for name in sim.column_names]
+    if kind == "mpi":
+        return simfile.read_mpi_columns(filename)
+    if kind is None or samp_interval is None or end_time is None:
+        raise ValueError(filename + " is not a converted file, its --type, -i and -e are needed")
+    return simfile.read_sampling_columns(filename, kind, int(samp_interval), float(end_time))
+
+
+# ids and values of the k largest values, largest first
+def top_k(values, k):
+    k = min(k, len(values))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64), values[:0]
+    ids = np.argpartition(values, len(values) - k)[len(values) - k:]
+    ids = ids[np.argsort(values[ids], kind="mergesort")[::-1]]
+    return ids, values[ids]
+
+
+# totals of a (num_nodes, num_samples) sample matrix plus its top nodes and steps
+def summarize(samples, top=5):
+    node_totals = samples.sum(axis=1, dtype=np.int64)
+    step_totals = samples.sum(axis=0, dtype=np.int64)
+    return {
+        "total": int(node_totals.sum()),
+        "max": int(samples.max()) if samples.size else 0,
+        "active_nodes": int((node_totals != 0).sum()),
+        "busiest_nodes": top_k(node_totals, top),
+        "busiest_steps": top_k(step_totals, top),
+    }
+
+
+def print_summary(name, summary):
+    print(name)
+    print("  total %d, largest sample %d, %d nodes with traffic" %
+          (summary["total"], summary["max"], summary["active_nodes"]))
+    ids, totals = summary["busiest_nodes"]
+    print("  busiest nodes: " + ", ".join("%d (%d)" % (i, t) for i, t in zip(ids, totals)))
+    ids, totals = summary["busiest_steps"]
+    print("  busiest steps: " + ", ".join("%d (%d)" % (i, t) for i, t in zip(ids, totals)))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="summarize sampling data: per column totals, busiest nodes and steps")
+    ap.add_argument("infile", help="converted file, router/terminal csv or mpi-sampling-stats file")
+    ap.add_argument("--type", required=False, choices=["router", "terminal", "mpi"],
+                    help="kind of data in infile, not needed for converted files")
+    ap.add_argument("-i", "--samp_interval", required=False, help="interval for sampling data (router/terminal csv)")
+    ap.add_argument("-e", "--samp_end_time", required=False, help="simulation end time of sampling data (router/terminal csv)")
+    ap.add_argument("-k", "--top", required=False, default=5, help="how many of the busiest nodes and steps to list")
+    ap.add_argument("--sum", action="store_true", help="summarize the sum of the columns instead of each column")
+    args = vars(ap.parse_args(argv))
+
+    try:
+        header, columns = load_columns(args["infile"], args["type"], args["samp_interval"], args["samp_end_time"])
+    except ValueError as e:
+        sys.exit("ERROR: " + str(e))
+
+    print("%s: %s data, %d nodes, %d samples every %s" % (args["infile"], header["kind"], header["num_nodes"],
+                                                          header["num_samples"], header["samp_interval"]))
+    if args["sum"] and columns:
+        total = np.zeros(columns[0][1].shape, dtype=np.int64, order="F")
+        for _, matrix in columns:
+            total += matrix
+        columns = [("+".join(name for name, _ in columns), total)]
+    for name, matrix in columns:
+        print_summary(name, summarize(matrix, int(args["top"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import numpy as np
+
+from netvis import lod
+from netvis import vtkarrays
+
+
+# combine every factor consecutive samples of a (num_nodes, num_samples) sample
+# matrix or (num_nodes, num_samples, num_channels) channel matrix into one with
+# sum, max or mean. a shorter last bin is reduced over the samples it has.
+# the step layout of the input is kept, so StepArray can still point at each step
+def rebin(samples, factor, how="sum"):
+    if how not in lod.REDUCTIONS:
+        raise ValueError("reduction should be one of " + ", ".join(lod.REDUCTIONS) + ", not " + str(how))
+    if factor < 1:
+        raise ValueError("rebin factor should be at least 1, not " + str(factor))
+
+    # step major view, (num_samples, num_nodes[, num_channels]). for both layouts
+    # this is c contiguous, so the reshape below doesn't copy
+    steps = np.moveaxis(samples, 1, 0)
+    num_full = steps.shape[0] // factor
+    rest = steps.shape[1:]
+    parts = [steps[:num_full * factor].reshape((num_full, factor) + rest)]
+    if steps.shape[0] % factor:
+        tail = steps[num_full * factor:]
+        parts.append(tail.reshape((1, tail.shape[0]) + rest))
+
+    binned = np.concatenate([reduce_bins(part, how) for part in parts])
+    if how == "sum":
+        binned = vtkarrays.compact(binned)
+    return np.moveaxis(binned, 0, 1)
+
+
+def reduce_bins(part, how):
+    if how == "max":
+        return part.max(axis=1)
+    if how == "mean":
+        return part.mean(axis=1, dtype=np.float64).astype(np.float32)
+    return part.sum(axis=1, dtype=np.int64)
+
+
+# every step-th sample, as a view
+def stride(samples, step):
+    if step < 1:
+        raise ValueError("stride should be at least 1, not " + str(step))
+    return samples[:, ::step]
+
+
+# new sample count of num_samples after rebin and stride
+def num_steps(num_samples, factor=1, step=1):
+    binned = -(-num_samples // factor)
+    return -(-binned // step)
@@ -0,0 +1,96 @@
+import numpy as np
+
+# values used in the NodeType point array
+UNKNOWN = 0
+TERMINAL = 1
+ROUTER = 2
+
+
+# node classification shared by the edge splitting, layout and point functions
+# node_type is an int8 array indexed by node id, so membership tests are a lookup
+# instead of a scan over the router or terminal lists
+class NodeIndex(object):
+    def __init__(self, node_type):
+        self.node_type = np.asarray(node_type, dtype=np.int8)
+        self.is_terminal = self.node_type == TERMINAL
+        self.is_router = self.node_type == ROUTER
+        self.routers = np.flatnonzero(self.is_router)
+        self.terminals = np.flatnonzero(self.is_terminal)
+
+        # cached id ranges, end is one past the largest id
+        self.router_start, self.router_end = id_range(self.routers)
+        self.terminal_start, self.terminal_end = id_range(self.terminals)
+
+    @classmethod
+    def from_lists(cls, routers, terminals, num_nodes=None):
+        routers = np.asarray(routers, dtype=np.int64)
+        terminals = np.asarray(terminals, dtype=np.int64)
+        if num_nodes is None:
+            num_nodes = 1 + max(routers.max() if routers.size else -1,
+                                terminals.max() if terminals.size else -1)
+        node_type = np.zeros(num_nodes, dtype=np.int8)
+        node_type[terminals] = TERMINAL
+        node_type[routers] = ROUTER
+        return cls(node_type)
+
+    @property
+    def num_nodes(self):
+        return self.node_type.size
+
+    # membership tests that treat ids outside the index (e.g. -1) as neither type
+    def router_mask(self, ids):
+        return self.type_mask(ids, ROUTER)
+
+    def terminal_mask(self, ids):
+        return self.type_mask(ids, TERMINAL)
+
+    def type_mask(self, ids, node_type):
+        ids = np.asarray(ids, dtype=np.int64)
+        valid = (ids >= 0) & (ids < self.num_nodes)
+        return valid & (self.node_type[np.where(valid, ids, 0)] == node_type)
+
+    # True for ids in the lower half of their own type's id range
+    # (routers compared to routers, everything else compared to terminals)
+    def lower_half(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        is_router = self.router_mask(ids)
+        router_mid = (self.router_end - self.router_start) // 2
+        terminal_mid = (self.terminal_end - self.terminal_start) // 2
+        return np.where(is_router,
+                        ids - self.router_start < router_mid,
+                        ids - self.terminal_start < terminal_mid)
+
+
+def id_range(ids):
+    if ids.size == 0:
+        return 0, 0
+    return int(ids.min()), int(ids.max()) + 1
+
+
+# split an (E, 2) edge array into terminal, local (intra-group) and global
+# (inter-group) edges, keeping the original edge order within each list
+def split_edges(edges, nodes, routerid_start, group_size):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    both_routers = nodes.router_mask(edges[:, 0]) & nodes.router_mask(edges[:, 1])
+    groups = (edges - routerid_start) // group_size
+    same_group = groups[:, 0] == groups[:, 1]
+
+    terminal_edges = edges[~both_routers]
+    local_edges = edges[both_routers & same_group]
+    global_edges = edges[both_routers & ~same_group]
+    return terminal_edges, local_edges, global_edges
+
+
+# split terminal edges into (terminal, router) pairs, dropping any edge without a terminal
+def terminal_router_pairs(terminal_edges, nodes):
+    terminal_edges = np.asarray(terminal_edges, dtype=np.int64).reshape(-1, 2)
+    first_is_term = nodes.terminal_mask(terminal_edges[:, 0])
+    second_is_term = nodes.terminal_mask(terminal_edges[:, 1])
+    t = np.where(first_is_term, terminal_edges[:, 0], terminal_edges[:, 1])
+    r = np.where(first_is_term, terminal_edges[:, 1], terminal_edges[:, 0])
+    keep = first_is_term | second_is_term
+    return t[keep], r[keep]
+
+
+def as_tuples(edges):
+    return [tuple(e) for e in np.asarray(edges).tolist()]
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# per stage instrumentation: wall time, counts (rows, nodes, frames, bytes),
+# throughput and peak memory of each stage of a run, written as a json trace
+# and optionally shown on a live progress line.
+# the pipeline calls stage() and add() unconditionally; they do nothing until
+# start() installs a Trace. one stage can also be run under cProfile: a single
+# profiler covers every time that stage runs in the thread that started the
+# trace, and its stats are written once when the trace is closed.
+# stage records hold wall clock start/end times and the trace holds the pid,
+# so samples from an external profiler (py-spy record) can be matched to stages
+
+_current = None
+
+
+def rss_bytes():
+    try:
+        f = open("/proc/self/statm")
+        pages = int(f.read().split()[1])
+        f.close()
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError, ValueError):
+        return 0
+
+
+def max_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _NullStage(object):
+    # a throwaway dict, so callers can fill in counts either way
+    @property
+    def record(self):
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_null_stage = _NullStage()
+
+
+class _Stage(object):
+    def __init__(self, trace, name, counts):
+        self.trace = trace
+        self.record = dict(counts, stage=name)
+        self.profiling = False
+        self.thread = threading.current_thread()
+
+    def __enter__(self):
+        self.record["start"] = time.time()
+        self.record["rss_start_mb"] = rss_bytes() / 1048576.0
+        self.peak = rss_bytes()
+        self.trace.stages.append(self)
+        if self.trace.profile_stage == self.record["stage"]:
+            self.profiling = self.trace.profile_enter(self.thread)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiling:
+            self.trace.profile_exit()
+        end = time.time()
+        self.trace.stages.remove(self)
+        rec = self.record
+        seconds = end - rec["start"]
+        rec["end"] = end
+        rec["seconds"] = seconds
+        rec["peak_rss_mb"] = max(self.peak, rss_bytes()) / 1048576.0
+        rec["max_rss_mb"] = max_rss_bytes() / 1048576.0
+        for key in ("rows", "frames", "nodes", "edges"):
+            if key in rec:
+                rec[key + "_per_s"] = rec[key] / max(seconds, 1e-9)
+        num_bytes = rec.get("bytes_written", 0) + rec.get("bytes_read", 0)
+        if num_bytes:
+            rec["mb_per_s"] = num_bytes / 1048576.0 / max(seconds, 1e-9)
+        if exc_type is not None:
+            rec["error"] = exc_type.__name__
+        self.trace.records.append(rec)
+        self.trace.stage_done(rec)
+        return False
+
+
+class Trace(object):
+    def __init__(self, filename=None, progress=False, profile_stage=None, profile_out=None, interval=0.5):
+        self.filename = filename
+        self.progress = progress
+        self.profile_stage = profile_stage
+        self.profile_out = profile_out or (str(profile_stage) + ".prof")
+        self.profiler = None
+        self.profile_depth = 0
+        self.profiled = False
+        # cProfile only sees the thread that enables it
+        self.owner = threading.current_thread()
+        self.interval = interval
+        self.records = []
+        self.stages = []
+        self.start_time = time.time()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stage(self, name, **counts):
+        return _Stage(self, name, counts)
+
+    # enables the profiler for a stage opened by thread, unless it's another
+    # thread or the profiler is already on for an enclosing stage.
+    # returns whether profile_exit has to be called when the stage ends
+    def profile_enter(self, thread):
+        if thread is not self.owner:
+            return False
+        if self.profile_depth == 0:
+            if self.profiler is None:
+                import cProfile
+                self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            self.profiled = True
+        self.profile_depth += 1
+        return True
+
+    def profile_exit(self):
+        self.profile_depth -= 1
+        if self.profile_depth == 0:
+            self.profiler.disable()
+
+    # counts go to the innermost stage of the calling thread, so rows read by a
+    # background thread don't end up in a stage the main thread opened meanwhile
+    def add(self, key, n):
+        stages = list(self.stages)
+        if not stages:
+            return
+        current = threading.current_thread()
+        mine = [st for st in stages if st.thread is current]
+        rec = (mine or stages)[-1].record
+        rec[key] = rec.get(key, 0) + n
+
+    # memory is sampled every 10ms, the progress line is redrawn every interval
+    def sample(self):
+        last_draw = 0
+        while self.running:
+            rss = rss_bytes()
+            for st in list(self.stages):
+                st.peak = max(st.peak, rss)
+            now = time.time()
+            if self.progress and self.stages and now - last_draw >= self.interval:
+                self.draw(self.stages[-1], now, rss)
+                last_draw = now
+            time.sleep(0.01)
+
+    def draw(self, st, now, rss):
+        rec = st.record
+        parts = ["%-14s %7.1fs" % (rec["stage"], now - rec["start"])]
+        for key in ("rows", "frames"):
+            if key in rec:
+                total = rec.get(key + "_total")
+                parts.append("%d%s %s" % (rec[key], "/%d" % total if total else "", key))
+        parts.append("%.0f MB" % (rss / 1048576.0))
+        sys.stderr.write("\r" + "  ".join(parts) + "   ")
+        sys.stderr.flush()
+
+    def stage_done(self, rec):
+        if not self.progress:
+            return
+        parts = ["%-14s %7.2fs" % (rec["stage"], rec["seconds"])]
+        for key in ("rows", "frames"):
+            if key in rec:
+                parts.append("%d %s (%.0f/s)" % (rec[key], key, rec[key + "_per_s"]))
+        if "mb_per_s" in rec:
+            parts.append("%.1f MB/s" % rec["mb_per_s"])
+        parts.append("peak %.0f MB" % rec["peak_rss_mb"])
+        sys.stderr.write("\r" + "  ".join(parts) + "\n")
+        sys.stderr.flush()
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        if self.profiled:
+            if self.profile_depth:
+                self.profiler.disable()
+            self.profiler.dump_stats(self.profile_out)
+        elif self.profile_stage is not None:
+            print("WARNING: stage " + self.profile_stage + " never ran in the main thread, nothing was profiled")
+        if self.filename is None:
+            return
+        out = {
+            "pid": os.getpid(),
+            "argv": sys.argv,
+            "start": self.start_time,
+            "seconds": time.time() - self.start_time,
+            "max_rss_mb": max_rss_bytes() / 1048576.0,
+            "stages": self.records,
+        }
+        f = open(self.filename, "w")
+        json.dump(out, f, indent=1, sort_keys=True)
+        f.write("\n")
+        f.close()
+
+
+def start(filename=None, progress=False, profile_stage=None, profile_out=None):
+    global _current
+    _current = Trace(filename, progress, profile_stage, profile_out)
+    return _current
+
+
+def stop():
+    global _current
+    if _current is not None:
+        _current.close()
+        _current = None
+
+
+def active():
+    return _current is not None
+
+
+def progress_enabled():
+    return _current is not None and _current.progress
+
+
+def stage(name, **counts):
+    if _current is None:
+        return _null_stage
+    return _current.stage(name, **counts)
+
+
+def add(key, n):
+    if _current is not None:
+        _current.add(key, n)
@@ -0,0 +1,82 @@
+import numpy as np
+
+
+# allocate a sample matrix laid out so each step is one contiguous column
+def sample_matrix(num_nodes, num_samples, dtype=np.int32):
+    return np.zeros((num_nodes, num_samples), dtype=dtype, order="F")
+
+
+# allocate a (num_nodes, num_samples, num_channels) array laid out so each step is
+# one contiguous (num_nodes, num_channels) block, the memory of a multi component
+# vtk array
+def channel_matrix(num_nodes, num_samples, num_channels, dtype=np.uint32):
+    return np.zeros((num_samples, num_nodes, num_channels), dtype=dtype).transpose(1, 0, 2)
+
+
+# smallest integer dtype that holds every value in [lo, hi]
+def compact_dtype(lo, hi):
+    if lo >= 0:
+        candidates = (np.uint8, np.uint16, np.uint32, np.uint64)
+    else:
+        candidates = (np.int8, np.int16, np.int32, np.int64)
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(candidates[-1])
+
+
+# samples converted to the smallest dtype holding its values, keeping its layout
+def compact(samples):
+    if not samples.size:
+        return samples
+    dtype = compact_dtype(int(samples.min()), int(samples.max()))
+    if dtype.itemsize >= samples.dtype.itemsize:
+        return samples
+    return samples.astype(dtype, order="K")
+
+
+# true when every step of samples is already one contiguous block
+def steps_contiguous(samples):
+    itemsize = samples.dtype.itemsize
+    if samples.ndim == 2:
+        return samples.strides[0] == itemsize
+    return samples.strides[2] == itemsize and samples.strides[0] == itemsize * samples.shape[2]
+
+
+# vtk point data array that shows one step of a (num_nodes, num_samples) sample
+# matrix, or of a (num_nodes, num_samples, num_channels) channel matrix as a multi
+# component array, at a time.
+# when each step is contiguous (fortran ordered sample matrices, channel_matrix)
+# the vtk array points straight at the step, otherwise the step is copied into a
+# single buffer that is reused every step.
+# either way the same vtk array object is handed back for every step.
+# rows picks a subset of the nodes, gathered into the buffer with one fancy index
+# per step, so only those rows of a memory mapped matrix are ever read
+class StepArray(object):
+    def __init__(self, samples, name, component_names=None, rows=None):
+        from vtk.util import numpy_support
+
+        self.samples = samples
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.int64)
+        self.array = numpy_support.create_vtk_array(numpy_support.get_vtk_array_type(samples.dtype))
+        self.array.SetName(name)
+        self.array.SetNumberOfComponents(1 if samples.ndim == 2 else samples.shape[2])
+        for i, component in enumerate(component_names or []):
+            self.array.SetComponentName(i, component)
+        self.buf = None
+        if self.rows is not None or not steps_contiguous(samples):
+            num_rows = samples.shape[0] if self.rows is None else self.rows.size
+            self.buf = np.zeros((num_rows,) + samples.shape[2:], dtype=samples.dtype)
+            self.array.SetVoidArray(self.buf, self.buf.size, 1)
+
+    def get_step(self, step):
+        if self.buf is None:
+            col = self.samples[:, step]
+            self.array.SetVoidArray(col, col.size, 1)
+        elif self.rows is not None:
+            self.buf[...] = self.samples[self.rows, step]
+        else:
+            np.copyto(self.buf, self.samples[:, step])
+        self.array.Modified()
+        return self.array
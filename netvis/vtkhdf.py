@@ -0,0 +1,151 @@
+import numpy as np
+
+# VTKHDF transient PolyData, readable by vtkHDFReader (VTK >= 9.3) and ParaView >= 5.12.
+# the geometry and static point arrays are written once and every step's
+# PointDataOffsets point back at them, so only the per-step arrays grow with time
+VTKHDF_VERSION = (2, 0)
+CELL_TYPES = ("Vertices", "Lines", "Polygons", "Strips")
+
+
+def import_h5py():
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("the vtkhdf output format needs h5py (pip install h5py)")
+    return h5py
+
+
+# offsets and connectivity of a vtkCellArray for both the VTK 8 and VTK 9 layouts
+def cell_arrays(cells):
+    from vtk.util import numpy_support
+
+    if cells is None or cells.GetNumberOfCells() == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if hasattr(cells, "GetOffsetsArray"):
+        offsets = numpy_support.vtk_to_numpy(cells.GetOffsetsArray()).astype(np.int64)
+        conn = numpy_support.vtk_to_numpy(cells.GetConnectivityArray()).astype(np.int64)
+        return offsets, conn
+
+    # legacy layout is (npts, id0, id1, ...) per cell
+    legacy = numpy_support.vtk_to_numpy(cells.GetData()).astype(np.int64)
+    offsets = np.zeros(cells.GetNumberOfCells() + 1, dtype=np.int64)
+    conn = []
+    pos = 0
+    for i in range(cells.GetNumberOfCells()):
+        npts = legacy[pos]
+        conn.append(legacy[pos + 1:pos + 1 + npts])
+        offsets[i + 1] = offsets[i] + npts
+        pos += npts + 1
+    return offsets, np.concatenate(conn)
+
+
+# writes a static polydata and its static point and cell arrays once, then appends
+# point data arrays (step_names) and cell data arrays (cell_step_names) one or more
+# steps at a time
+# datasets are deflate compressed by default, like the zlib compressed vtp files
+class TransientPolyDataWriter(object):
+    def __init__(self, filename, polydata, step_names, static_arrays=None, compression="gzip",
+                 cell_step_names=(), static_cell_arrays=None):
+        from vtk.util import numpy_support
+        h5py = import_h5py()
+        self.f = h5py.File(filename, "w")
+        self.step_names = list(step_names)
+        self.cell_step_names = list(cell_step_names)
+        self.static_cell_arrays = static_cell_arrays or {}
+        self.static_arrays = static_arrays or {}
+        self.compression = compression
+        self.num_steps = 0
+        self.times = []
+
+        root = self.f.create_group("VTKHDF")
+        root.attrs["Version"] = np.array(VTKHDF_VERSION, dtype=np.int64)
+        root.attrs.create("Type", np.bytes_("PolyData"))
+
+        points = numpy_support.vtk_to_numpy(polydata.GetPoints().GetData())
+        self.num_points = points.shape[0]
+        root.create_dataset("NumberOfPoints", data=np.array([self.num_points], dtype=np.int64))
+        root.create_dataset("Points", data=points, compression=compression)
+
+        getters = {"Vertices": polydata.GetVerts, "Lines": polydata.GetLines,
+                   "Polygons": polydata.GetPolys, "Strips": polydata.GetStrips}
+        for cell_type in CELL_TYPES:
+            offsets, conn = cell_arrays(getters[cell_type]())
+            grp = root.create_group(cell_type)
+            grp.create_dataset("NumberOfCells", data=np.array([offsets.size - 1], dtype=np.int64))
+            grp.create_dataset("NumberOfConnectivityIds", data=np.array([conn.size], dtype=np.int64))
+            grp.create_dataset("Offsets", data=offsets, compression=compression)
+            grp.create_dataset("Connectivity", data=conn, compression=compression)
+
+        self.point_data = root.create_group("PointData")
+        for name, values in self.static_arrays.items():
+            self.point_data.create_dataset(name, data=values)
+        self.num_cells = polydata.GetNumberOfCells()
+        self.cell_data = None
+        if self.cell_step_names or self.static_cell_arrays:
+            self.cell_data = root.create_group("CellData")
+            for name, values in self.static_cell_arrays.items():
+                self.cell_data.create_dataset(name, data=values)
+
+        self.datasets = {}
+
+    # arrays maps each step name to a (num_points,) or (num_points, k) block holding
+    # k steps, or a (num_points, k, num_channels) block of multi component values.
+    # cell step names map to the same shapes with num_cells rows
+    def add_steps(self, times, arrays):
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        for name in self.step_names:
+            self.append(self.point_data, name, arrays[name], self.num_points)
+        for name in self.cell_step_names:
+            self.append(self.cell_data, name, arrays[name], self.num_cells)
+        self.num_steps += times.size
+        self.times.extend(times.tolist())
+
+    def append(self, group, name, block, rows):
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block.reshape(-1, 1)
+        # step major, same as the memory of a fortran ordered sample matrix
+        # or a vtkarrays.channel_matrix
+        if block.ndim == 3:
+            flat = block.transpose(1, 0, 2).reshape(-1, block.shape[2])
+        else:
+            flat = block.ravel(order="F")
+        key = (group.name, name)
+        if key not in self.datasets:
+            self.datasets[key] = group.create_dataset(
+                name, shape=(0,) + flat.shape[1:], maxshape=(None,) + flat.shape[1:], dtype=flat.dtype,
+                chunks=(min(max(rows, 1), 1 << 20),) + flat.shape[1:], compression=self.compression)
+        dset = self.datasets[key]
+        start = dset.shape[0]
+        dset.resize((start + flat.shape[0],) + flat.shape[1:])
+        dset[start:] = flat
+
+    def add_step(self, time, arrays):
+        self.add_steps([time], arrays)
+
+    def close(self):
+        if self.f is None:
+            return
+        n = self.num_steps
+        steps = self.f["VTKHDF"].create_group("Steps")
+        steps.attrs["NSteps"] = n
+        steps.create_dataset("Values", data=np.array(self.times, dtype=np.float64))
+        zeros = np.zeros(n, dtype=np.int64)
+        steps.create_dataset("PartOffsets", data=zeros)
+        steps.create_dataset("NumberOfParts", data=np.ones(n, dtype=np.int64))
+        steps.create_dataset("PointOffsets", data=zeros)
+        steps.create_dataset("CellOffsets", data=np.zeros((n, 4), dtype=np.int64))
+        steps.create_dataset("ConnectivityIdOffsets", data=np.zeros((n, 4), dtype=np.int64))
+        offsets = steps.create_group("PointDataOffsets")
+        for name in self.static_arrays:
+            offsets.create_dataset(name, data=zeros)
+        for name in self.step_names:
+            offsets.create_dataset(name, data=np.arange(n, dtype=np.int64) * self.num_points)
+        if self.cell_data is not None:
+            cell_offsets = steps.create_group("CellDataOffsets")
+            for name in self.static_cell_arrays:
+                cell_offsets.create_dataset(name, data=zeros)
+            for name in self.cell_step_names:
+                cell_offsets.create_dataset(name, data=np.arange(n, dtype=np.int64) * self.num_cells)
+        self.f.close()
+        self.f = None
@@ -0,0 +1,62 @@
+import numpy as np
+
+from netvis import codes
+
+
+# codes_relative_id as network.py had it, for the dragonfly LP layout only
+def old_relative_id(global_id, num_terminals):
+    group_size = 8 + 4 + 1
+    codes_grp = global_id // group_size
+    rem = global_id % group_size
+    if rem < 8:
+        return -1
+    elif rem < 8 + 4:
+        return codes_grp * 4 + (rem - 8)
+    return num_terminals + codes_grp + (rem - 8 - 4)
+
+
+def test_lp_map_matches_old_dragonfly_ids():
+    lp_map = codes.LPMap.from_lp_types(codes.DRAGONFLY_LPS)
+    num_terminals = 3072
+    global_ids = np.arange(13 * 768)
+    expected = [old_relative_id(i, num_terminals) for i in global_ids]
+    assert lp_map.to_relative(global_ids, num_terminals).tolist() == expected
+
+
+def test_lp_map_round_trip(tmpdir):
+    config = str(tmpdir.join("mixed.conf"))
+    f = open(config, "w")
+    f.write('LPGROUPS\n{\n'
+            '   MODELNET_GRP\n   {\n      repetitions="6";\n      nw-lp="2";\n'
+            '      modelnet_dragonfly_custom="2";\n      modelnet_dragonfly_custom_router="1";\n   }\n'
+            '   # a second group with only routers\n'
+            '   SPINE_GRP\n   {\n      repetitions="3";\n      modelnet_fattree_router="2";\n   }\n'
+            '}\n')
+    f.close()
+    lp_map = codes.LPMap.from_config(config)
+    assert lp_map.num_terminals == 12
+    assert lp_map.num_routers == 12
+
+    relative = np.arange(lp_map.num_terminals + lp_map.num_routers)
+    global_ids = lp_map.to_global(relative)
+    assert np.array_equal(lp_map.to_relative(global_ids), relative)
+    # every non network LP maps to -1
+    others = np.setdiff1d(np.arange(6 * 5 + 3 * 2), global_ids)
+    assert len(others) == 12
+    assert (lp_map.to_relative(others) == -1).all()
+
+
+def test_read_lp_groups(tmpdir):
+    config = str(tmpdir.join("dfly.conf"))
+    f = open(config, "w")
+    f.write('LPGROUPS\n{\n   MODELNET_GRP\n   {\n      repetitions="768";\n      nw-lp="8";\n'
+            '      modelnet_dragonfly="4";\n      modelnet_dragonfly_router="1";\n   }\n}\n'
+            'PARAMS\n{\n   num_routers="96";\n}\n')
+    f.close()
+    assert codes.read_lp_groups(config) == [("MODELNET_GRP", 768, list(codes.DRAGONFLY_LPS))]
+    lp_map = codes.LPMap.from_config(config)
+    assert (lp_map.num_terminals, lp_map.num_routers) == (3072, 768)
+    # the bundled dragonfly layout, with its repetitions left open
+    open_map = codes.LPMap.from_lp_types(codes.DRAGONFLY_LPS)
+    ids = np.arange(13 * 768)
+    assert np.array_equal(lp_map.to_relative(ids), open_map.to_relative(ids, 3072))
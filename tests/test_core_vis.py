@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from netvis import core_vis
+
+NUM_CORES = 20
+NUM_SAMPLES = 4
+
+
+def write_mpi_stats(filename, samples):
+    f = open(filename, "w")
+    f.write("# mpi sampling stats\ninterval 10 end %d\n" % (10 * samples.shape[1]))
+    for sample in range(samples.shape[1]):
+        for core in range(samples.shape[0]):
+            f.write("x %d %d %d\n" % (core, sample, samples[core, sample]))
+    f.close()
+    return filename
+
+
+def core_samples():
+    return np.random.RandomState(0).randint(0, 1000, (NUM_CORES, NUM_SAMPLES))
+
+
+def parse(*argv):
+    return vars(core_vis.build_parser().parse_args(["-f", "mpi.txt", "-c", str(NUM_CORES)] + list(argv)))
+
+
+def test_highlight_cores():
+    samples = core_samples()
+    assert core_vis.highlight_cores(samples, parse()).tolist() == [2]
+    assert core_vis.highlight_cores(samples, parse("--highlight", "7, 3,19")).tolist() == [7, 3, 19]
+    busiest = np.argsort(-samples.sum(axis=1), kind="mergesort")[:3]
+    assert core_vis.highlight_cores(samples, parse("--top_k", "3")).tolist() == sorted(busiest.tolist())
+    with pytest.raises(SystemExit):
+        core_vis.highlight_cores(samples, parse("--highlight", str(NUM_CORES)))
+    with pytest.raises(SystemExit):
+        core_vis.highlight_cores(samples, parse("--highlight", "1,x"))
+    with pytest.raises(SystemExit):
+        parse("--highlight", "1", "--top_k", "2")
+
+
+# one glyph per highlighted core, on its core, carrying its id and its NumSends
+def test_sphere_frames(tmpdir, monkeypatch):
+    vtk = pytest.importorskip("vtk")
+    from vtk.util import numpy_support
+
+    samples = core_samples()
+    monkeypatch.chdir(str(tmpdir))
+    os.mkdir("core-vtp")
+    write_mpi_stats("mpi.txt", samples)
+    core_vis.main(["-f", "mpi.txt", "-c", str(NUM_CORES), "--row_width", "8", "--highlight", "11,4"])
+
+    grid = core_vis.create_core_grid(NUM_CORES, 8)
+    for step in range(NUM_SAMPLES):
+        reader = vtk.vtkXMLPolyDataReader()
+        reader.SetFileName("core-vtp/sphere%d.vtp" % step)
+        reader.Update()
+        output = reader.GetOutput()
+        point_data = output.GetPointData()
+        assert numpy_support.vtk_to_numpy(point_data.GetArray("CoreId")).tolist() == [11, 4]
+        assert numpy_support.vtk_to_numpy(point_data.GetArray("NumSends")).tolist() == samples[[11, 4], step].tolist()
+        assert np.allclose(numpy_support.vtk_to_numpy(output.GetPoints().GetData()), grid[[11, 4]])
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from netvis import delta
+from netvis import vtkarrays
+
+NUM_NODES = 50
+NUM_SAMPLES = 12
+
+
+# mostly unchanged steps, like a run with sparse traffic. every third step
+# repeats the one before it
+def sparse_samples(seed=0):
+    rng = np.random.RandomState(seed)
+    samples = vtkarrays.sample_matrix(NUM_NODES, NUM_SAMPLES)
+    samples[:, 0] = rng.randint(0, 20, NUM_NODES)
+    for step in range(1, NUM_SAMPLES):
+        samples[:, step] = samples[:, step - 1]
+        if step % 3:
+            changed = rng.rand(NUM_NODES) < 0.2
+            samples[changed, step] = rng.randint(0, 20, changed.sum())
+    return samples
+
+
+def test_changed_steps():
+    samples = sparse_samples()
+    changed = delta.changed_steps([samples], NUM_SAMPLES, block_steps=5)
+    expected = [step == 0 or not np.array_equal(samples[:, step], samples[:, step - 1])
+                for step in range(NUM_SAMPLES)]
+    assert changed.tolist() == expected
+    assert not changed[3::3].any()
+    frame = delta.frame_of_step(changed)
+    for step in range(NUM_SAMPLES):
+        assert np.array_equal(samples[:, frame[step]], samples[:, step])
+
+
+def test_sidecar_round_trip(tmpdir):
+    samples = sparse_samples()
+    channels = vtkarrays.channel_matrix(NUM_NODES, NUM_SAMPLES, 2)
+    channels[:, :, 0] = samples
+    channels[:, :, 1] = sparse_samples(1)
+    sidecar = str(tmpdir.join("frame.delta.npz"))
+    delta.write_deltas(sidecar, [("VC_Occupancy", samples, "point"), ("VCs", channels, "cell")],
+                       np.arange(NUM_SAMPLES) * 100.0)
+
+    deltas = delta.DeltaFile(sidecar)
+    assert deltas.names == ["VC_Occupancy", "VCs"]
+    assert deltas.kinds == {"VC_Occupancy": "point", "VCs": "cell"}
+    assert deltas.num_steps == NUM_SAMPLES
+    for step, values in enumerate(deltas.iter_steps("VC_Occupancy")):
+        assert np.array_equal(values, samples[:, step])
+    for step, values in enumerate(deltas.iter_steps("VCs")):
+        assert np.array_equal(values, channels[:, step])
+
+
+def test_expand_vtp_round_trip(tmpdir):
+    vtk = pytest.importorskip("vtk")
+    from vtk.util import numpy_support
+
+    samples = sparse_samples()
+    polydata = vtk.vtkPolyData()
+    points = vtk.vtkPoints()
+    for i in range(NUM_NODES):
+        points.InsertNextPoint(i, 0, 0)
+    polydata.SetPoints(points)
+    polydata.GetPointData().AddArray(vtkarrays.StepArray(samples, "VC_Occupancy").get_step(0))
+
+    base_vtp = str(tmpdir.join("frame0.vtp"))
+    writer = vtk.vtkXMLPolyDataWriter()
+    writer.SetFileName(base_vtp)
+    writer.SetInputData(polydata)
+    writer.Write()
+    sidecar = str(tmpdir.join("frame.delta.npz"))
+    delta.write_deltas(sidecar, [("VC_Occupancy", samples, "point")], np.arange(NUM_SAMPLES) * 100.0)
+
+    out = str(tmpdir.join("expanded"))
+    assert delta.expand_vtp(sidecar, base_vtp, out) == NUM_SAMPLES
+    for step in range(NUM_SAMPLES):
+        reader = vtk.vtkXMLPolyDataReader()
+        reader.SetFileName(out + str(step) + ".vtp")
+        reader.Update()
+        values = numpy_support.vtk_to_numpy(reader.GetOutput().GetPointData().GetArray("VC_Occupancy"))
+        assert np.array_equal(values, samples[:, step])
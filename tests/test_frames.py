@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from netvis import frames
+from netvis import vtkarrays
+
+vtk = pytest.importorskip("vtk")
+from vtk.util import numpy_support
+
+NUM_POINTS = 8
+NUM_SAMPLES = 10
+
+
+def line_polydata():
+    polydata = vtk.vtkPolyData()
+    points = vtk.vtkPoints()
+    lines = vtk.vtkCellArray()
+    for i in range(NUM_POINTS):
+        points.InsertNextPoint(i, i % 3, 0)
+    for i in range(NUM_POINTS - 1):
+        lines.InsertNextCell(2)
+        lines.InsertCellPoint(i)
+        lines.InsertCellPoint(i + 1)
+    polydata.SetPoints(points)
+    polydata.SetLines(lines)
+    node_type = numpy_support.numpy_to_vtk(np.arange(NUM_POINTS, dtype=np.int32) % 2, deep=1)
+    node_type.SetName("NodeType")
+    polydata.GetPointData().AddArray(node_type)
+    return polydata
+
+
+@pytest.mark.parametrize("chunk_steps", [1, 4, 10, 16])
+def test_chunks_read_back_per_step(tmpdir, chunk_steps):
+    rng = np.random.RandomState(0)
+    samples = vtkarrays.sample_matrix(NUM_POINTS, NUM_SAMPLES)
+    samples[...] = rng.randint(0, 100, samples.shape)
+    channels = vtkarrays.channel_matrix(NUM_POINTS, NUM_SAMPLES, 2)
+    channels[...] = rng.randint(0, 100, channels.shape)
+    link_samples = vtkarrays.sample_matrix(NUM_POINTS - 1, NUM_SAMPLES)
+    link_samples[...] = rng.randint(0, 100, link_samples.shape)
+    times = np.arange(NUM_SAMPLES) * 100.0
+
+    prefix = str(tmpdir.join("run"))
+    files = frames.write_chunks(line_polydata(), prefix, times, [("VC_Occupancy", samples), ("VCs", channels)],
+                                [("LinkTraffic", link_samples)], chunk_steps, component_names=["vc0", "vc1"],
+                                progress=False)
+    assert len(files) == -(-NUM_SAMPLES // chunk_steps)
+
+    index = frames.ChunkIndex(prefix + ".chunks.json")
+    assert index.num_steps == NUM_SAMPLES
+    assert index.times == times.tolist()
+    for step in range(NUM_SAMPLES):
+        output = index.read_step(step)
+        point_data = output.GetPointData()
+        assert output.GetNumberOfLines() == NUM_POINTS - 1
+        # the other steps of the chunk aren't read
+        assert point_data.GetNumberOfArrays() == 3
+        assert output.GetCellData().GetNumberOfArrays() == 1
+        assert numpy_support.vtk_to_numpy(point_data.GetArray("NodeType")).tolist() == [0, 1] * (NUM_POINTS // 2)
+        assert np.array_equal(numpy_support.vtk_to_numpy(point_data.GetArray("VC_Occupancy")), samples[:, step])
+        assert np.array_equal(numpy_support.vtk_to_numpy(point_data.GetArray("VCs")), channels[:, step])
+        assert point_data.GetArray("VCs").GetComponentName(1) == "vc1"
+        assert np.array_equal(numpy_support.vtk_to_numpy(output.GetCellData().GetArray("LinkTraffic")),
+                              link_samples[:, step])
+        steps = numpy_support.vtk_to_numpy(output.GetFieldData().GetArray("Steps"))
+        assert step in steps.tolist()
+    with pytest.raises(IndexError):
+        index.chunk_file(NUM_SAMPLES)
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from netvis import codes
+from netvis import generators
+from netvis import topology
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "connection-data")
+
+
+@pytest.mark.parametrize("name,filename,generate,lp_map,check_types", [
+    ("dragonfly", "dfly3072.gexf", lambda: generators.dragonfly(96, 8, 4),
+     codes.LPMap.from_lp_types(codes.DRAGONFLY_LPS), True),
+    ("slimfly", "sfly3042.gexf", lambda: generators.slimfly(13, 9), None, True),
+    ("fattree", "ftree.gexf", lambda: generators.fattree(36, 3, num_pods=10), None, False),
+])
+def test_generators_match_bundled_graphs(name, filename, generate, lp_map, check_types):
+    assert generators.validate(name, os.path.join(DATA_DIR, filename), generate(), lp_map, check_types)
+
+
+# every terminal has one link and every router the same number of ports:
+# (num_nodes, num_terminals, router ports)
+@pytest.mark.parametrize("generate,expected", [
+    # 15 in its row, 2 terminals, 1 global channel
+    (lambda: generators.dragonfly(16, 5, 2), (240, 160, 18)),
+    # q = 5 has (3q - 1) / 2 = 7 router links, plus 3 terminals
+    (lambda: generators.slimfly(5), (200, 150, 10)),
+    (lambda: generators.fattree(8, 2), (44, 32, 8)),
+    (lambda: generators.fattree(8, 3, num_pods=4), (104, 64, 8)),
+])
+def test_generated_degrees(generate, expected):
+    node_type, indptr, indices = generate()
+    degree = np.diff(indptr)
+    routers = node_type == topology.ROUTER
+    assert (len(node_type), int((~routers).sum())) == expected[:2]
+    assert (degree[~routers] == 1).all()
+    assert (degree[routers] == expected[2]).all()
+    # symmetric, without self loops or repeated links
+    edges = generators.edges_from_csr(indptr, indices)
+    assert len(generators.edge_set(edges)) * 2 == len(indices)
+    assert (edges[:, 0] != edges[:, 1]).all()
+
+
+def test_csr_round_trip():
+    edges = np.array([[0, 3], [1, 2], [3, 1], [2, 0]])
+    indptr, indices = generators.csr_from_edges(4, edges)
+    assert np.array_equal(generators.edge_set(generators.edges_from_csr(indptr, indices)),
+                          generators.edge_set(edges))
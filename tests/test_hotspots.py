@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from netvis import hotspots
+from netvis import topology
+from netvis import vtkarrays
+
+NUM_NODES = 30
+NUM_SAMPLES = 23
+BLOCK_STEPS = 4
+
+
+def build(tmpdir):
+    rng = np.random.RandomState(0)
+    samples = vtkarrays.sample_matrix(NUM_NODES, NUM_SAMPLES)
+    samples[...] = rng.randint(0, 1000, samples.shape)
+    node_type = np.where(np.arange(NUM_NODES) < 20, topology.TERMINAL, topology.ROUTER)
+    groups = np.arange(NUM_NODES) % 3
+    times = np.arange(NUM_SAMPLES) * 100.0
+    filename = str(tmpdir.join("hs.npz"))
+    hotspots.write_index(filename, hotspots.build_index(samples, times, node_type, groups, k=5,
+                                                        block_steps=BLOCK_STEPS))
+    return samples, node_type, groups, hotspots.HotspotIndex(filename)
+
+
+def test_node_stats(tmpdir):
+    samples, _, _, index = build(tmpdir)
+    assert np.array_equal(index.data["node_max"], samples.max(axis=1))
+    assert np.array_equal(index.data["node_total"], samples.sum(axis=1))
+    assert np.array_equal(index.data["node_peak_step"], samples.argmax(axis=1))
+    assert np.allclose(index.data["node_mean"], samples.mean(axis=1))
+
+
+def test_step_top(tmpdir):
+    samples, _, _, index = build(tmpdir)
+    for step in range(NUM_SAMPLES):
+        ids, values = index.step_top(step)
+        assert np.array_equal(values, np.sort(samples[:, step])[::-1][:5])
+        assert np.array_equal(samples[ids, step], values)
+
+
+@pytest.mark.parametrize("by", ["total", "max"])
+def test_top_nodes(tmpdir, by):
+    samples, node_type, groups, index = build(tmpdir)
+    nodes = index.nodes("router", 1)
+    assert np.array_equal(nodes, np.flatnonzero((node_type == topology.ROUTER) & (groups == 1)))
+
+    reduce = np.sum if by == "total" else np.max
+    # a range of whole blocks is exact, others are widened to whole blocks
+    for start, end, covered in ((0, NUM_SAMPLES, (0, NUM_SAMPLES)), (4, 12, (4, 12)),
+                                (5, 10, (4, 12)), (21, 23, (20, 23))):
+        ids, values, first, last = index.top_nodes(3, nodes, start, end, by)
+        assert (first, last) == covered
+        expected = reduce(samples[nodes, first:last], axis=1)
+        assert np.array_equal(values, np.sort(expected)[::-1][:3])
+        assert np.array_equal(reduce(samples[ids, first:last], axis=1), values)
+
+
+def test_step_range_and_steps_above(tmpdir):
+    samples, node_type, _, index = build(tmpdir)
+    assert index.step_range(150, 420) == (2, 5)
+    assert index.step_range(None, None) == (0, NUM_SAMPLES)
+    steps, values = index.steps_above(900, "terminal", 2, 20)
+    step_max = samples[node_type == topology.TERMINAL].max(axis=0)
+    assert np.array_equal(steps, 2 + np.flatnonzero(step_max[2:20] > 900))
+    assert np.array_equal(values, step_max[steps])
+
+
+# the covered range is printed next to the results, and the requested one when they differ
+def test_query_prints_covered_range(tmpdir, capsys):
+    build(tmpdir)
+    hotspots.main([str(tmpdir.join("hs.npz")), "-k", "2", "--t0", "500", "--t1", "1000"])
+    out = capsys.readouterr().out
+    assert "steps 4 to 11 (time 400 to 1100)" in out
+    assert "requested steps 5 to 9 (time 500 to 900)" in out
+    hotspots.main([str(tmpdir.join("hs.npz")), "-k", "2", "--t0", "400", "--t1", "1200"])
+    assert "requested" not in capsys.readouterr().out
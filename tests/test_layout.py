@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from netvis import layout
+
+nx = pytest.importorskip("networkx")
+
+# the batched layouts against the per group and per router nx.circular_layout
+# calls network.py made before them
+
+
+def nx_circle(nodes, scale, center):
+    graph = nx.Graph()
+    graph.add_nodes_from(nodes)
+    pos = nx.circular_layout(graph, scale=scale, center=center, dim=2)
+    return np.array([pos[node] for node in nodes])
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 13, 96])
+def test_circle_matches_circular_layout(n):
+    assert np.allclose(layout.circle(n, 20, [50, 100]), nx_circle(list(range(n)), 20, [50, 100]))
+
+
+def test_circle_groups_match_circular_layout():
+    num_groups, group_size, first_id = 6, 13, 3042
+    centers = layout.group_centers(num_groups, 150, [0, 0])
+    xy = layout.circle_groups(centers, group_size, 20, first_id)
+    for g in range(num_groups):
+        routers = list(range(first_id + g * group_size, first_id + (g + 1) * group_size))
+        ref = nx_circle(routers, 20, centers[g])
+        assert np.allclose(xy[g * group_size:(g + 1) * group_size], ref)
+
+
+# one graph per router with the router and then its terminals added edge by
+# edge, the router removed again before the layout
+def test_terminal_rings_match_circular_layout():
+    rng = np.random.RandomState(0)
+    num_terminals, num_routers = 40, 7
+    node_xy = np.zeros((num_terminals + num_routers, 2))
+    node_xy[num_terminals:] = rng.uniform(-100, 100, (num_routers, 2))
+    router_ids = num_terminals + rng.randint(0, num_routers, num_terminals)
+    term_ids = rng.permutation(num_terminals)
+    # a repeated edge doesn't move anything
+    term_ids = np.r_[term_ids, term_ids[:5]]
+    router_ids = np.r_[router_ids, router_ids[:5]]
+
+    ids, xy = layout.terminal_rings(term_ids, router_ids, node_xy, 3)
+    pos = dict(zip(ids.tolist(), xy))
+    assert sorted(pos) == list(range(num_terminals))
+
+    graphs = {}
+    for t, r in zip(term_ids.tolist(), router_ids.tolist()):
+        if r not in graphs:
+            graphs[r] = nx.Graph()
+            graphs[r].add_node(r)
+        graphs[r].add_edge(r, t)
+    for r, graph in graphs.items():
+        graph.remove_node(r)
+        ref = nx.circular_layout(graph, scale=3, center=list(node_xy[r]), dim=2)
+        for t, coords in ref.items():
+            assert np.allclose(pos[t], coords)
+
+
+def test_dict_order():
+    keys = [7, 3, 7, 100, 3, 1]
+    slots = layout.dict_order(keys)
+    order = list(dict.fromkeys(keys))
+    assert [order[i] for i in slots] == keys
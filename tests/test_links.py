@@ -0,0 +1,53 @@
+import numpy as np
+
+from netvis import links
+from netvis import topology
+from netvis import vtkarrays
+
+NUM_TERMINALS = 4
+NUM_SAMPLES = 3
+SAMP_INTERVAL = 100
+# terminals 0-3 on routers 4 and 5, which are linked to each other
+EDGES = np.array([[0, 4], [1, 4], [5, 2], [3, 5], [4, 5]])
+
+
+def port_table():
+    node_type = np.array([topology.TERMINAL] * 4 + [topology.ROUTER] * 2)
+    return links.PortTable(EDGES, topology.NodeIndex(node_type))
+
+
+def test_ports_follow_edge_order():
+    table = port_table()
+    assert table.num_ports.tolist() == [3, 3]
+    edges = table.edge_index([4, 4, 4, 5, 5, 5, 5, 3, 6], [0, 1, 2, 0, 1, 2, 3, 0, 0])
+    assert edges.tolist() == [0, 1, 4, 2, 3, 4, -1, -1, -1]
+
+
+def test_read_link_array(tmpdir):
+    rng = np.random.RandomState(0)
+    rows = []
+    for sample in range(NUM_SAMPLES):
+        for router in range(2):
+            # port 3 has no link
+            for port in range(4):
+                rows.append((router, port, sample * SAMP_INTERVAL + rng.uniform(0, 99), rng.randint(0, 9, 2)))
+    rng.shuffle(rows)
+    filename = str(tmpdir.join("link.csv"))
+    f = open(filename, "w")
+    f.write("router_id,port,end_time,bytes0,bytes1\n")
+    for router, port, end_time, values in rows:
+        f.write("%d,%d,%.3f,%d,%d\n" % (router, port, end_time, values[0], values[1]))
+    f.close()
+
+    table = port_table()
+    out = vtkarrays.sample_matrix(len(EDGES), NUM_SAMPLES)
+    unmapped = links.read_link_array(filename, table, NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS, out)
+    assert unmapped == 2 * NUM_SAMPLES
+
+    ref = np.zeros((len(EDGES), NUM_SAMPLES), dtype=np.int64)
+    for router, port, end_time, values in rows:
+        edge = table.edge_index([router + NUM_TERMINALS], [port])[0]
+        if edge >= 0:
+            # both directions of the router link add up on edge 4
+            ref[edge, int(end_time // SAMP_INTERVAL)] += values.sum()
+    assert np.array_equal(out, ref)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from netvis import lod
+from netvis import topology
+from netvis import vtkarrays
+
+# two groups of two routers (ids 6-9), terminals 0-5; terminal 5 is linked to
+# two routers and joins the first
+NODE_TYPE = [topology.TERMINAL] * 6 + [topology.ROUTER] * 4
+EDGES = np.array([[0, 6], [7, 1], [2, 7], [3, 8], [4, 9], [5, 9], [5, 6],
+                  [6, 7], [8, 9], [6, 8], [7, 9], [9, 6]])
+
+
+def segments():
+    nodes = topology.NodeIndex(NODE_TYPE)
+    return lod.router_segments(nodes, EDGES)
+
+
+def test_router_and_group_segments():
+    router_segs = segments()
+    assert router_segs.tolist() == [0, 1, 1, 2, 3, 3, 0, 1, 2, 3]
+    assert lod.group_segments(router_segs, 2).tolist() == [0, 0, 0, 1, 1, 1, 0, 0, 1, 1]
+
+
+@pytest.mark.parametrize("how", lod.REDUCTIONS)
+def test_segment_reduce_matches_loop(how):
+    rng = np.random.RandomState(0)
+    samples = vtkarrays.sample_matrix(len(NODE_TYPE), 7)
+    samples[...] = rng.randint(0, 30, samples.shape)
+    router_segs = segments()
+    # node 4 is left out, segment 4 has no nodes
+    router_segs[4] = -1
+    reduced = lod.segment_reduce(samples, router_segs, 5, how)
+    assert reduced.flags.f_contiguous
+    reduce = {"sum": np.sum, "max": np.max, "mean": np.mean}[how]
+    for seg in range(4):
+        assert np.allclose(reduced[seg], reduce(samples[router_segs == seg], axis=0))
+    assert not reduced[4].any()
+
+
+def test_segment_reduce_channels():
+    channels = vtkarrays.channel_matrix(len(NODE_TYPE), 4, 2)
+    channels[...] = np.arange(channels.size).reshape(channels.shape) % 11
+    group_segs = lod.group_segments(segments(), 2)
+    reduced = lod.segment_reduce(channels, group_segs, 2, "max")
+    assert vtkarrays.steps_contiguous(reduced)
+    for seg in range(2):
+        assert np.array_equal(reduced[seg], channels[group_segs == seg].max(axis=0))
+
+
+def test_segment_edges():
+    group_segs = lod.group_segments(segments(), 2)
+    folded, edge_segments = lod.segment_edges(EDGES, group_segs)
+    # only the router links between the two groups are left, as one edge
+    assert folded.tolist() == [[0, 1]]
+    between = (group_segs[EDGES[:, 0]] != group_segs[EDGES[:, 1]])
+    assert (edge_segments[between] == 0).all()
+    assert (edge_segments[~between] == -1).all()
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from netvis import sampling
+from netvis import vtkarrays
+
+# the column readers against the per line dict reader network.py used before them,
+# on small sampling files with rows out of order. the other tests write their
+# sampling files with the helpers here
+
+NUM_TERMINALS = 12
+NUM_ROUTERS = 5
+NUM_SAMPLES = 8
+SAMP_INTERVAL = 100
+
+
+# read_sim_data as network.py had it: the first row of a node only registers it
+def dict_read_sim_data(filename, node_type, num_terminals, num_samples, samp_interval):
+    data = {}
+    f = open(filename, "r")
+    cols = f.readline().split(",")
+    for line in f:
+        tokens = line.strip().split(",")
+        if node_type == "router":
+            node_id = num_terminals + int(tokens[cols.index("router_id")])
+        else:
+            node_id = int(tokens[cols.index("terminal_id")])
+        idx = int(float(tokens[cols.index("end_time")]) / samp_interval)
+        if node_id not in data:
+            data[node_id] = [0 for _ in range(num_samples)]
+        else:
+            data[node_id][idx] = sum([int(i) for i in tokens[cols.index("end_time") + 1:]])
+    f.close()
+    return data
+
+
+# one row per node and sample with num_vcs VC columns, shuffled or in the
+# sample order a running simulation writes them in
+def write_sampling(filename, node_type, num_nodes, num_vcs=3, seed=0, shuffle=True):
+    rng = np.random.RandomState(seed)
+    rows = []
+    for sample in range(NUM_SAMPLES):
+        for node in range(num_nodes):
+            end_time = sample * SAMP_INTERVAL + rng.uniform(0, SAMP_INTERVAL - 1)
+            rows.append([str(node), "%.3f" % end_time] + [str(v) for v in rng.randint(0, 50, num_vcs)])
+    if shuffle:
+        rng.shuffle(rows)
+    f = open(filename, "w")
+    f.write(node_type + "_id,end_time," + ",".join("vc%d" % i for i in range(num_vcs)) + "\n")
+    for row in rows:
+        f.write(",".join(row) + "\n")
+    f.close()
+    return filename
+
+
+def read_both(router_csv, term_csv):
+    out = np.zeros((NUM_TERMINALS + NUM_ROUTERS, NUM_SAMPLES), dtype=np.int64)
+    sampling.read_sim_array(term_csv, "terminal", NUM_SAMPLES, SAMP_INTERVAL, 0, out)
+    sampling.read_sim_array(router_csv, "router", NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS, out)
+    return out
+
+
+def sampling_files(tmpdir, shuffle=True):
+    return (write_sampling(str(tmpdir.join("router.csv")), "router", NUM_ROUTERS, seed=1, shuffle=shuffle),
+            write_sampling(str(tmpdir.join("term.csv")), "terminal", NUM_TERMINALS, seed=2, shuffle=shuffle))
+
+
+def test_read_sim_array_matches_dict_reader(tmpdir, monkeypatch):
+    router_csv, term_csv = sampling_files(tmpdir)
+    # small blocks, so rows of one node are spread over several of them
+    monkeypatch.setattr(sampling, "BLOCK_SIZE", 200)
+    out = read_both(router_csv, term_csv)
+
+    ref = np.zeros_like(out)
+    for filename, node_type in ((router_csv, "router"), (term_csv, "terminal")):
+        for node, values in dict_read_sim_data(filename, node_type, NUM_TERMINALS, NUM_SAMPLES,
+                                               SAMP_INTERVAL).items():
+            ref[node] = values
+    assert np.array_equal(out, ref)
+
+
+# with --per_vc each VC column is kept as a channel, their sum is what read_sim_array keeps
+def test_read_vc_array_sums_to_read_sim_array(tmpdir):
+    router_csv, term_csv = sampling_files(tmpdir)
+    assert sampling.read_channel_names(router_csv, "router") == ["vc0", "vc1", "vc2"]
+    # one channel more than the files have
+    vc = vtkarrays.channel_matrix(NUM_TERMINALS + NUM_ROUTERS, NUM_SAMPLES, 4)
+    sampling.read_vc_array(term_csv, "terminal", NUM_SAMPLES, SAMP_INTERVAL, 0, vc)
+    sampling.read_vc_array(router_csv, "router", NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS, vc)
+    assert not vc[:, :, 3].any()
+    assert np.array_equal(vc.sum(axis=2), read_both(router_csv, term_csv))
+    assert vtkarrays.steps_contiguous(vc)
+
+
+def test_read_vc_array_needs_enough_channels(tmpdir):
+    router_csv, _ = sampling_files(tmpdir)
+    vc = vtkarrays.channel_matrix(NUM_TERMINALS + NUM_ROUTERS, NUM_SAMPLES, 2)
+    with pytest.raises(ValueError):
+        sampling.read_vc_array(router_csv, "router", NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS, vc)
+
+
+def test_out_of_range_node_ids_are_skipped(tmpdir, capsys):
+    # two routers more than the graph has
+    big = write_sampling(str(tmpdir.join("router.csv")), "router", NUM_ROUTERS + 2, seed=1)
+    out = np.zeros((NUM_TERMINALS + NUM_ROUTERS, NUM_SAMPLES), dtype=np.int64)
+    sampling.read_sim_array(big, "router", NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS, out)
+    assert "WARNING: %d rows of %s" % (2 * NUM_SAMPLES, big) in capsys.readouterr().out
+    assert out[NUM_TERMINALS:].any()
+    assert not out[:NUM_TERMINALS].any()
+
+
+# the router file is complete before the terminal file starts, far more samples
+# apart than the window, and the terminal rows arrive a few at a time
+def test_sample_stream_grows_its_window(tmpdir):
+    router_csv, term_csv = sampling_files(tmpdir, shuffle=False)
+    term_lines = open(term_csv).readlines()
+    follow_csv = str(tmpdir.join("follow.csv"))
+    open(follow_csv, "w").write(term_lines[0])
+
+    followers = [sampling.FileFollower(router_csv, "router", NUM_TERMINALS, NUM_ROUTERS),
+                 sampling.FileFollower(follow_csv, "terminal", 0, NUM_TERMINALS)]
+    stream = sampling.SampleStream(followers, NUM_TERMINALS + NUM_ROUTERS, NUM_SAMPLES, SAMP_INTERVAL, window=2)
+    steps = {}
+    for start in range(1, len(term_lines), 7):
+        f = open(follow_csv, "a")
+        f.write("".join(term_lines[start:start + 7]))
+        f.close()
+        stream.update()
+        for step in stream.complete_steps():
+            steps[step] = stream.ring[:, step % stream.window].copy()
+    for step in stream.complete_steps(flush=True):
+        steps[step] = stream.ring[:, step % stream.window].copy()
+    stream.close()
+
+    assert stream.window > 2
+    ref = read_both(router_csv, term_csv)
+    assert sorted(steps) == list(range(NUM_SAMPLES))
+    for step, values in steps.items():
+        assert np.array_equal(values, ref[:, step])
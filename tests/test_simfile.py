@@ -0,0 +1,43 @@
+import numpy as np
+
+from netvis import sampling
+from netvis import simfile
+from tests.test_sampling import (NUM_ROUTERS, NUM_SAMPLES, NUM_TERMINALS, SAMP_INTERVAL, read_both, sampling_files,
+                                 write_sampling)
+
+
+def convert(filename, node_type):
+    converted = filename + ".nvs"
+    simfile.convert_sampling(filename, node_type, SAMP_INTERVAL, NUM_SAMPLES * SAMP_INTERVAL, converted)
+    assert simfile.is_simfile(converted)
+    assert not simfile.is_simfile(filename)
+    return converted
+
+
+def test_simfile_matches_csv(tmpdir):
+    router_csv, term_csv = sampling_files(tmpdir)
+    out = np.zeros((NUM_TERMINALS + NUM_ROUTERS, NUM_SAMPLES), dtype=np.int64)
+    simfile.read_sim_array(convert(term_csv, "terminal"), "terminal", NUM_SAMPLES, SAMP_INTERVAL, 0, out)
+    simfile.read_sim_array(convert(router_csv, "router"), "router", NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS,
+                           out)
+    assert np.array_equal(out, read_both(router_csv, term_csv))
+
+
+def test_simfile_columns_are_steps(tmpdir):
+    router_csv, _ = sampling_files(tmpdir)
+    sim = simfile.SimFile(convert(router_csv, "router"))
+    assert (sim.kind, sim.num_nodes, sim.num_samples) == ("router", NUM_ROUTERS, NUM_SAMPLES)
+    assert sim.column_names == ["vc0", "vc1", "vc2"]
+    # every step of a column is one contiguous run
+    assert sim.column("vc0").flags.f_contiguous
+
+
+def test_simfile_out_of_range_nodes_are_skipped(tmpdir, capsys):
+    big = write_sampling(str(tmpdir.join("router.csv")), "router", NUM_ROUTERS + 2, seed=1)
+    out = np.zeros((NUM_TERMINALS + NUM_ROUTERS, NUM_SAMPLES), dtype=np.int64)
+    simfile.read_sim_array(convert(big, "router"), "router", NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS, out)
+    assert "WARNING: 2 nodes of " + big + ".nvs" in capsys.readouterr().out
+    # the same values the csv reader keeps
+    ref = np.zeros_like(out)
+    sampling.read_sim_array(big, "router", NUM_SAMPLES, SAMP_INTERVAL, NUM_TERMINALS, ref)
+    assert np.array_equal(out, ref)
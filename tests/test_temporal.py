@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from netvis import lod
+from netvis import temporal
+from netvis import vtkarrays
+
+NUM_NODES = 9
+NUM_SAMPLES = 11
+
+
+def random_samples():
+    samples = vtkarrays.sample_matrix(NUM_NODES, NUM_SAMPLES)
+    samples[...] = np.random.RandomState(0).randint(0, 300, samples.shape)
+    return samples
+
+
+@pytest.mark.parametrize("factor", [1, 3, 4, 11, 20])
+@pytest.mark.parametrize("how", lod.REDUCTIONS)
+def test_rebin_matches_loop(factor, how):
+    samples = random_samples()
+    binned = temporal.rebin(samples, factor, how)
+    reduce = {"sum": np.sum, "max": np.max, "mean": np.mean}[how]
+    assert binned.shape[1] == temporal.num_steps(NUM_SAMPLES, factor)
+    # the step layout is kept, so StepArray can point at each step
+    assert vtkarrays.steps_contiguous(binned)
+    for i in range(binned.shape[1]):
+        # the last bin may be shorter
+        assert np.allclose(binned[:, i], reduce(samples[:, i * factor:(i + 1) * factor], axis=1))
+
+
+def test_rebin_channels():
+    channels = vtkarrays.channel_matrix(NUM_NODES, NUM_SAMPLES, 2)
+    channels[...] = np.arange(channels.size).reshape(channels.shape) % 13
+    binned = temporal.rebin(channels, 5, "max")
+    assert binned.shape == (NUM_NODES, 3, 2)
+    assert vtkarrays.steps_contiguous(binned)
+    assert np.array_equal(binned[:, 2], channels[:, 10])
+
+
+def test_stride_and_num_steps():
+    samples = random_samples()
+    strided = temporal.stride(temporal.rebin(samples, 2), 3)
+    assert strided.shape[1] == temporal.num_steps(NUM_SAMPLES, 2, 3) == 2
+    assert np.array_equal(strided[:, 1], samples[:, 6:8].sum(axis=1))
+    with pytest.raises(ValueError):
+        temporal.stride(samples, 0)
+    with pytest.raises(ValueError):
+        temporal.rebin(samples, 0)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from netvis import vtkarrays
+
+vtk = pytest.importorskip("vtk")
+from vtk.util import numpy_support
+
+NUM_NODES = 50
+NUM_SAMPLES = 12
+
+
+def random_samples(seed=0):
+    samples = vtkarrays.sample_matrix(NUM_NODES, NUM_SAMPLES)
+    samples[...] = np.random.RandomState(seed).randint(0, 200, samples.shape)
+    return samples
+
+
+# fortran ordered matrices are handed to vtk without a copy, c ordered ones
+# through the step buffer; both have to show the same values
+@pytest.mark.parametrize("layout", ["F", "C"])
+def test_step_array_matches_columns(layout):
+    samples = np.array(random_samples(), order=layout)
+    cur_step = vtkarrays.StepArray(samples, "VC_Occupancy")
+    assert (cur_step.buf is None) == (layout == "F")
+    for step in range(NUM_SAMPLES):
+        array = cur_step.get_step(step)
+        assert array is cur_step.array
+        assert array.GetName() == "VC_Occupancy"
+        assert np.array_equal(numpy_support.vtk_to_numpy(array), samples[:, step])
+
+
+# what network.py wrote with InsertValue before, one value per node and step
+def test_step_array_matches_insert_value():
+    samples = random_samples()
+    cur_step = vtkarrays.StepArray(samples, "VC_Occupancy")
+    for step in (0, NUM_SAMPLES - 1):
+        step_arr = vtk.vtkIntArray()
+        for node in range(NUM_NODES):
+            step_arr.InsertValue(node, int(samples[node, step]))
+        array = cur_step.get_step(step)
+        assert [array.GetValue(i) for i in range(NUM_NODES)] == \
+            [step_arr.GetValue(i) for i in range(NUM_NODES)]
+
+
+# a channel matrix step is shown as a multi component array, one tuple per node
+def test_step_array_channels():
+    channels = vtkarrays.channel_matrix(NUM_NODES, NUM_SAMPLES, 3)
+    channels[...] = np.random.RandomState(1).randint(0, 200, channels.shape)
+    cur_step = vtkarrays.StepArray(channels, "VC_Occupancy", ["vc0", "vc1", "vc2"])
+    assert cur_step.buf is None
+    assert cur_step.array.GetComponentName(2) == "vc2"
+    for step in range(NUM_SAMPLES):
+        assert np.array_equal(numpy_support.vtk_to_numpy(cur_step.get_step(step)), channels[:, step])
+
+
+def test_compact_keeps_values_and_layout():
+    samples = random_samples()
+    small = vtkarrays.compact(samples)
+    assert small.dtype == np.uint8
+    assert small.flags.f_contiguous
+    assert np.array_equal(small, samples)
+    assert vtkarrays.compact_dtype(-1, 40000) == np.int32
+
+
+# rows gathers a subset of the nodes, in the given order and with repeats
+def test_step_array_rows():
+    samples = random_samples()
+    rows = [4, 0, 17, 17, 49]
+    cur_step = vtkarrays.StepArray(samples, "NumSends", rows=rows)
+    for step in range(NUM_SAMPLES):
+        assert np.array_equal(numpy_support.vtk_to_numpy(cur_step.get_step(step)), samples[rows, step])
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from netvis import vtkarrays
+from netvis import vtkhdf
+
+vtk = pytest.importorskip("vtk")
+pytest.importorskip("h5py")
+from vtk.util import numpy_support
+
+NUM_POINTS = 6
+NUM_SAMPLES = 5
+
+
+# a chain of lines through NUM_POINTS points
+def line_polydata():
+    polydata = vtk.vtkPolyData()
+    points = vtk.vtkPoints()
+    lines = vtk.vtkCellArray()
+    for i in range(NUM_POINTS):
+        points.InsertNextPoint(i, 2 * i, 0)
+    for i in range(NUM_POINTS - 1):
+        lines.InsertNextCell(2)
+        lines.InsertCellPoint(i)
+        lines.InsertCellPoint(i + 1)
+    polydata.SetPoints(points)
+    polydata.SetLines(lines)
+    return polydata
+
+
+def read_step(filename, step):
+    if not hasattr(vtk, "vtkHDFReader"):
+        pytest.skip("this vtk has no vtkHDFReader")
+    reader = vtk.vtkHDFReader()
+    reader.SetFileName(filename)
+    reader.SetStep(step)
+    reader.Update()
+    return reader.GetOutput()
+
+
+def test_transient_polydata_reads_back(tmpdir):
+    rng = np.random.RandomState(0)
+    samples = vtkarrays.sample_matrix(NUM_POINTS, NUM_SAMPLES)
+    samples[...] = rng.randint(0, 100, samples.shape)
+    node_type = np.arange(NUM_POINTS, dtype=np.int32) % 2
+    times = np.arange(NUM_SAMPLES) * 100.0
+
+    filename = str(tmpdir.join("run.vtkhdf"))
+    polydata = line_polydata()
+    writer = vtkhdf.TransientPolyDataWriter(filename, polydata, ["VC_Occupancy"], {"NodeType": node_type})
+    # steps go in as one block of two and then one at a time
+    writer.add_steps(times[:2], {"VC_Occupancy": samples[:, :2]})
+    for step in range(2, NUM_SAMPLES):
+        writer.add_step(times[step], {"VC_Occupancy": samples[:, step]})
+    writer.close()
+
+    for step in range(NUM_SAMPLES):
+        output = read_step(filename, step)
+        assert output.GetNumberOfPoints() == NUM_POINTS
+        assert output.GetNumberOfLines() == NUM_POINTS - 1
+        points = numpy_support.vtk_to_numpy(output.GetPoints().GetData())
+        assert np.allclose(points, numpy_support.vtk_to_numpy(polydata.GetPoints().GetData()))
+        point_data = output.GetPointData()
+        assert np.array_equal(numpy_support.vtk_to_numpy(point_data.GetArray("NodeType")), node_type)
+        assert np.array_equal(numpy_support.vtk_to_numpy(point_data.GetArray("VC_Occupancy")), samples[:, step])
+
+
+# LinkTraffic goes in as cell data, one value per line and step
+def test_transient_cell_data_reads_back(tmpdir):
+    rng = np.random.RandomState(1)
+    link_samples = vtkarrays.sample_matrix(NUM_POINTS - 1, NUM_SAMPLES)
+    link_samples[...] = rng.randint(0, 100, link_samples.shape)
+    samples = vtkarrays.sample_matrix(NUM_POINTS, NUM_SAMPLES)
+
+    filename = str(tmpdir.join("links.vtkhdf"))
+    writer = vtkhdf.TransientPolyDataWriter(filename, line_polydata(), ["VC_Occupancy"],
+                                            cell_step_names=["LinkTraffic"])
+    writer.add_steps(np.arange(NUM_SAMPLES), {"VC_Occupancy": samples, "LinkTraffic": link_samples})
+    writer.close()
+
+    for step in range(NUM_SAMPLES):
+        output = read_step(filename, step)
+        assert np.array_equal(numpy_support.vtk_to_numpy(output.GetCellData().GetArray("LinkTraffic")),
+                              link_samples[:, step])